@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Compare per commit latency of building commit details with multiple
+GitPython calls against one `git show` invocation.
+
+Usage: python benchmarks/bench_commit.py [--files N] [--commits N] [REPO]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import git
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import create_repo, create_history, report
+from gitover.show import read_commit
+
+
+def legacy_commit(repo, rev):
+    """Commit details as computed by Repo.commit before `git show` parsing"""
+    c = repo.commit(rev)
+    shortrev = repo.git.rev_parse(c.hexsha, short=8)
+    changes = repo.git.diff_tree(c.hexsha, no_commit_id=True, name_status=True, r=True).split("\n")
+    changes = [tuple(ch.split("\t")) for ch in changes if ch.strip()]
+    diff = repo.git.diff(*c.parents, c)
+    return shortrev, str(c.committed_datetime), c.author.name, c.summary, changes, diff
+
+
+def per_commit(func, revs):
+    """Returns list of durations in seconds of calling given function for each revision"""
+    durations = []
+    for rev in revs:
+        start = time.perf_counter()
+        func(rev)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[-1])
+    parser.add_argument("repo", nargs="?", help="existing repository, otherwise create one")
+    parser.add_argument("--files", type=int, default=1000, help="files of synthetic repo")
+    parser.add_argument("--commits", type=int, default=200, help="commits to measure")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = args.repo
+        if not path:
+            path = create_repo(os.path.join(tmpdir, "repo"), args.files)
+            create_history(path, args.commits)
+        repo = git.Repo(path)
+        revs = [c.hexsha for c in repo.iter_commits(max_count=args.commits) if c.parents]
+
+        for rev in revs[:10]:
+            legacy = legacy_commit(repo, rev)
+            show = read_commit(repo, rev)
+            if legacy[1:5] != (show.date, show.user, show.msg, show.changes):
+                print("WARNING: legacy and git show details differ for {}".format(rev))
+
+        report("legacy (commit/rev-parse/diff-tree/diff)", per_commit(lambda r: legacy_commit(repo, r), revs))
+        report("git show single pass", per_commit(lambda r: read_commit(repo, r), revs))
+
+
+if __name__ == "__main__":
+    main()
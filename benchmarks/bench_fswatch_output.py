@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Compare parsing of `fswatch -0` output bursts by NulSplitter with the former
+split of the remaining buffer per path.
+
+Without --recording a burst like the one of a checkout touching --paths files is used,
+every path reported --events times. A recording is the raw output of
+`fswatch -0 -m fsevents_monitor <dir>`, it gets fed in chunks of --chunk bytes.
+
+Usage: python benchmarks/bench_fswatch_output.py [--paths N] [--events N] [--chunk BYTES]
+                                                 [--recording FILE] [--repeat N]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import timeit, report
+from gitover.fswatcher import NUL, NulSplitter
+
+
+class FormerSplitter(object):
+    """Parser of FsWatcher before NulSplitter"""
+
+    def __init__(self):
+        self._buffer = bytes()
+
+    def feed(self, data):
+        paths = set()
+        self._buffer += data
+        while NUL in self._buffer:
+            path, self._buffer = self._buffer.split(NUL, maxsplit=1)
+            paths.add(path.decode("utf-8"))
+        return paths
+
+
+def burst(nof_paths, nof_events):
+    """Returns fswatch output of a checkout touching given number of files"""
+    paths = [
+        "/Users/dev/src/project/dir{:04d}/file{:06d}.txt".format(idx // 100, idx).encode()
+        for idx in range(nof_paths)
+    ]
+    return b"".join(path + NUL for _ in range(nof_events) for path in paths)
+
+
+def parse(splitter_class, data, chunk_size):
+    splitter = splitter_class()
+    paths = set()
+    for offset in range(0, len(data), chunk_size):
+        paths.update(splitter.feed(data[offset:offset + chunk_size]))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="\n".join(__doc__.strip().split("\n")[-2:]))
+    parser.add_argument("--paths", type=int, default=50000, help="number of changed files")
+    parser.add_argument("--events", type=int, default=2, help="number of events per file")
+    parser.add_argument("--chunk", type=int, default=64 * 1024, help="bytes per read")
+    parser.add_argument("--recording", help="file with recorded fswatch output")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs")
+    args = parser.parse_args()
+
+    if args.recording:
+        with open(args.recording, "rb") as f:
+            data = f.read()
+    else:
+        data = burst(args.paths, args.events)
+    print("Parsing {} bytes, {} paths, in chunks of {} bytes".format(
+        len(data), data.count(NUL), args.chunk))
+    if parse(NulSplitter, data, args.chunk) != parse(FormerSplitter, data, args.chunk):
+        print("Parsers disagree")
+        return
+    report("NulSplitter", timeit(lambda: parse(NulSplitter, data, args.chunk), args.repeat))
+    report("former split per path", timeit(
+        lambda: parse(FormerSplitter, data, args.chunk), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Compare `git ls-remote` of many repositories on one ssh host with and without
+shared ssh connections of SshMultiplexer.
+
+Without --url a local stand-in for ssh is used, it waits --handshake seconds for every
+new connection, reuses an existing control socket without delay and serves the
+repository through `git-upload-pack`. With --url ( e.g. git@host:repo.git ) real
+ssh connections get measured.
+
+Usage: python benchmarks/bench_ssh.py [--repeat N] [--handshake SECONDS] [--url URL]
+"""
+import argparse
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import create_repo, timeit, report
+from gitover.ssh import SshMultiplexer
+
+# emulates ssh with a handshake delay per connection, git invokes it as
+# `<GIT_SSH_COMMAND> [-o SendEnv=GIT_PROTOCOL] <host> <command>`
+STAND_IN = """#!{python}
+import hashlib, os, subprocess, sys, time
+args, options = sys.argv[1:], {{}}
+while args and args[0].startswith("-"):
+    opt = args.pop(0)
+    if opt == "-o":
+        key, _, value = args.pop(0).partition("=")
+        options[key] = value
+    elif opt in ("-p", "-l"):
+        args.pop(0)
+host, command = args[0], " ".join(args[1:])
+socket = options.get("ControlPath", "").replace("%C", hashlib.sha1(host.encode()).hexdigest())
+if not socket or not os.path.exists(socket):
+    time.sleep({handshake})
+    if socket and options.get("ControlMaster") == "auto":
+        open(socket, "w").close()
+sys.exit(subprocess.call(["sh", "-c", command]))
+"""
+
+
+def ls_remote(url, env):
+    subprocess.check_call(
+        ["git", "ls-remote", url], env=dict(os.environ, **env), stdout=subprocess.DEVNULL
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[-1])
+    parser.add_argument("--url", help="ssh url of existing repository, otherwise use stand-in")
+    parser.add_argument("--repeat", type=int, default=20, help="number of ls-remote calls")
+    parser.add_argument("--handshake", type=float, default=0.2, help="stand-in handshake seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        ssh = "ssh"
+        url = args.url
+        if not url:
+            ssh = os.path.join(tmpdir, "ssh-stand-in")
+            with open(ssh, "w") as f:
+                f.write(STAND_IN.format(python=sys.executable, handshake=args.handshake))
+            os.chmod(ssh, os.stat(ssh).st_mode | stat.S_IEXEC)
+            url = "stand-in:{}".format(create_repo(os.path.join(tmpdir, "repo"), 10))
+
+        multiplexer = SshMultiplexer()
+        shared = multiplexer.env()
+        if not shared:
+            print("SSH multiplexing not available, GIT_SSH_COMMAND or GIT_SSH is set?")
+            return
+        shared["GIT_SSH_COMMAND"] = ssh + shared["GIT_SSH_COMMAND"][len("ssh"):]
+        try:
+            report("separate ssh connections", timeit(
+                lambda: ls_remote(url, {"GIT_SSH_COMMAND": ssh}), args.repeat))
+            report("shared ssh connection", timeit(
+                lambda: ls_remote(url, shared), args.repeat))
+        finally:
+            multiplexer.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Compare working tree status of multiple GitPython calls against
+single pass `git status --porcelain=v2`.
+
+Usage: python benchmarks/bench_status.py [--files N] [--repeat N] [REPO]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import git
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import create_repo, timeit, report
+from gitover.porcelain import read_status
+
+
+def legacy_status(repo):
+    """Working tree status as computed by GitStatus.update before porcelain v2"""
+    untracked = set(repo.untracked_files)
+    modified, deleted, conflicts, staged = set(), set(), set(), set()
+    for diff in repo.index.diff(other=None):
+        if diff.deleted_file:
+            deleted.add(diff.b_path)
+        else:
+            modified.add(diff.b_path)
+    try:
+        unmergedBlobs = repo.index.unmerged_blobs()
+        for path in unmergedBlobs:
+            for (stage, dummyBlob) in unmergedBlobs[path]:
+                if stage != 0:
+                    conflicts.add(path)
+    except:
+        pass
+    for p in repo.git.diff("HEAD", name_only=True, cached=True).split("\n"):
+        if p.strip():
+            staged.add(p)
+    return untracked, modified, deleted, conflicts, staged
+
+
+def dirty(path, nof_files):
+    """Modify, delete, stage and add some files"""
+    for idx in range(0, nof_files, 97):
+        name = os.path.join(path, "dir{:04d}".format(idx // 100), "file{:06d}.txt".format(idx))
+        with open(name, "a") as f:
+            f.write("modified\n")
+    for idx in range(1, nof_files, 101):
+        os.unlink(os.path.join(path, "dir{:04d}".format(idx // 100), "file{:06d}.txt".format(idx)))
+    for idx in range(50):
+        with open(os.path.join(path, "untracked{:03d}.txt".format(idx)), "w") as f:
+            f.write("untracked\n")
+    git.Repo(path).git.add("dir0000")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[-1])
+    parser.add_argument("repo", nargs="?", help="existing repository, otherwise create one")
+    parser.add_argument("--files", type=int, default=20000, help="files of synthetic repo")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = args.repo
+        if not path:
+            path = create_repo(os.path.join(tmpdir, "repo"), args.files)
+            dirty(path, args.files)
+        repo = git.Repo(path)
+
+        legacy = legacy_status(repo)
+        porcelain = read_status(repo)
+        print("untracked={} modified={} deleted={} conflicts={} staged={}".format(
+            len(porcelain.untracked), len(porcelain.modified), len(porcelain.deleted),
+            len(porcelain.conflicts), len(porcelain.staged)))
+        if legacy != (porcelain.untracked, porcelain.modified, porcelain.deleted,
+                       porcelain.conflicts, porcelain.staged):
+            print("WARNING: legacy and porcelain status differ")
+
+        report("legacy (untracked/diff/unmerged/cached)", timeit(lambda: legacy_status(repo), args.repeat))
+        report("porcelain v2 single pass", timeit(lambda: read_status(repo), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
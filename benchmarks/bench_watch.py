@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Compare the file system watcher backends of RepoTracker on a large working tree:
+native inotify, fswatch ( when installed ) and QFileSystemModel.
+
+Every backend runs in its own process and reports the time until the tree is watched,
+the memory that costs and the time until changes of --changes files got reported.
+
+Usage: python benchmarks/bench_watch.py [--files N] [--changes N] [--repo PATH] [--timeout S]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import create_repo
+
+BACKENDS = ("inotify", "fswatch", "qfilesystemmodel")
+
+
+def run_backend(backend, repo, nof_changes, timeout, quiet=1.0):
+    """Measure given backend in this process, prints one line of results"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QEventLoop
+    from PyQt5.QtWidgets import QApplication
+    from gitover.fswatcher import FsWatcher, RepoTracker
+    from gitover.inotify import InotifyWatcher
+
+    app = QApplication(sys.argv[:1])
+    if backend == "inotify" and not InotifyWatcher.supported():
+        print("{:<20} not supported".format(backend))
+        return
+    if backend == "fswatch" and not FsWatcher.supported():
+        print("{:<20} not supported".format(backend))
+        return
+    if backend == "qfilesystemmodel":
+        FsWatcher._is_supported = False
+
+    def process_events(seconds, done=lambda: False):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end and not done():
+            app.processEvents(QEventLoop.AllEvents, 50)
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    watcher = InotifyWatcher() if backend == "inotify" else None
+    tracker = RepoTracker(repo, watcher)
+    if backend == "qfilesystemmodel":
+        # directories get loaded in the background, wait until no more directory got loaded
+        last = [time.perf_counter()]
+        loaded = []
+
+        def onLoaded(path):
+            loaded.append(path)
+            last[0] = time.perf_counter()
+            if last[0] - start > timeout:
+                tracker._fsRoot.directoryLoaded.disconnect()  # stop loading more directories
+
+        tracker._fsRoot.directoryLoaded.connect(onLoaded)
+        process_events(timeout, lambda: time.perf_counter() - last[0] > quiet)
+        setup = last[0] - start
+        if setup > timeout:
+            print("{:<20} setup not done after {:.0f}s, {} directories loaded".format(
+                backend, timeout, len(loaded)))
+            return
+    else:
+        setup = time.perf_counter() - start
+        process_events(quiet)
+    memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024.0
+
+    changed = set()
+    tracker.repoChanged.connect(lambda _, path, facets: changed.add(path))
+    dirs = sorted(d for d in os.listdir(repo) if d.startswith("dir"))
+    paths = []
+    for idx in range(nof_changes):
+        dir = os.path.join(repo, dirs[idx * len(dirs) // nof_changes])
+        paths.append(os.path.join(dir, sorted(os.listdir(dir))[0]))
+    start = time.perf_counter()
+    for path in paths:
+        with open(path, "a") as f:
+            f.write("changed\n")
+    process_events(timeout, lambda: changed.issuperset(paths))
+    latency = time.perf_counter() - start
+    missed = len(set(paths) - changed)
+    tracker.stop()
+
+    print("{:<20} setup {:9.2f}ms  memory {:7.1f}MiB  changes reported after {:9.2f}ms"
+          "  missed {}/{}".format(backend, setup * 1000, memory, latency * 1000, missed,
+                                  nof_changes))
+    app.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[-1])
+    parser.add_argument("--files", type=int, default=100000, help="number of files in tree")
+    parser.add_argument("--changes", type=int, default=100, help="number of changed files")
+    parser.add_argument("--repo", help="existing repository created by an earlier run")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait per phase")
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.repo, args.changes, args.timeout)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = args.repo
+        if not repo:
+            print("Creating repository with {} files...".format(args.files))
+            repo = create_repo(os.path.join(tmpdir, "repo"), args.files)
+        for backend in BACKENDS:
+            subprocess.call([sys.executable, __file__, "--backend", backend, "--repo", repo,
+                             "--changes", str(args.changes), "--timeout", str(args.timeout)])
+
+
+if __name__ == "__main__":
+    main()
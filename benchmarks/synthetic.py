@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Helpers to create synthetic repositories for benchmarks.
+"""
+import os
+import subprocess
+import time
+
+
+def git(cwd, *args):
+    """Run git command in given directory, returns its output"""
+    env = dict(os.environ,
+               GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@localhost",
+               GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@localhost")
+    return subprocess.check_output(["git"] + list(args), cwd=cwd, env=env).decode("utf-8")
+
+
+def create_repo(path, nof_files, files_per_dir=100):
+    """Create repository at given path with one commit of given number of files"""
+    os.makedirs(path, exist_ok=True)
+    git(path, "init", "-q")
+    for idx in range(nof_files):
+        subdir = os.path.join(path, "dir{:04d}".format(idx // files_per_dir))
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, "file{:06d}.txt".format(idx)), "w") as f:
+            f.write("content {}\n".format(idx))
+    git(path, "add", "-A")
+    git(path, "commit", "-q", "-m", "initial")
+    return path
+
+
+def create_history(path, nof_commits, files_per_commit=3):
+    """Append given number of commits, each touching some files, to repository at given path"""
+    for idx in range(nof_commits):
+        for fidx in range(files_per_commit):
+            name = os.path.join(path, "history{:02d}.txt".format(fidx))
+            with open(name, "a") as f:
+                f.write("commit {} line {}\n".format(idx, fidx))
+        git(path, "add", "-A")
+        git(path, "commit", "-q", "-m", "commit {}".format(idx))
+    return path
+
+
+def timeit(func, repeat):
+    """Returns list of durations in seconds of calling given function repeatedly"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def report(name, durations):
+    """Print summary of given durations"""
+    durations = sorted(durations)
+    print("{:<40} min {:8.2f}ms  median {:8.2f}ms  max {:8.2f}ms".format(
+        name, durations[0] * 1000, durations[len(durations) // 2] * 1000, durations[-1] * 1000))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+First come first served admission of fetches with limits per remote host.
+"""
+import logging
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+LOGGER = logging.getLogger(__name__)
+
+SCP_LIKE_URL = re.compile(r"^(?:[^@/]+@)?(?P<host>[^:/]{2,}):")
+
+
+def remote_host(url):
+    """Returns host name of given remote url or empty string for a local remote"""
+    url = (url or "").strip()
+    if "://" in url:
+        parts = urlsplit(url)
+        return "" if parts.scheme == "file" else (parts.hostname or "")
+    match = SCP_LIKE_URL.match(url)
+    return match.group("host") if match else ""
+
+
+class FetchTicket(object):
+    """Request of one fetch waiting for or holding admission"""
+
+    def __init__(self, host, callback):
+        self.host = host
+        self.callback = callback
+        self.queued = time.monotonic()
+        self.admitted = None  # monotonic time of admission, None while waiting
+        self.active = False  # whether ticket is admitted and not released yet
+
+    @property
+    def waited(self):
+        """Returns seconds the ticket waited for admission"""
+        return (self.admitted or time.monotonic()) - self.queued
+
+
+class FetchAdmission(object):
+    """
+    Admits fetches in order of request, limiting number of concurrent fetches in total and
+    per remote host. Waiting requests don't occupy any thread, the callback of a request gets
+    called as soon as it's admitted, either by the requesting or by the releasing thread.
+    A request of a busy host doesn't block requests of other hosts.
+    """
+
+    def __init__(self, maxTotal=8, maxPerHost=4):
+        self._lock = threading.Lock()
+        self._maxTotal = maxTotal
+        self._maxPerHost = maxPerHost
+        self._waiting = []
+        self._running = {}  # host -> number of admitted tickets
+
+    def setLimits(self, maxTotal, maxPerHost):
+        """Change limits, already admitted fetches are not affected"""
+        with self._lock:
+            self._maxTotal = max(1, maxTotal)
+            self._maxPerHost = max(1, maxPerHost)
+        self._admit()
+
+    def request(self, host, callback):
+        """Queue request for given host, returns FetchTicket.
+        Given callback gets called with ticket when the fetch is admitted."""
+        ticket = FetchTicket(host, callback)
+        with self._lock:
+            self._waiting.append(ticket)
+        self._admit()
+        return ticket
+
+    def release(self, ticket):
+        """Release admitted ticket or remove waiting ticket from queue"""
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                return
+            if not ticket.active:
+                return
+            ticket.active = False
+            self._running[ticket.host] -= 1
+            if not self._running[ticket.host]:
+                del self._running[ticket.host]
+        self._admit()
+
+    @property
+    def maxTotal(self):
+        """Number of fetches that may run at the same time"""
+        with self._lock:
+            return self._maxTotal
+
+    @property
+    def waiting(self):
+        """Number of waiting requests"""
+        with self._lock:
+            return len(self._waiting)
+
+    @property
+    def running(self):
+        """Number of admitted requests"""
+        with self._lock:
+            return sum(self._running.values())
+
+    def _admit(self):
+        admitted = []
+        with self._lock:
+            total = sum(self._running.values())
+            for ticket in list(self._waiting):
+                if total >= self._maxTotal:
+                    break
+                if self._running.get(ticket.host, 0) >= self._maxPerHost:
+                    continue
+                self._waiting.remove(ticket)
+                self._running[ticket.host] = self._running.get(ticket.host, 0) + 1
+                ticket.admitted = time.monotonic()
+                ticket.active = True
+                admitted.append(ticket)
+                total += 1
+        for ticket in admitted:
+            LOGGER.debug("Admitted fetch of host '{}' after {:.1f}s".format(ticket.host,
+                                                                         ticket.waited))
+            try:
+                ticket.callback(ticket)
+            except:
+                LOGGER.exception("Failed to start admitted fetch of host '{}'".format(ticket.host))
+                self.release(ticket)
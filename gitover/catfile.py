@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Read git objects through a long-lived `git cat-file --batch` process.
+"""
+import datetime
+import logging
+import queue
+import subprocess
+import threading
+from typing import NamedTuple
+
+import git
+
+LOGGER = logging.getLogger(__name__)
+
+GitObject = NamedTuple("GitObject", (("sha", str), ("type", str), ("data", bytes)))
+
+CommitInfo = NamedTuple(
+    "CommitInfo",
+    (
+        ("rev", str),
+        ("parents", list),
+        ("date", str),
+        ("user", str),
+        ("msg", str),
+    ),
+)
+
+
+def _parse_signature(value):
+    """Returns tuple of name and timezone aware datetime of given author/committer line"""
+    ident, _, when = value.rpartition(">")
+    name = ident.split("<")[0].strip()
+    timestamp, _, offset = when.strip().partition(" ")
+    sign = -1 if offset.startswith("-") else 1
+    offset = offset.lstrip("+-").rjust(4, "0")
+    delta = datetime.timedelta(hours=int(offset[:2]), minutes=int(offset[2:]))
+    tz = datetime.timezone(sign * delta)
+    return name, datetime.datetime.fromtimestamp(int(timestamp), tz)
+
+
+def parse_commit(sha, data):
+    """Returns CommitInfo of given raw commit object data"""
+    header, _, message = data.partition(b"\n\n")
+    encoding = "utf-8"
+    parents = []
+    author = committer = ""
+    for line in header.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        if key == b"encoding":
+            encoding = value.decode("ascii", errors="ignore") or encoding
+    for line in header.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        if key == b"parent":
+            parents.append(value.decode("ascii"))
+        elif key == b"author":
+            author = value.decode(encoding, errors="replace")
+        elif key == b"committer":
+            committer = value.decode(encoding, errors="replace")
+    user = _parse_signature(author)[0] if author else ""
+    date = str(_parse_signature(committer)[1]) if committer else ""
+    msg = message.decode(encoding, errors="replace").split("\n")[0].strip()
+    return CommitInfo(sha, parents, date, user, msg)
+
+
+class _Request(object):
+    def __init__(self, rev):
+        self.rev = rev
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class CatFileBatch(object):
+    """
+    Serves object reads of a repository from one `git cat-file --batch` process.
+    Requests of any thread get queued and are handled one after the other by a helper thread,
+    the process gets restarted when it died and is stopped when idle for a while.
+    """
+
+    idle_timeout = 60  # seconds without requests before process gets stopped
+    max_restarts = 1  # number of restarts per request when process died
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._thread = None
+        self._proc = None
+
+    def read(self, rev, timeout=None):
+        """Returns GitObject of given revision or None when it doesn't exist.
+        Raises exception when reading failed."""
+        request = _Request(rev)
+        with self._lock:
+            self._requests.put(request)
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, name="catfile", daemon=True)
+                self._thread.start()
+        if not request.done.wait(timeout):
+            raise TimeoutError("Timeout reading {} in {}".format(rev, self._path))
+        if request.error:
+            raise request.error
+        return request.result
+
+    def commit(self, rev, timeout=None):
+        """Returns CommitInfo of given revision or None when it is not a commit"""
+        obj = self.read(rev, timeout)
+        if not obj or obj.type != "commit":
+            return None
+        return parse_commit(obj.sha, obj.data)
+
+    def stop(self):
+        """Stop process, it gets restarted on next request"""
+        with self._lock:
+            if self._thread:
+                self._requests.put(None)
+
+    def _run(self):
+        while True:
+            try:
+                request = self._requests.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                request = None
+            if request is None:
+                with self._lock:
+                    if self._requests.empty():
+                        self._thread = None
+                        self._stopProcess()
+                        return
+                continue
+            for attempt in range(self.max_restarts + 1):
+                try:
+                    request.result = self._read(request.rev)
+                    request.error = None
+                    break
+                except (OSError, ValueError, EOFError) as e:
+                    LOGGER.warning("cat-file failed in {}: {!r}".format(self._path, e))
+                    request.error = e
+                    self._stopProcess()
+            request.done.set()
+
+    def _startProcess(self):
+        if self._proc and self._proc.poll() is None:
+            return
+        LOGGER.debug("Starting cat-file for {}".format(self._path))
+        self._proc = subprocess.Popen(
+            [git.Git.GIT_PYTHON_GIT_EXECUTABLE, "cat-file", "--batch"],
+            cwd=self._path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _stopProcess(self):
+        if not self._proc:
+            return
+        LOGGER.debug("Stopping cat-file for {}".format(self._path))
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(1)
+        except Exception:
+            self._proc.kill()
+        self._proc = None
+
+    def _read(self, rev):
+        self._startProcess()
+        self._proc.stdin.write(rev.encode("utf-8") + b"\n")
+        self._proc.stdin.flush()
+        header = self._proc.stdout.readline()
+        if not header:
+            raise EOFError("cat-file terminated")
+        fields = header.decode("utf-8").split()
+        if len(fields) != 3:
+            return None  # "<rev> missing" or "<rev> ambiguous"
+        sha, type, size = fields
+        data = self._proc.stdout.read(int(size))
+        self._proc.stdout.read(1)  # trailing newline
+        return GitObject(sha, type, data)
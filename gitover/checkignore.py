@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Answer whether paths are ignored through a long-lived `git check-ignore --stdin` process.
+"""
+import collections
+import logging
+import os
+import queue
+import subprocess
+import threading
+
+import git
+
+LOGGER = logging.getLogger(__name__)
+
+NUL = b"\0"
+
+FIELDS = 4  # source, line number, pattern and path of every answer of --verbose -z
+
+
+class _Request(object):
+    def __init__(self, paths):
+        self.paths = paths
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class CheckIgnoreBatch(object):
+    """
+    Serves ignore checks of a repository from one `git check-ignore --stdin` process.
+    Requests of any thread get queued and are handled one after the other by a helper thread,
+    the process gets restarted when it died and is stopped when idle for a while.
+    Answers are cached, call invalidate() after an ignore file changed.
+    """
+
+    idle_timeout = 60  # seconds without requests before process gets stopped
+    max_restarts = 1  # number of restarts per request when process died
+    cache_size = 10000  # number of paths with cached answer
+    chunk_size = 200  # number of paths written before reading their answers
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._thread = None
+        self._proc = None
+        self._buffer = bytearray()
+        self._cache = collections.OrderedDict()  # key: path, value: whether path is ignored
+        self._generation = 0  # incremented by invalidate(), answers of older processes are stale
+        self.hits = 0
+        self.misses = 0
+
+    def ignored(self, paths, timeout=None):
+        """Returns set of given paths that are ignored.
+        Raises exception when checking failed."""
+        result = set()
+        unknown = []
+        with self._lock:
+            for path in paths:
+                if path in self._cache:
+                    self._cache.move_to_end(path)
+                    if self._cache[path]:
+                        result.add(path)
+                else:
+                    unknown.append(path)
+            self.hits += len(paths) - len(unknown)
+            self.misses += len(unknown)
+            if not unknown:
+                return result
+            generation = self._generation
+            request = _Request(unknown)
+            self._requests.put(request)
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, name="checkignore", daemon=True)
+                self._thread.start()
+        if not request.done.wait(timeout):
+            raise TimeoutError("Timeout checking ignored paths in {}".format(self._path))
+        if request.error:
+            raise request.error
+        with self._lock:
+            if generation == self._generation:
+                for path, ignored in zip(unknown, request.result):
+                    self._cache[path] = ignored
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        result.update(path for path, ignored in zip(unknown, request.result) if ignored)
+        return result
+
+    def isIgnored(self, path, timeout=None):
+        """Returns true when given path is ignored"""
+        return bool(self.ignored([path], timeout))
+
+    def invalidate(self):
+        """Forget cached answers and restart process, e.g. after a .gitignore changed"""
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+            if self._thread:
+                self._requests.put(False)
+
+    def stop(self):
+        """Stop process, it gets restarted on next request"""
+        with self._lock:
+            if self._thread:
+                self._requests.put(None)
+
+    def _run(self):
+        while True:
+            try:
+                request = self._requests.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                request = None
+            if request is False:
+                self._stopProcess()  # process caches ignore files, start a new one
+                continue
+            if request is None:
+                with self._lock:
+                    if self._requests.empty():
+                        self._thread = None
+                        self._stopProcess()
+                        return
+                continue
+            for attempt in range(self.max_restarts + 1):
+                try:
+                    request.result = self._check(request.paths)
+                    request.error = None
+                    break
+                except (OSError, ValueError, EOFError) as e:
+                    LOGGER.warning("check-ignore failed in {}: {!r}".format(self._path, e))
+                    request.error = e
+                    self._stopProcess()
+            request.done.set()
+
+    def _startProcess(self):
+        if self._proc and self._proc.poll() is None:
+            return
+        LOGGER.debug("Starting check-ignore for {}".format(self._path))
+        self._buffer = bytearray()
+        self._proc = subprocess.Popen(
+            [git.Git.GIT_PYTHON_GIT_EXECUTABLE, "check-ignore", "--stdin", "-z",
+             "--non-matching", "--verbose"],
+            cwd=self._path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _stopProcess(self):
+        if not self._proc:
+            return
+        LOGGER.debug("Stopping check-ignore for {}".format(self._path))
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(1)
+        except Exception:
+            self._proc.kill()
+        self._proc = None
+
+    def _check(self, paths):
+        """Returns list of booleans, whether the path at same index is ignored"""
+        self._startProcess()
+        result = []
+        for start in range(0, len(paths), self.chunk_size):
+            chunk = paths[start:start + self.chunk_size]
+            self._proc.stdin.write(b"".join(os.fsencode(path) + NUL for path in chunk))
+            self._proc.stdin.flush()
+            for _ in chunk:
+                source, _, pattern, _ = (self._readField() for _ in range(FIELDS))
+                # a matching negated pattern re-includes the path
+                result.append(bool(source) and not pattern.startswith(b"!"))
+        return result
+
+    def _readField(self):
+        while True:
+            end = self._buffer.find(NUL)
+            if end != -1:
+                field = bytes(self._buffer[:end])
+                del self._buffer[:end + 1]
+                return field
+            data = self._proc.stdout.read1(64 * 1024)
+            if not data:
+                raise EOFError("check-ignore terminated")
+            self._buffer += data
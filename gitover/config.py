@@ -53,6 +53,21 @@ class Config(object):
         general["git"] = general.get("git", "")
         general["fswatch"] = general.get("fswatch", "fswatch")
         general["fswatch-singleton"] = self.to_bool(general.get("fswatch-singleton", "yes"))
+        general["inotify"] = self.to_bool(general.get("inotify", "yes"))
+        general["network-concurrency"] = int(general.get("network-concurrency", 1))
+        general["read-concurrency"] = int(general.get("read-concurrency", 2))
+        general["write-concurrency"] = int(general.get("write-concurrency", 1))
+        general["fetch-concurrency"] = int(general.get("fetch-concurrency", 8))
+        general["fetch-host-concurrency"] = int(general.get("fetch-host-concurrency", 4))
+        general["network-timeout"] = int(general.get("network-timeout", 1800))
+        general["network-inactivity-timeout"] = int(general.get("network-inactivity-timeout", 300))
+        general["ssh-multiplexing"] = self.to_bool(general.get("ssh-multiplexing", "yes"))
+        general["ssh-control-persist"] = int(general.get("ssh-control-persist", 60))
+        general["fetch-probe"] = self.to_bool(general.get("fetch-probe", "yes"))
+        general["fetch-interval"] = int(general.get("fetch-interval", 900))
+        general["fetch-max-interval"] = int(general.get("fetch-max-interval", 4 * 3600))
+        general["fetch-jitter"] = float(general.get("fetch-jitter", 0.1))
+        general["fetch-submodule-jobs"] = int(general.get("fetch-submodule-jobs", 0))
         return general
 
     def _init_tool(self, tool):
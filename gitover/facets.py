@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Facets of a repository status, and which facets a change of a path touches.
+"""
+import os
+
+FACET_WORKTREE = "worktree"  # files of the working tree
+FACET_INDEX = "index"  # staging area
+FACET_HEAD = "head"  # current branch or detached commit
+FACET_LOCAL_REFS = "local-refs"  # local branches and tags
+FACET_REMOTE_REFS = "remote-refs"  # remote tracking branches
+FACET_CONFIG = "config"  # repository configuration, e.g. upstream branches
+FACET_STASH = "stash"  # stashed changes
+
+ALL_FACETS = frozenset((
+    FACET_WORKTREE, FACET_INDEX, FACET_HEAD, FACET_LOCAL_REFS, FACET_REMOTE_REFS, FACET_CONFIG,
+    FACET_STASH,
+))
+
+# facets of refs below refs/ and logs/refs/ by their first path component
+_REF_FACETS = {
+    "heads": FACET_LOCAL_REFS,
+    "tags": FACET_LOCAL_REFS,
+    "remotes": FACET_REMOTE_REFS,
+    "stash": FACET_STASH,
+}
+
+# facets of files within the git directory
+_GIT_FILE_FACETS = {
+    "index": FACET_INDEX,
+    "HEAD": FACET_HEAD,
+    "config": FACET_CONFIG,
+    "config.worktree": FACET_CONFIG,
+    "FETCH_HEAD": FACET_REMOTE_REFS,
+}
+
+
+def _gitFacets(rel):
+    parts = rel.split(os.sep)
+    if parts[0] == "logs":
+        parts = parts[1:]
+        if parts == ["HEAD"]:
+            return frozenset((FACET_HEAD,))
+    if len(parts) >= 2 and parts[0] == "refs":
+        return frozenset((_REF_FACETS.get(parts[1], FACET_LOCAL_REFS),))
+    if len(parts) == 1:
+        name = parts[0]
+        if name.startswith("sharedindex."):
+            return frozenset((FACET_INDEX,))
+        if name.startswith("packed-refs"):
+            return frozenset((FACET_LOCAL_REFS,))  # including temporary packed-refs.new
+        if name in _GIT_FILE_FACETS:
+            return frozenset((_GIT_FILE_FACETS[name],))
+    return None
+
+
+def classify_path(path, working_dir, git_dir, common_dir=None):
+    """Returns frozenset of facets touched by a change of given absolute path,
+    all facets when the change can't be classified, e.g. a merge or rebase in progress"""
+    for dir in (git_dir, common_dir or git_dir):
+        if path.startswith(dir + os.sep):
+            return _gitFacets(path[len(dir) + 1:]) or ALL_FACETS
+    if path.startswith(working_dir + os.sep):
+        return frozenset((FACET_WORKTREE,))
+    return ALL_FACETS
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Due times of periodic fetches with jitter, backoff and stretching.
+"""
+import random
+import time
+
+# outcomes of a fetch
+FETCH_CHANGED = "changed"  # fetch updated refs or it's unknown whether it did
+FETCH_UNCHANGED = "unchanged"  # remote refs were unchanged, fetch got skipped
+FETCH_FAILED = "failed"  # remote is unreachable or fetch failed otherwise
+FETCH_NO_REMOTE = "no-remote"  # repository has no remote to fetch from
+
+
+class FetchSchedule(object):
+    """
+    Due time of next periodic fetch of a repository. The interval gets doubled for every
+    failed fetch in a row and stretched by half for every fetch in a row that found the remote
+    unchanged, both limited by a maximum interval. Every delay gets a random jitter to spread
+    fetches of many repositories. A repository without remote gets no periodic fetches until
+    a fetch finds one.
+    """
+
+    def __init__(self, interval, maxInterval, jitter=0.1, clock=time.monotonic):
+        self.interval = interval  # seconds between fetches, zero disables periodic fetches
+        self.maxInterval = max(interval, maxInterval)
+        self.jitter = jitter  # fraction of delay
+        self.failures = 0  # number of failed fetches in a row
+        self.unchanged = 0  # number of fetches in a row that found remote unchanged
+        self._clock = clock
+        self.due = self._clock() + self.delay() if interval > 0 else None
+
+    def delay(self):
+        """Returns seconds until next fetch"""
+        if self.failures:
+            delay = self.interval * 2 ** min(self.failures, 16)
+        else:
+            delay = self.interval * (1 + 0.5 * self.unchanged)
+        delay = min(delay, self.maxInterval)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def isDue(self, now=None):
+        return self.due is not None and (self._clock() if now is None else now) >= self.due
+
+    def started(self):
+        """Fetch started, no further fetch is due until it's done"""
+        self.due = None
+
+    def done(self, outcome):
+        """Fetch is done with given outcome, one of FETCH_CHANGED, FETCH_UNCHANGED, FETCH_FAILED
+        or FETCH_NO_REMOTE"""
+        if outcome == FETCH_NO_REMOTE:
+            self.due = None
+            return
+        if outcome == FETCH_FAILED:
+            self.failures += 1
+        else:
+            self.failures = 0
+            self.unchanged = self.unchanged + 1 if outcome == FETCH_UNCHANGED else 0
+        if self.interval > 0:
+            self.due = self._clock() + self.delay()
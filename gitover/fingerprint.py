@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Cheap fingerprints of files within a repository to detect changes without running git.
+"""
+import os
+import time
+
+
+def stat_fingerprint(path):
+    """Returns tuple of modification time, size and inode of given path
+    or None when path doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def tree_fingerprint(path):
+    """Returns tuple of fingerprints of given directory and all its sub directories.
+    Git writes loose refs by renaming a lock file, therefore any creation, update or removal
+    of a loose ref changes the modification time of its directory."""
+    fingerprints = []
+    pending = [path]
+    while pending:
+        dir = pending.pop()
+        fingerprint = stat_fingerprint(dir)
+        if fingerprint is None:
+            continue
+        fingerprints.append((dir, fingerprint))
+        try:
+            with os.scandir(dir) as it:
+                pending += [e.path for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            pass
+    fingerprints.sort()
+    return tuple(fingerprints)
+
+
+def refs_fingerprint(common_dir, refs="refs"):
+    """Returns fingerprint of packed refs and loose refs below given refs directory"""
+    return (
+        stat_fingerprint(os.path.join(common_dir, "packed-refs")),
+        tree_fingerprint(os.path.join(common_dir, refs)),
+    )
+
+
+RACY_NS = 2 * 1000 * 1000 * 1000
+
+
+def racy(fingerprint, now_ns=None):
+    """Returns true when any modification time within given fingerprint is too recent
+    to rely on, i.e. another change within the same filesystem timestamp granularity
+    would not be detectable"""
+    now_ns = now_ns or time.time_ns()
+    if isinstance(fingerprint, tuple):
+        if len(fingerprint) == 3 and all(isinstance(v, int) for v in fingerprint):
+            return now_ns - fingerprint[0] < RACY_NS
+        return any(racy(f, now_ns) for f in fingerprint)
+    return False
+
+
+class RepoFingerprint(object):
+    """
+    Fingerprint of the files that decide the status of a repository, i.e. HEAD, index,
+    refs and those paths of the working tree that were dirty when the status was taken.
+    """
+
+    def __init__(self, working_dir, git_dir, common_dir):
+        self.working_dir = working_dir
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self.git = self._gitFingerprint()
+        self.paths = {}  # key: absolute path of dirty path, value: its stat fingerprint
+
+    def _gitFingerprint(self):
+        return (
+            stat_fingerprint(os.path.join(self.git_dir, "HEAD")),
+            stat_fingerprint(os.path.join(self.git_dir, "index")),
+            refs_fingerprint(self.common_dir),
+        )
+
+    def addPaths(self, paths):
+        """Add fingerprints of given paths relative to working directory"""
+        for path in paths:
+            path = os.path.join(self.working_dir, path)
+            self.paths[path] = stat_fingerprint(path)
+
+    def covers(self, path):
+        """Returns true when a change of given absolute path is detectable by this fingerprint"""
+        if path in self.paths:
+            return True
+        for dir in (self.git_dir, self.common_dir):
+            if path.startswith(dir + os.sep):
+                rel = path[len(dir) + 1:]
+                if rel in ("HEAD", "index", "packed-refs"):
+                    return True
+                if rel.split(os.sep)[0] in ("refs", "logs"):
+                    return True
+        return False
+
+    def racy(self):
+        """Returns true when fingerprint can't be relied on, see racy()"""
+        return racy((self.git, tuple(self.paths.values())))
+
+    def unchanged(self):
+        """Returns true when all fingerprinted files are still the same"""
+        if self._gitFingerprint() != self.git:
+            return False
+        return all(stat_fingerprint(p) == f for p, f in self.paths.items())
+
+    def toJson(self):
+        """Returns fingerprint as JSON serializable dictionary"""
+        return dict(
+            working_dir=self.working_dir,
+            git_dir=self.git_dir,
+            common_dir=self.common_dir,
+            git=self.git,
+            paths=self.paths,
+        )
+
+    @classmethod
+    def fromJson(cls, data):
+        """Returns fingerprint from dictionary as returned by toJson()"""
+        fingerprint = cls.__new__(cls)
+        fingerprint.working_dir = data["working_dir"]
+        fingerprint.git_dir = data["git_dir"]
+        fingerprint.common_dir = data["common_dir"]
+        fingerprint.git = _tuples(data["git"])
+        fingerprint.paths = {p: _tuples(f) for p, f in data["paths"].items()}
+        return fingerprint
+
+
+def _tuples(value):
+    """Returns given value with all lists converted to tuples, i.e. reverts JSON serialization"""
+    if isinstance(value, list):
+        return tuple(_tuples(v) for v in value)
+    return value
@@ -11,7 +11,11 @@ from PyQt5.QtCore import pyqtSignal, pyqtSlot
 from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QFileSystemModel
 
+from gitover.checkignore import CheckIgnoreBatch
 from gitover.config import Config
+from gitover.facets import ALL_FACETS, classify_path
+from gitover.inotify import InotifyWatcher
+from gitover.utils import PathTrie
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,8 +27,9 @@ class RepoFsWatcher(QObject):
     # use signal to stop tracking given repository directory
     untrack = pyqtSignal(str)
 
-    # signal gets emitted when content of given repository directory has changed
-    repoChanged = pyqtSignal(str)
+    # signal gets emitted when content of given repository directory has changed,
+    # passing the list of changed paths and the list of changed facets, see gitover.facets
+    repoChanged = pyqtSignal(str, list, list)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -32,7 +37,8 @@ class RepoFsWatcher(QObject):
         self.track.connect(self.startTracking)
         self.untrack.connect(self.stopTracking)
 
-        self._changes = set()
+        self._changes = {}  # key: repository directory, value: set of changed paths
+        self._facets = {}  # key: repository directory, value: set of changed facets
         self._flushChangesTimer = QTimer(self)
         self._flushChangesTimer.setInterval(1000)
         self._flushChangesTimer.setSingleShot(True)
@@ -41,7 +47,10 @@ class RepoFsWatcher(QObject):
         cfg = Config()
         cfg.load(os.path.expanduser("~"))
         fswatch_root_path_only = cfg.general()["fswatch-singleton"]
-        if fswatch_root_path_only and FsWatcher.supported():
+        if cfg.general()["inotify"] and InotifyWatcher.supported():
+            # one inotify instance watches all repositories, without an external process
+            self._fswatcher = InotifyWatcher(self)
+        elif fswatch_root_path_only and FsWatcher.supported():
             self._fswatcher = FsWatcher("/", self)
         else:
             self._fswatcher = None
@@ -54,15 +63,17 @@ class RepoFsWatcher(QObject):
         if self._fswatcher:
             self._fswatcher.track(path)
 
-    def _onRepoChanged(self, path):
-        self._changes.add(path)
+    def _onRepoChanged(self, path, changedPath, facets):
+        self._changes.setdefault(path, set()).add(changedPath)
+        self._facets.setdefault(path, set()).update(facets)
         self._flushChangesTimer.start()
 
     def _onFlushChanges(self):
-        for path in self._changes:
+        for path, changedPaths in self._changes.items():
             LOGGER.info("Repo changed {}".format(path))
-            self.repoChanged.emit(path)
-        self._changes = set()
+            self.repoChanged.emit(path, sorted(changedPaths), sorted(self._facets[path]))
+        self._changes = {}
+        self._facets = {}
 
     @pyqtSlot(str)
     def stopTracking(self, path=""):
@@ -76,8 +87,9 @@ class RepoFsWatcher(QObject):
 
 
 class RepoTracker(QObject):
-    # signal gets emitted when content of repository has changed
-    repoChanged = pyqtSignal(str)
+    # signal gets emitted when content of repository has changed,
+    # passing the changed path and the list of facets it changed
+    repoChanged = pyqtSignal(str, str, list)
 
     def __init__(self, path, fswatcher=None, parent=None):
         super().__init__(parent)
@@ -87,6 +99,11 @@ class RepoTracker(QObject):
         repo = git.Repo(self._path)
         self._working_dir = repo.working_dir
         self._git_dir = repo.git_dir
+        self._common_dir = repo.common_dir
+        self._exclude_file = os.path.join(self._common_dir, "info", "exclude")
+        self._gitmodules = os.path.join(self._working_dir, ".gitmodules")
+        self._submodule_roots = None  # cached absolute paths of submodules
+        self._checkIgnore = CheckIgnoreBatch(self._working_dir)
         distinct_git_dir = not (self._git_dir + os.sep).startswith(self._working_dir)
         self._initial_mtime = time.time()
         self._mods = {}
@@ -96,6 +113,8 @@ class RepoTracker(QObject):
         if fswatcher:
             self._fsRoot = fswatcher
             self._fsRoot.pathChanged.connect(self._update)
+            if isinstance(fswatcher, InotifyWatcher):
+                fswatcher.overflow.connect(self._onOverflow)
             self._fsRoot.track(self._working_dir)
         elif FsWatcher.supported():
             self._fsRoot = FsWatcher(self._working_dir, self)
@@ -123,12 +142,13 @@ class RepoTracker(QObject):
         return self._path
 
     def stop(self):
-        if isinstance(self._fsRoot, FsWatcher):
+        self._checkIgnore.stop()
+        if isinstance(self._fsRoot, (FsWatcher, InotifyWatcher)):
             self._fsRoot.untrack(self._working_dir)
             if self._fsStop:
                 self._fsRoot.stop()
 
-        if isinstance(self._fsGit, FsWatcher):
+        if isinstance(self._fsGit, (FsWatcher, InotifyWatcher)):
             self._fsGit.untrack(self._git_dir)
             if self._fsStop:
                 self._fsGit.stop()
@@ -145,6 +165,7 @@ class RepoTracker(QObject):
     @pyqtSlot(str)
     def _update(self, path):
         try:
+            self._invalidate(path)
             if os.path.exists(path):
                 old_mtime = self._mods.get(path, 0)
                 new_mtime = os.stat(path).st_mtime
@@ -156,10 +177,16 @@ class RepoTracker(QObject):
             if path:
                 if not self.ignored(path) and not self.discarded(path):
                     LOGGER.info("Changed ({}): {}".format(self._name, path))
-                    self.repoChanged.emit(self._path)
+                    self.repoChanged.emit(self._path, path, sorted(self.facets(path)))
         except Exception as e:
             LOGGER.error("Failed to update mtime '{}': {}".format(path, e))
 
+    @pyqtSlot()
+    def _onOverflow(self):
+        # changes might have been missed, report the repository itself to update its status
+        LOGGER.info("Changed ({}): events lost".format(self._name))
+        self.repoChanged.emit(self._path, self._working_dir, sorted(ALL_FACETS))
+
     def _onRootDirLoaded(self, path):
         self._onDirLoaded(self._fsRoot, path)
 
@@ -169,15 +196,13 @@ class RepoTracker(QObject):
     def _onDirLoaded(self, fs, path):
         if self.ignored(path):
             return
-        repo = None
         idx = fs.index(path)
         LOGGER.info("Tracking ({}): {}".format(self._name, path))
         self._update(path)
         for r in range(fs.rowCount(idx)):
-            repo = repo or git.Repo(self._working_dir)
             childidx = fs.index(r, 0, idx)
             childpath = fs.filePath(childidx)
-            if fs.canFetchMore(childidx) and not self.ignored(childpath, repo):
+            if fs.canFetchMore(childidx) and not self.ignored(childpath):
                 fs.fetchMore(childidx)
             self._update(childpath)
 
@@ -192,9 +217,34 @@ class RepoTracker(QObject):
             idx = fs.index(r, 0, parent)
             path = fs.filePath(idx)
             LOGGER.info("Removed ({}): {}".format(self._name, path))
+            self._invalidate(path)
             self._mods.pop(path, None)
             if not self.ignored(path) and not self.discarded(path):
-                self.repoChanged.emit(self._path)
+                self.repoChanged.emit(self._path, path, sorted(self.facets(path)))
+
+    def _invalidate(self, path):
+        """Forget cached ignore answers or submodules when given changed path affects them"""
+        if path == self._exclude_file or (
+            os.path.basename(path) == ".gitignore" and path.startswith(self._working_dir + os.sep)
+        ):
+            LOGGER.debug("Ignore rules changed ({}): {}".format(self._name, path))
+            self._checkIgnore.invalidate()
+        elif path == self._gitmodules:
+            self._submodule_roots = None
+
+    def submoduleRoots(self):
+        """Returns list of absolute paths of submodules, cached until .gitmodules changes"""
+        if self._submodule_roots is None:
+            try:
+                self._submodule_roots = [r.abspath for r in git.Repo(self._working_dir).submodules]
+            except:
+                LOGGER.exception("Failed to read submodules of {}".format(self._working_dir))
+                self._submodule_roots = []
+        return self._submodule_roots
+
+    def facets(self, path):
+        """Returns set of facets of the repository that a change of given path touches"""
+        return classify_path(path, self._working_dir, self._git_dir, self._common_dir)
 
     def discarded(self, path):
         """Returns true when changes to given path are discarded"""
@@ -205,7 +255,7 @@ class RepoTracker(QObject):
             return True
         return False
 
-    def ignored(self, path, repo=None):
+    def ignored(self, path):
         """Returns true when given path is not part of given repository"""
         name = os.path.basename(path)
         ext = os.path.splitext(name)[1]
@@ -215,10 +265,9 @@ class RepoTracker(QObject):
         if path in (self._working_dir, self._git_dir):
             return False
 
-        if os.path.isdir(path) and path.endswith(os.sep + "objects"):
-            inside_git_dir = git.Git(path).rev_parse(is_inside_git_dir=True) == "true"
-            if inside_git_dir:
-                return True
+        if path.endswith(os.sep + "objects") and os.path.isdir(path):
+            if os.path.isfile(os.path.join(os.path.dirname(path), "HEAD")):
+                return True  # object database of a git directory
 
         isWithinGit = path.startswith(self._git_dir + os.sep)
         isWithinWork = path.startswith(self._working_dir + os.sep)
@@ -247,16 +296,17 @@ class RepoTracker(QObject):
             if gitRelPath == "sourcetreeconfig":
                 return True  # discard SourceTree configuration
 
-        repo = repo or git.Repo(self._working_dir)
-        submodulRoots = [r.abspath for r in repo.submodules]
+        submodulRoots = self.submoduleRoots()
         isSubmodule = [r for r in submodulRoots if path == r or path.startswith(r + os.sep)]
         if isSubmodule:
             return True  # path is part of submodule
 
         if not isWithinGit:
-            ignored = repo.git.check_ignore(path, with_exceptions=False).strip()
-            if ignored:
-                return True  # path is ignored in current repository
+            try:
+                if self._checkIgnore.isIgnored(path, timeout=10):
+                    return True  # path is ignored in current repository
+            except Exception as e:
+                LOGGER.warning("Failed to check whether {} is ignored: {!r}".format(path, e))
 
         return False
 
@@ -264,6 +314,40 @@ class RepoTracker(QObject):
 NUL = b"\0"
 
 
+class NulSplitter(object):
+    """
+    Split a stream of NUL terminated paths, fed in chunks of any size.
+    Complete paths get split off in one pass over the chunk, the incomplete remainder is kept
+    for the next chunk up to `maxPending` bytes, longer remainders are dropped.
+    """
+
+    maxPending = 64 * 1024  # way beyond PATH_MAX
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    @property
+    def pending(self):
+        """Number of buffered bytes of an incomplete path"""
+        return len(self._buffer)
+
+    def feed(self, data):
+        """Returns list of complete paths of given chunk and previous remainder,
+        without duplicates and in order of their first appearance"""
+        self._buffer += data
+        end = self._buffer.rfind(NUL)
+        if end == -1:
+            if len(self._buffer) > self.maxPending:
+                LOGGER.warning("Dropping {} bytes without NUL".format(len(self._buffer)))
+                del self._buffer[:]
+            return []
+        with memoryview(self._buffer) as view:
+            records = dict.fromkeys(bytes(view[:end]).split(NUL))
+        del self._buffer[:end + 1]
+        records.pop(b"", None)
+        return [os.fsdecode(record) for record in records]
+
+
 class FsWatcher(QProcess):
     # signal gets emitted when path changed ( created, modified or deleted )
     pathChanged = pyqtSignal(str)
@@ -297,8 +381,8 @@ class FsWatcher(QProcess):
         self._triggerStop.connect(self._stop)
         self._running = False
         self._path = path
-        self._tracked_paths = set()
-        self._buffer = bytes()
+        self._tracked_paths = PathTrie()
+        self._splitter = NulSplitter()
         self.setWorkingDirectory(self._path)
         self.readyReadStandardError.connect(self._onStderr)
         self.readyReadStandardOutput.connect(self._onStdout)
@@ -346,12 +430,7 @@ class FsWatcher(QProcess):
     def isTracked(self, path):
         if not self._tracked_paths:
             return True
-        for p in self._tracked_paths:
-            if p == path:
-                return True
-            if path.startswith(p + "/"):
-                return True
-        return False
+        return self._tracked_paths.lookup(path)[0] is not None
 
     def stop(self):
         if self._running:
@@ -364,12 +443,7 @@ class FsWatcher(QProcess):
     @pyqtSlot()
     def _onStdout(self):
         """Handle output of `fswatch`, changed paths separated by NUL byte."""
-        paths = set()
-        self._buffer += bytes(self.readAllStandardOutput())
-        while NUL in self._buffer:
-            path, self._buffer = self._buffer.split(NUL, maxsplit=1)
-            paths.add(path.decode("utf-8"))
-        for path in paths:
+        for path in self._splitter.feed(bytes(self.readAllStandardOutput())):
             if self.isTracked(path):
                 LOGGER.debug("Change of {} in {}".format(path, self._path))
                 self.pathChanged.emit(path)
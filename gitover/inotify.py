@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Watch directory trees for changes through Linux inotify, without an external process.
+"""
+import collections
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+import sys
+
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer
+from PyQt5.QtCore import pyqtSignal, pyqtSlot
+
+from gitover.utils import PathTrie
+
+LOGGER = logging.getLogger(__name__)
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+# changes of files are reported once written completely, not for every single write
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+)
+
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len of struct inotify_event
+
+READ_SIZE = 256 * 1024
+
+# directories not worth a watch, changes within them never change the status of a repository
+SKIPPED_DIRS = ("__pycache__",)
+
+Event = collections.namedtuple("Event", ("wd", "mask", "cookie", "name"))
+
+_libc = None
+
+
+def _load():
+    """Returns libc with inotify functions or None when inotify isn't available"""
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                libc.inotify_init1.argtypes = (ctypes.c_int,)
+                libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+                libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+                _libc = libc
+            except (OSError, AttributeError) as e:
+                LOGGER.info("Inotify is not supported: {}".format(e))
+    return _libc or None
+
+
+def _error(what, path=""):
+    code = ctypes.get_errno()
+    return OSError(code, "{}: {}".format(what, os.strerror(code)), path or None)
+
+
+def parse_events(data):
+    """Yield Event of every inotify_event in given bytes as returned by reading inotify"""
+    offset = 0
+    size = len(data)
+    while offset + EVENT.size <= size:
+        wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        name = bytes(data[offset:offset + length]).rstrip(b"\0")
+        offset += length
+        yield Event(wd, mask, cookie, os.fsdecode(name))
+
+
+def max_user_watches():
+    """Returns number of watches a user may create or 0 when unknown"""
+    try:
+        with open("/proc/sys/fs/inotify/max_user_watches") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return 0
+
+
+class InotifyWatcher(QObject):
+    """
+    Watch directory trees recursively with one inotify instance.
+    Events are read in batches, changed paths get emitted once per batch.
+    When the watches of the user are exhausted, the git directories and the directories near
+    the roots of the tracked trees are watched, the remaining ones are retried once watches
+    get released.
+    """
+
+    # signal gets emitted when path changed ( created, modified or deleted )
+    pathChanged = pyqtSignal(str)
+
+    # signal gets emitted when the kernel dropped events, changes might have been missed
+    overflow = pyqtSignal()
+
+    batchDelay = 50  # msec to collect events before reading them
+
+    _is_supported = None
+
+    @classmethod
+    def supported(cls):
+        if cls._is_supported is None:
+            cls._is_supported = False
+            libc = _load()
+            if libc:
+                fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+                if fd >= 0:
+                    os.close(fd)
+                    LOGGER.info("Inotify is supported, max_user_watches={}".format(
+                        max_user_watches()))
+                    cls._is_supported = True
+        return cls._is_supported
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._fd = -1
+        self._notifier = None
+        self._tracked_paths = PathTrie()
+        self._incomplete = set()  # tracked paths not watched completely due to missing watches
+        self._exhausted = False  # whether last watch failed due to missing watches
+        self._wds = {}  # key: watch descriptor, value: watched directory
+        self._dirs = {}  # key: watched directory, value: watch descriptor
+        self._batchTimer = QTimer(self)
+        self._batchTimer.setInterval(self.batchDelay)
+        self._batchTimer.setSingleShot(True)
+        self._batchTimer.timeout.connect(self._onRead)
+
+    @property
+    def nofWatches(self):
+        return len(self._wds)
+
+    def _open(self):
+        if self._fd >= 0:
+            return
+        self._fd = _load().inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise _error("inotify_init1")
+        self._notifier = QSocketNotifier(self._fd, QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._onActivated)
+        LOGGER.info("Started inotify fd={}".format(self._fd))
+
+    def stop(self):
+        if self._fd < 0:
+            return
+        LOGGER.info("Stopping inotify fd={}...".format(self._fd))
+        self._batchTimer.stop()
+        self._notifier.setEnabled(False)
+        self._notifier.deleteLater()
+        self._notifier = None
+        os.close(self._fd)
+        self._fd = -1
+        self._wds = {}
+        self._dirs = {}
+        self._incomplete = set()
+
+    def track(self, path):
+        """Start watching given directory tree"""
+        if path in self._tracked_paths:
+            return
+        LOGGER.info("Tracking {}".format(path))
+        self._tracked_paths.add(path)
+        self._open()
+        self._watchTree(path)
+        if path in self._incomplete:
+            LOGGER.error(
+                "Out of inotify watches, {} is not watched completely, "
+                "increase fs.inotify.max_user_watches ({})".format(path, max_user_watches())
+            )
+
+    def untrack(self, path):
+        """Stop watching given directory tree, unless it is part of another tracked tree"""
+        if path not in self._tracked_paths:
+            return
+        LOGGER.info("Untracking {}".format(path))
+        self._tracked_paths.remove(path)
+        self._incomplete.discard(path)
+        if self._fd < 0:
+            return
+        for dir in [d for d in self._dirs if d == path or d.startswith(path + os.sep)]:
+            if not self._tracked_paths or not self.isTracked(dir):
+                self._unwatch(dir)
+        for incomplete in sorted(self._incomplete):
+            self._watchTree(incomplete)
+
+    def isTracked(self, path):
+        if not self._tracked_paths:
+            return True
+        return self._tracked_paths.lookup(path)[0] is not None
+
+    def _watchTree(self, root, found=None):
+        """Add watches to given directory and all directories below. The git directory
+        comes first and the others breadth first, to watch what matters most when running
+        out of watches. Optional list `found` gets extended by the paths found in the tree."""
+        gitDirs = collections.deque()
+        pending = collections.deque([root])
+        while gitDirs or pending:
+            inGit = bool(gitDirs)
+            dir = gitDirs.popleft() if inGit else pending.popleft()
+            if not self._watch(dir):
+                if self._exhausted:
+                    tracked = self._tracked_paths.lookup(root)[0]
+                    if tracked:
+                        self._incomplete.add(tracked)
+                    return
+                continue
+            try:
+                entries = list(os.scandir(dir))
+            except OSError as e:
+                LOGGER.debug("Failed to scan {}: {}".format(dir, e))
+                continue
+            for entry in entries:
+                if found is not None:
+                    found.append(entry.path)
+                try:
+                    isDir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if isDir and not self._skipped(dir, entry.name):
+                    if inGit or entry.name == ".git":
+                        gitDirs.append(entry.path)
+                    else:
+                        pending.append(entry.path)
+        self._incomplete.discard(root)
+
+    @staticmethod
+    def _skipped(parent, name):
+        if name in SKIPPED_DIRS:
+            return True
+        # object database of a git directory, the status never depends on it
+        return name == "objects" and os.path.isfile(os.path.join(parent, "HEAD"))
+
+    def _watch(self, dir):
+        """Returns true when given directory is watched"""
+        self._exhausted = False
+        wd = _load().inotify_add_watch(self._fd, os.fsencode(dir), WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            self._exhausted = code == errno.ENOSPC
+            if not self._exhausted:
+                LOGGER.debug("Failed to watch {}: {}".format(dir, os.strerror(code)))
+            return False
+        old = self._wds.get(wd)
+        if old and old != dir:
+            self._dirs.pop(old, None)  # same directory known by its former path
+        self._wds[wd] = dir
+        self._dirs[dir] = wd
+        return True
+
+    def _unwatch(self, dir):
+        wd = self._dirs.pop(dir, None)
+        if wd is not None:
+            self._wds.pop(wd, None)
+            _load().inotify_rm_watch(self._fd, wd)
+
+    def _forget(self, wd):
+        dir = self._wds.pop(wd, None)
+        if dir and self._dirs.get(dir) == wd:
+            del self._dirs[dir]
+
+    @pyqtSlot()
+    def _onActivated(self):
+        # wait a little to read events of e.g. a checkout in few large batches
+        self._notifier.setEnabled(False)
+        self._batchTimer.start()
+
+    @pyqtSlot()
+    def _onRead(self):
+        if self._fd < 0:
+            return
+        data = bytearray()
+        while True:
+            try:
+                chunk = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                LOGGER.error("Failed to read inotify events: {}".format(e))
+                break
+            if not chunk:
+                break
+            data += chunk
+        self._notifier.setEnabled(True)
+        changed = self._handleEvents(parse_events(data))
+        for path in changed:
+            self.pathChanged.emit(path)
+
+    def _handleEvents(self, events):
+        """Returns list of changed paths of given events, without duplicates"""
+        changed = collections.OrderedDict()
+        overflow = False
+        for event in events:
+            if event.mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            dir = self._wds.get(event.wd)
+            if dir is None:
+                continue
+            if event.mask & IN_IGNORED:
+                self._forget(event.wd)
+                continue
+            path = os.path.join(dir, event.name) if event.name else dir
+            changed[path] = None
+            if event.mask & IN_ISDIR:
+                if event.mask & (IN_CREATE | IN_MOVED_TO):
+                    if not self._skipped(dir, event.name):
+                        # content might have been created before the watch got added
+                        found = []
+                        self._watchTree(path, found)
+                        changed.update((p, None) for p in found)
+                elif event.mask & IN_MOVED_FROM:
+                    prefix = path + os.sep
+                    for moved in [d for d in self._dirs if d == path or d.startswith(prefix)]:
+                        self._unwatch(moved)
+        if overflow:
+            LOGGER.warning("Inotify event queue overflowed, changes might have been missed")
+            self.overflow.emit()
+        return list(changed)
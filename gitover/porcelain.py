@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Single pass working tree status using `git status --porcelain=v2`.
+"""
+import logging
+import os
+
+from git.util import finalize_process
+
+LOGGER = logging.getLogger(__name__)
+
+NUL = b"\0"
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_records(stream, chunk_size=CHUNK_SIZE):
+    """Yield NUL terminated records of given binary stream as bytes,
+    reading the stream in chunks instead of loading it completely."""
+    buffer = bytearray()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        start = 0
+        end = buffer.find(NUL, start)
+        while end != -1:
+            yield bytes(buffer[start:end])
+            start = end + 1
+            end = buffer.find(NUL, start)
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+class PorcelainStatus(object):
+    """Working tree state of a repository, filled from records
+    of `git status --porcelain=v2 -z --branch`"""
+
+    def __init__(self):
+        self.oid = ""  # commit of HEAD, empty for a repository without commits
+        self.head = ""  # current branch, empty when HEAD is detached
+        self.detached = False
+        self.upstream = ""  # upstream branch of current branch
+        self.hasAheadBehind = False  # whether upstream exists and ahead/behind are valid
+        self.ahead = 0  # number of commits HEAD is ahead of upstream
+        self.behind = 0  # number of commits HEAD is behind of upstream
+        self.untracked = set()  # set of untracked paths in repository
+        self.deleted = set()  # set of deleted paths in repository
+        self.modified = set()  # set of modified paths in repository
+        self.conflicts = set()  # set of conflict paths in repository
+        self.staged = set()  # set of staged paths in repository
+
+    def parse(self, records):
+        """Consume given iterable of records ( as bytes )"""
+        records = iter(records)
+        for record in records:
+            if not record:
+                continue
+            kind = record[:1]
+            if kind == b"#":
+                self._parseHeader(os.fsdecode(record))
+            elif kind == b"1":
+                self._parseChange(os.fsdecode(record).split(" ", 8))
+            elif kind == b"2":
+                self._parseChange(os.fsdecode(record).split(" ", 9))
+                next(records, None)  # skip original path of rename/copy
+            elif kind == b"u":
+                self.conflicts.add(os.fsdecode(record).split(" ", 10)[10])
+            elif kind == b"?":
+                self.untracked.add(os.fsdecode(record[2:]))
+        return self
+
+    def _parseHeader(self, line):
+        key, _, value = line[2:].partition(" ")
+        if key == "branch.oid":
+            self.oid = "" if value == "(initial)" else value
+        elif key == "branch.head":
+            self.detached = value == "(detached)"
+            self.head = "" if self.detached else value
+        elif key == "branch.upstream":
+            self.upstream = value
+        elif key == "branch.ab":
+            ahead, behind = value.split(" ")
+            self.ahead = int(ahead)
+            self.behind = -int(behind)
+            self.hasAheadBehind = True
+
+    def _parseChange(self, fields):
+        xy, path = fields[1], fields[-1]
+        if xy[0] != ".":
+            self.staged.add(path)
+        if xy[1] == "D":
+            self.deleted.add(path)
+        elif xy[1] != ".":
+            self.modified.add(path)
+
+
+def read_status(repo, track=None):
+    """Returns PorcelainStatus of given git.Repo by running `git status` once
+    and parsing its output while it gets generated,
+    optional callable `track` gets the started process, e.g. to terminate it on cancellation"""
+    proc = repo.git.status(
+        "--porcelain=v2", "-z", "--branch", "--untracked-files=all", as_process=True
+    )
+    if track:
+        track(proc)
+    try:
+        status = PorcelainStatus().parse(iter_records(proc.stdout))
+    finally:
+        finalize_process(proc)
+    return status
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Snapshots of references of a repository, each read by a single `git for-each-ref`.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from gitover.fingerprint import refs_fingerprint, tree_fingerprint, stat_fingerprint, racy
+
+LOGGER = logging.getLogger(__name__)
+
+TAGS_PREFIX = "refs/tags/"
+HEADS_PREFIX = "refs/heads/"
+REMOTES_PREFIX = "refs/remotes/"
+
+
+class TagIndex(object):
+    """Maps commits to names of tags pointing to them.
+    The index only gets rebuilt when packed refs or loose tags have changed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._tags = {}  # key: commit, value: list of tag names
+
+    def update(self, repo):
+        """Rebuild index from given git.Repo when its tags changed,
+        returns true when the index got rebuilt"""
+        fingerprint = refs_fingerprint(repo.common_dir, "refs/tags")
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return False
+        tags = defaultdict(list)
+        lines = repo.git.for_each_ref(
+            TAGS_PREFIX, format="%(objectname)%09%(*objectname)%09%(refname)"
+        ).split("\n")
+        for line in [line for line in lines if line]:
+            sha, peeled, refname = line.split("\t", 2)
+            tags[peeled or sha].append(refname[len(TAGS_PREFIX):])
+        LOGGER.debug("Indexed {} tags of {}".format(sum(map(len, tags.values())), repo.git_dir))
+        with self._lock:
+            self._fingerprint = None if racy(fingerprint) else fingerprint
+            self._tags = dict(tags)
+        return True
+
+    def tags(self, rev):
+        """Returns list of tag names pointing to given commit sha-hex"""
+        with self._lock:
+            return list(self._tags.get(rev, []))
+
+
+class RefSnapshot(object):
+    """Snapshot of name, sha and upstream of local and remote branches.
+    The snapshot only gets rebuilt when references or configuration have changed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._branches = {}  # key: local branch name, value: tuple of sha and upstream
+        self._remote_branches = {}  # key: remote branch name, value: sha
+
+    def _currentFingerprint(self, repo):
+        return (
+            refs_fingerprint(repo.common_dir, "refs/heads"),
+            tree_fingerprint(os.path.join(repo.common_dir, "refs", "remotes")),
+            stat_fingerprint(os.path.join(repo.common_dir, "config")),
+        )
+
+    def update(self, repo):
+        """Rebuild snapshot from given git.Repo when its references changed,
+        returns true when the snapshot got rebuilt"""
+        fingerprint = self._currentFingerprint(repo)
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return False
+        branches = {}
+        remote_branches = {}
+        lines = repo.git.for_each_ref(
+            HEADS_PREFIX, REMOTES_PREFIX,
+            format="%(refname)%09%(objectname)%09%(upstream:short)",
+        ).split("\n")
+        for line in [line for line in lines if line]:
+            refname, sha, upstream = line.split("\t", 2)
+            if refname.startswith(HEADS_PREFIX):
+                branches[refname[len(HEADS_PREFIX):]] = (sha, upstream)
+            elif not refname.endswith("/HEAD"):
+                remote_branches[refname[len(REMOTES_PREFIX):]] = sha
+        LOGGER.debug(
+            "Got {} local and {} remote branches of {}".format(
+                len(branches), len(remote_branches), repo.git_dir
+            )
+        )
+        with self._lock:
+            self._fingerprint = None if racy(fingerprint) else fingerprint
+            self._branches = branches
+            self._remote_branches = remote_branches
+        return True
+
+    def branches(self):
+        """Returns list of local branch names"""
+        with self._lock:
+            return list(self._branches.keys())
+
+    def remoteBranches(self):
+        """Returns list of remote branch names, excluding symbolic `<remote>/HEAD`"""
+        with self._lock:
+            return list(self._remote_branches.keys())
+
+    def upstream(self, branch):
+        """Returns upstream branch of given local branch or empty string"""
+        with self._lock:
+            return self._branches.get(branch, ("", ""))[1]
+
+    def sha(self, branch):
+        """Returns sha-hex of given local or remote branch or empty string"""
+        with self._lock:
+            if branch in self._branches:
+                return self._branches[branch][0]
+            return self._remote_branches.get(branch, "")
+
+    def __contains__(self, branch):
+        with self._lock:
+            return branch in self._branches or branch in self._remote_branches
+
+
+def parse_ls_remote(lines):
+    """Returns dict of ref name to sha-hex of given `git ls-remote` output lines,
+    skipping peeled tags"""
+    refs = {}
+    for line in lines:
+        sha, _, refname = line.strip().partition("\t")
+        if refname and not refname.endswith("^{}"):
+            refs[refname] = sha
+    return refs
+
+
+def local_remote_refs(repo, remote):
+    """Returns dict of ref name to sha-hex of branches as stored locally for given remote,
+    named as on the remote, and all local tags"""
+    prefix = "{}{}/".format(REMOTES_PREFIX, remote)
+    refs = {}
+    lines = repo.git.for_each_ref(prefix, TAGS_PREFIX, format="%(objectname)%09%(refname)")
+    for sha, refname in [line.split("\t", 1) for line in lines.split("\n") if line]:
+        if refname.startswith(prefix):
+            if refname != prefix + "HEAD":
+                refs[HEADS_PREFIX + refname[len(prefix):]] = sha
+        else:
+            refs[refname] = sha
+    return refs
+
+
+def remote_refs_unchanged(remote_refs, local_refs):
+    """Returns true when fetching wouldn't change local refs, i.e. the remote branches
+    match the locally stored ones and all remote tags exist locally"""
+    remote_heads = {r: s for r, s in remote_refs.items() if r.startswith(HEADS_PREFIX)}
+    local_heads = {r: s for r, s in local_refs.items() if r.startswith(HEADS_PREFIX)}
+    if remote_heads != local_heads:
+        return False
+    return all(
+        local_refs.get(r) == s for r, s in remote_refs.items() if r.startswith(TAGS_PREFIX)
+    )
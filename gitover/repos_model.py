@@ -22,7 +22,7 @@ Copyright 2017 Manuel Koch
 Data model for all repositories.
 """
 import webbrowser
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict
 import copy
 import datetime
 import logging
@@ -44,13 +44,28 @@ from git.util import finalize_process
 from PyQt5.QtCore import QModelIndex, pyqtSlot, Q_ENUMS, QTimer, QSettings, QRunnable, QThreadPool
 from PyQt5.QtCore import QVariant
 from PyQt5.QtCore import Qt, pyqtProperty, pyqtSignal, QObject
-from PyQt5.QtCore import QAbstractItemModel
+from PyQt5.QtCore import QAbstractItemModel, QAbstractListModel
 from PyQt5.QtCore import QThread
 from PyQt5.QtQml import qmlRegisterType
 
 from gitover.fswatcher import RepoFsWatcher
 from gitover.qml_helpers import QmlTypeMixin
 from gitover.config import Config
+from gitover.porcelain import read_status, PorcelainStatus
+from gitover.refs import TagIndex, RefSnapshot
+from gitover.refs import parse_ls_remote, local_remote_refs, remote_refs_unchanged
+from gitover.fingerprint import RepoFingerprint
+from gitover.catfile import CatFileBatch
+from gitover.show import read_commit
+from gitover.statuscache import StatusCache
+from gitover.admission import FetchAdmission, remote_host
+from gitover.watchdog import WATCHDOG
+from gitover.ssh import SSH_CONNECTIONS
+from gitover.fetchschedule import FetchSchedule, FETCH_CHANGED, FETCH_UNCHANGED, FETCH_FAILED
+from gitover.fetchschedule import FETCH_NO_REMOTE
+from gitover.utils import PathTrie
+from gitover.facets import FACET_WORKTREE, FACET_INDEX, FACET_HEAD, FACET_LOCAL_REFS
+from gitover.facets import FACET_REMOTE_REFS, FACET_CONFIG, FACET_STASH
 
 LOGGER = logging.getLogger(__name__)
 
@@ -69,6 +84,14 @@ def build_env_vars(override_vars):
     return env
 
 
+def share_ssh_connections(repo):
+    """Let network commands of given git.Repo share SSH connections per remote host,
+    unless the repository configures its own ssh command"""
+    if repo.git.config("core.sshCommand", with_exceptions=False):
+        return
+    repo.git.update_environment(**SSH_CONNECTIONS.env())
+
+
 class ReposModel(QAbstractItemModel, QmlTypeMixin):
     """Model of repository data arranged in rows"""
 
@@ -77,6 +100,9 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
 
     ROLE_REPO = Qt.UserRole + 1
 
+    hiddenUpdateInterval = 10000  # msec between status updates of repositories not shown
+    fetchCheckInterval = 10000  # msec between checks for due periodic fetches
+
     def __init__(self, watch_filesystem=True, parent=None):
         """Construct repositories model"""
         super().__init__(parent)
@@ -89,10 +115,15 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
         self._fsWatcher.repoChanged.connect(self._onRepoChanged)
 
         self._repos = []
+        self._repoIndex = PathTrie()  # key: path of repository, value: Repo
+        self._initializedRepos = set()  # paths of repos that got their initial update
         self._recentRepos = []
         self._loadRecentRepos()
 
+        self._statusCache = StatusCache(parent=self)
+
         self._queued_path = []
+        self._superprojects = {}  # path of submodule -> path of its superproject
         self._queueTimer = QTimer()
         self._queueTimer.setInterval(100)
         self._queueTimer.setSingleShot(True)
@@ -103,9 +134,29 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
         self._updateTimer.setSingleShot(True)
         self._updateTimer.timeout.connect(self._updateRepos)
 
+        # changed paths and facets of repositories that are not shown,
+        # they get updated at a lower rate
+        self._deferredChanges = {}
+        self._deferredTimer = QTimer()
+        self._deferredTimer.setInterval(ReposModel.hiddenUpdateInterval)
+        self._deferredTimer.setSingleShot(True)
+        self._deferredTimer.timeout.connect(self._updateDeferred)
+
+        self._fetchTimer = QTimer()
+        self._fetchTimer.setInterval(ReposModel.fetchCheckInterval)
+        self._fetchTimer.timeout.connect(self._fetchDue)
+        self._fetchTimer.start()
+
         cfg = Config()
         cfg.load(os.path.expanduser("~"))
+        self._cfg = cfg  # configuration of lanes, timeouts and fetches of all repositories
         gitexe = cfg.general()["git"]
+        GitFetchWorker.admission.setLimits(
+            cfg.general()["fetch-concurrency"], cfg.general()["fetch-host-concurrency"]
+        )
+        SSH_CONNECTIONS.configure(
+            cfg.general()["ssh-multiplexing"], cfg.general()["ssh-control-persist"]
+        )
         if gitexe:
             git.Git.GIT_PYTHON_GIT_EXECUTABLE = gitexe
             # play nice with git extensions like git-lfs, assuming their binary is located next to `git` executable
@@ -182,21 +233,58 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
     def repo(self, idx):
         return self.data(self.index(idx, 0), role=ReposModel.ROLE_REPO)
 
+    def _byPriority(self):
+        """Returns list of repositories, highest priority first"""
+        return sorted(self._repos, key=lambda repo: repo.priority, reverse=True)
+
     @pyqtSlot()
     def triggerUpdate(self):
-        for repo in self._repos:
+        for repo in self._byPriority():
             repo.triggerUpdate()
 
     @pyqtSlot()
     def triggerFetch(self):
+        for repo in self._byPriority():
+            if not self._fetchingSuperproject(repo):
+                repo.triggerFetch()
+
+    def _repoByPath(self, path):
+        return self._repoIndex.get(path)
+
+    def _fetchingSuperproject(self, repo):
+        """Returns superproject whose fetch includes given repository or None"""
+        path = self._superprojects.get(repo.path)
+        while path:
+            superproject = self._repoByPath(path)
+            if superproject and superproject.fetchesSubmodules:
+                return superproject
+            path = self._superprojects.get(path)
+        return None
+
+    def _onFetchingChanged(self, fetching):
+        superproject = self.sender()
+        if not superproject or not superproject.fetchesSubmodules:
+            return
         for repo in self._repos:
-            repo.triggerFetch()
+            if self._fetchingSuperproject(repo) is superproject:
+                repo.superprojectFetching(fetching)
+
+    def _onSubmoduleOutput(self, path, line):
+        repo = self._repoByPath(path)
+        if repo:
+            repo.output.appendOutput(line)
 
     @pyqtSlot()
     def cleanup(self):
+        self._fetchTimer.stop()
         self.stopWorker()
+        self._statusCache.flush()
+        for repo in self._repos:
+            repo.cleanup()
+        SSH_CONNECTIONS.cleanup()
         self.beginResetModel()
         self._repos = []
+        self._repoIndex = PathTrie()
         self.endResetModel()
         self.nofReposChanged.emit(self.nofRepos)
 
@@ -233,7 +321,7 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
     @pyqtSlot(str)
     def addRepoByPath(self, path, saveAsRecent=False, defer=False):
         if self._isRepo(path):
-            repo = Repo(path)
+            repo = Repo(path, config=self._cfg)
             if defer:
                 self._queued_path += [(path, None)]
                 self._queueTimer.start()
@@ -241,7 +329,7 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
                 self.addRepo(repo, saveAsRecent)
 
     def addRepo(self, repo, saveAsRecent=False, defer=False):
-        if any([r.path == repo.path for r in self._repos]):
+        if repo.path in self._repoIndex:
             return False
 
         # find insert position
@@ -253,16 +341,26 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
         self.beginInsertRows(QModelIndex(), insert_idx, insert_idx)
         repo.setParent(self)
         self._repos.insert(insert_idx, repo)
+        self._repoIndex.add(repo.path, repo)
         self.endInsertRows()
         self.nofReposChanged.emit(self.nofRepos)
         repo.close.connect(self._onClose)
 
+        cached = self._statusCache.get(repo.path)
+        if cached:
+            repo.restoreStatus(cached)
+        repo.statusUpdated.connect(self._onStatusUpdated)
+        repo.priorityChanged.connect(self._onPriorityChanged)
+
         rootpath = repo.path
         LOGGER.info("Searching sub repos of {}".format(rootpath))
         subpaths = list(filter(self._isRepo, [r.abspath for r in git.Repo(rootpath).submodules]))
         for subpath in subpaths:
             name = subpath[len(rootpath) + 1:]
             self._queued_path += [(subpath, name)]
+            self._superprojects[os.path.normpath(subpath)] = rootpath
+        repo.fetchingChanged.connect(self._onFetchingChanged)
+        repo.submoduleOutput.connect(self._onSubmoduleOutput)
 
         if self._watchFs:
             self._fsWatcher.track.emit(rootpath)
@@ -280,7 +378,7 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
             return
         path, name = self._queued_path.pop(0)
         try:
-            repo = Repo(path, name)
+            repo = Repo(path, name, config=self._cfg)
             self.addRepo(repo)
         except:
             LOGGER.exception("Failed to add repo at {}".format(path))
@@ -288,19 +386,63 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
 
     def _updateRepos(self):
         LOGGER.debug("Triggering initial update of new repos...")
-        for repo in self._repos:
-            if not repo.branch and not repo.detached:
+        for repo in self._byPriority():
+            if repo.path not in self._initializedRepos:
                 LOGGER.debug("Triggering initial update of {}...".format(repo.path))
-                repo.triggerUpdate()
+                self._initializedRepos.add(repo.path)
+                repo.revalidate()
+                if not self._fetchingSuperproject(repo):
+                    repo.triggerFetch()
+
+    def _fetchDue(self):
+        """Trigger due periodic fetches, as many as the fetch admission can start right away"""
+        admission = GitFetchWorker.admission
+        free = admission.maxTotal - admission.running - admission.waiting
+        now = time.monotonic()
+        for repo in self._byPriority():
+            if free <= 0:
+                break
+            if self._fetchingSuperproject(repo):
+                continue
+            if repo.path in self._initializedRepos and repo.fetchSchedule.isDue(now):
+                LOGGER.debug("Triggering periodic fetch of {}...".format(repo.path))
                 repo.triggerFetch()
+                free -= 1
 
-    def _onRepoChanged(self, path):
-        roots = [(repo.path, repo) for repo in self._repos]
-        roots.sort(key=lambda x: len(x[0]), reverse=True)
-        for root, repo in roots:
-            if path == root or path.startswith(root + os.sep):
-                repo.triggerUpdate()
-                return
+    def _onStatusUpdated(self):
+        repo = self.sender()
+        if repo and not repo.stale:
+            self._statusCache.put(repo.path, repo.snapshot())
+
+    def _onRepoChanged(self, path, changedPaths, facets):
+        # innermost repository, i.e. a submodule instead of its superproject
+        repo = self._repoIndex.lookup(path)[1]
+        if not repo:
+            return
+        if repo.priority > Repo.PRIORITY_HIDDEN:
+            repo.triggerChangedUpdate(changedPaths, facets)
+        else:
+            deferredPaths, deferredFacets = self._deferredChanges.setdefault(
+                repo.path, (set(), set())
+            )
+            deferredPaths.update(changedPaths)
+            deferredFacets.update(facets)
+            if not self._deferredTimer.isActive():
+                self._deferredTimer.start()
+
+    def _triggerDeferred(self, repo):
+        changedPaths, facets = self._deferredChanges.pop(repo.path)
+        repo.triggerChangedUpdate(sorted(changedPaths), sorted(facets))
+
+    def _onPriorityChanged(self, priority):
+        repo = self.sender()
+        if repo and priority > Repo.PRIORITY_HIDDEN and repo.path in self._deferredChanges:
+            self._triggerDeferred(repo)
+
+    def _updateDeferred(self):
+        for repo in self._byPriority():
+            if repo.path in self._deferredChanges:
+                self._triggerDeferred(repo)
 
     def _onClose(self):
         # remove repo from model
@@ -309,63 +451,126 @@ class ReposModel(QAbstractItemModel, QmlTypeMixin):
         idx = self._repos.index(repo)
         self.beginRemoveRows(QModelIndex(), idx, idx)
         self._repos.remove(repo)
+        self._repoIndex.remove(repo.path)
         self.endRemoveRows()
         self.nofReposChanged.emit(self.nofRepos)
         if self._watchFs:
             self._fsWatcher.untrack.emit(repo.path)
+        self._initializedRepos.discard(repo.path)
+        self._deferredChanges.pop(repo.path, None)
+        self._statusCache.remove(repo.path)
+        repo.cleanup()
         repo.deleteLater()
 
 
 class GitStatus(object):
-    def __init__(self, path):
+    # attributes that get persisted, see toJson()
+    VALUES = (
+        "branch", "detached", "branches", "remoteBranches", "mergedToTrunkBranches",
+        "trackingBranch", "trackingBranchAhead", "trackingBranchBehind",
+        "trunkBranch", "trunkBranchAhead", "trunkBranchBehind", "head",
+    )
+    SETS = ("untracked", "deleted", "modified", "conflicts", "staged")
+
+    # parts of the status that can be updated on their own, see update()
+    PARTS = ("worktree", "refs", "tracking", "trunk", "merged")
+
+    # parts of the status that depend on a facet of the repository
+    FACET_PARTS = {
+        FACET_WORKTREE: ("worktree",),
+        FACET_INDEX: ("worktree",),
+        FACET_HEAD: ("worktree", "tracking", "trunk"),
+        FACET_LOCAL_REFS: ("refs", "tracking", "trunk", "merged"),  # worktree when HEAD moved
+        FACET_REMOTE_REFS: ("refs", "tracking", "trunk", "merged"),
+        FACET_CONFIG: ("refs", "tracking", "trunk", "merged"),
+        FACET_STASH: (),  # stashes are not part of the status
+    }
+
+    def __init__(self, path, tagIndex=None, refs=None):
         self.path = path  # root directory of repository
+        self.tagIndex = tagIndex or TagIndex()  # index of tags of repository
+        self.refs = refs or RefSnapshot()  # snapshot of branches of repository
         self.branch = ""  # current branch
         self.detached = False
         self.branches = []  # all local branches
         self.remoteBranches = []  # all remote branches that could be checked-out
         self.mergedToTrunkBranches = []  # all local branches that have been merged to trunk
-        self.commits = []
-        self.commit_tags = {}  # key: commit, value: tag
         self.trackingBranch = ""  # tracking branch of current branch
-        self.trackingBranchAhead = (
-            []
-        )  # list of commits that tracking branch is ahead of current branch
-        self.trackingBranchBehind = (
-            []
-        )  # list of commits that tracking branch is behind of current branch
+        self.trackingBranchAhead = 0  # number of commits tracking branch is ahead of current branch
+        self.trackingBranchBehind = 0  # number of commits tracking branch is behind of current branch
         self.trunkBranch = ""  # trunk branch of repository
-        self.trunkBranchAhead = []  # list of commits that trunk branch is ahead of current branch
-        self.trunkBranchBehind = []  # list of commits that trunk branch is ahead of current branch
+        self.trunkBranchAhead = 0  # number of commits trunk branch is ahead of current branch
+        self.trunkBranchBehind = 0  # number of commits trunk branch is behind of current branch
+        self.head = ""  # commit of HEAD
+        self.aheadBehindRevs = ()  # commits of HEAD, tracking and trunk branch that counters refer to
+        self.fingerprint = None  # RepoFingerprint of files status was taken from, None when unreliable
         self.untracked = set()  # set of untracked paths in repository
         self.deleted = set()  # set of deleted paths in repository
         self.modified = set()  # set of modified paths in repository
         self.conflicts = set()  # set of conflict paths in repository
         self.staged = set()  # set of staged paths in repository
 
-    def _commitsAheadBehind(self, repo, branch):
-        """Returns tuple of commit hash lists for commits of HEAD that are ahead/behind
-        given repository branch"""
-        ahead, behind = [], []
-        if branch in repo.refs:
-            lines = repo.git.rev_list("{}...HEAD".format(branch), left_right=True).split("\n")
-            lines = [line.strip() for line in lines if line.strip()]
-            for commit in lines:
-                dir, commit = commit[0], commit[1:]
-                if dir == "<":
-                    ahead += [commit]
-                else:
-                    behind += [commit]
-        return (ahead, behind)
+    def toJson(self):
+        """Returns status as JSON serializable dictionary"""
+        data = {name: getattr(self, name) for name in GitStatus.VALUES}
+        data.update({name: sorted(getattr(self, name)) for name in GitStatus.SETS})
+        data["aheadBehindRevs"] = list(self.aheadBehindRevs)
+        data["fingerprint"] = self.fingerprint.toJson() if self.fingerprint else None
+        return data
 
-    def _trackingBranch(self, repo, branch):
-        remote = repo.git.config("branch.{}.remote".format(branch), with_exceptions=False)
-        if remote:
-            return "{}/{}".format(remote, branch)
-        else:
-            return ""
+    @classmethod
+    def fromJson(cls, path, data, tagIndex=None, refs=None):
+        """Returns status of repository at given path from dictionary as returned by toJson()"""
+        status = cls(path, tagIndex, refs)
+        for name in GitStatus.VALUES:
+            setattr(status, name, data[name])
+        for name in GitStatus.SETS:
+            setattr(status, name, set(data[name]))
+        status.aheadBehindRevs = tuple(data["aheadBehindRevs"])
+        if data["fingerprint"]:
+            status.fingerprint = RepoFingerprint.fromJson(data["fingerprint"])
+        return status
+
+    def _countAheadBehind(self, repo, branch):
+        """Returns tuple of number of commits that given repository branch is ahead/behind
+        of HEAD, without listing the commits themselves"""
+        ahead, behind = 0, 0
+        if branch in self.refs and self.head:
+            counts = repo.git.rev_list(
+                "{}...{}".format(branch, self.head), count=True, left_right=True
+            )
+            ahead, behind = [int(c) for c in counts.split()]
+        return (ahead, behind)
 
-    def update(self):
-        """Update info from current git repository"""
+    def _parts(self, facets, previous):
+        """Returns set of parts to update for change of given facets"""
+        if facets is None or previous is None:
+            return set(GitStatus.PARTS)
+        parts = set()
+        for facet in facets:
+            parts.update(GitStatus.FACET_PARTS.get(facet, GitStatus.PARTS))
+        return parts
+
+    def _copy(self, previous):
+        """Take all values from given previous status"""
+        for name in GitStatus.VALUES:
+            value = getattr(previous, name)
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+        for name in GitStatus.SETS:
+            setattr(self, name, set(getattr(previous, name)))
+        self.aheadBehindRevs = previous.aheadBehindRevs
+
+    @staticmethod
+    def _headOf(worktree):
+        """Returns tuple of commit, branch and whether detached of given PorcelainStatus"""
+        if worktree.detached:
+            return worktree.oid, "detached {}".format(worktree.oid[:8]), True
+        return worktree.oid, worktree.head, False
+
+    def update(self, facets=None, previous=None):
+        """Update info from current git repository. Given the previous status,
+        only the parts that depend on given changed facets get updated, the others are taken
+        from the previous status"""
         try:
             LOGGER.info("Updating status for repository at {}".format(self.path))
             repo = git.Repo(self.path)
@@ -373,58 +578,126 @@ class GitStatus(object):
             LOGGER.exception("Invalid repository at {}".format(self.path))
             return
 
+        parts = self._parts(facets, previous)
+        if parts != set(GitStatus.PARTS):
+            LOGGER.info("Updating {} of status for {}".format(
+                ", ".join(p for p in GitStatus.PARTS if p in parts) or "nothing", self.path))
+            self._copy(previous)
+
         try:
-            self.commits = []
-            self.commit_tags = defaultdict(list)
-            for c in repo.iter_commits(max_count=100):
-                self.commits.append(c.hexsha)
-                self.commit_tags[c.hexsha] = [
-                    t.name for t in repo.tags if c.hexsha == t.commit.hexsha
-                ]
+            fingerprint = RepoFingerprint(repo.working_tree_dir, repo.git_dir, repo.common_dir)
         except:
-            LOGGER.exception("Failed to get commits for {}".format(self.path))
+            LOGGER.exception("Failed to get fingerprint of {}".format(self.path))
+            fingerprint = None
 
-        try:
-            self.branch = repo.active_branch.name
-        except TypeError:
-            if repo.head and repo.head.commit:
-                head = repo.git.rev_parse(repo.head.commit.hexsha, short=8)
-                self.branch = "detached {}".format(head)
-                self.detached = True
+        if "refs" in parts:
+            self._updateRefs(repo)
+            if not self.detached and self.refs.sha(self.branch) != self.head:
+                parts.update(GitStatus.FACET_PARTS[FACET_HEAD])  # current branch moved
+
+        worktree = None
+        if "worktree" in parts:
+            try:
+                worktree = read_status(repo, track=track_process)
+            except:
+                check_cancelled()
+                LOGGER.exception("Failed to get working tree status for {}".format(self.path))
+                worktree = PorcelainStatus()
+                fingerprint = None
+            head = (self.head, self.branch, self.detached)
+            if len(parts) < len(GitStatus.PARTS) and self._headOf(worktree) != head:
+                LOGGER.info("HEAD of {} changed unnoticed, updating all".format(self.path))
+                if "refs" not in parts:
+                    self._updateRefs(repo)
+                parts = set(GitStatus.PARTS)
+            self.head, self.branch, self.detached = self._headOf(worktree)
+
+        if "tracking" in parts:
+            self._updateTracking(repo, worktree)
+
+        if "trunk" in parts:
+            self._updateTrunk(repo)
+
+        self.aheadBehindRevs = (
+            self.head,
+            self.refs.sha(self.trackingBranch),
+            self.refs.sha(self.trunkBranch),
+        )
+
+        if worktree is not None:
+            self.untracked = worktree.untracked
+            self.modified = worktree.modified
+            self.deleted = worktree.deleted
+            self.conflicts = worktree.conflicts
+            self.staged = worktree.staged
+
+            self.modified -= self.conflicts
+            self.deleted -= self.conflicts
+            self.staged -= self.conflicts
+
+        if fingerprint:
+            if worktree is not None:
+                fingerprint.addPaths(worktree.untracked | worktree.modified | worktree.deleted)
+                fingerprint.addPaths(worktree.conflicts | worktree.staged)
+            elif previous.fingerprint:
+                # working tree not rescanned, dirty paths are still the ones of previous status
+                fingerprint.paths = dict(previous.fingerprint.paths)
             else:
-                self.branch = ""
+                fingerprint = None
+            if fingerprint and not fingerprint.racy():
+                self.fingerprint = fingerprint
+
+        if "merged" in parts:
+            self._updateMerged(repo)
+
+        LOGGER.info("Got status for repository at {}".format(self.path))
+
+    def _updateRefs(self, repo):
+        """Update local and remote branches"""
+        try:
+            self.refs.update(repo)
+        except:
+            LOGGER.exception("Failed to get references for {}".format(self.path))
+
+        try:
+            self.tagIndex.update(repo)
+        except:
+            LOGGER.exception("Failed to index tags for {}".format(self.path))
 
         try:
-            branches = [b.name for b in repo.branches]
+            branches = self.refs.branches()
             branches.sort(key=str.lower)
             self.branches = branches
         except:
             LOGGER.exception("Invalid branches for {}".format(self.path))
 
         try:
-            trackedBranches = [self._trackingBranch(repo, b) for b in self.branches]
-            allRemoteBranches = [
-                r.name
-                for r in repo.references
-                if isinstance(r, git.RemoteReference) and r.name != (r.remote_name + "/HEAD")
-            ]
-            availRemoteBranches = [
-                r.name
-                for r in repo.references
-                if isinstance(r, git.RemoteReference)
-                   and r.name != (r.remote_name + "/HEAD")
-                   and r.name not in trackedBranches
-            ]
+            trackedBranches = set(self.refs.upstream(b) for b in self.branches)
+            allRemoteBranches = self.refs.remoteBranches()
+            availRemoteBranches = [r for r in allRemoteBranches if r not in trackedBranches]
             availRemoteBranches.sort(key=str.lower)
             self.remoteBranches = availRemoteBranches
         except:
             LOGGER.exception("Invalid branches for {}".format(self.path))
 
+    def _updateTracking(self, repo, worktree=None):
+        """Update tracking branch of current branch and its ahead/behind counters,
+        taken from given PorcelainStatus or counted when the working tree wasn't scanned"""
+        self.trackingBranch = ""
+        self.trackingBranchAhead = 0
+        self.trackingBranchBehind = 0
         try:
             if self.branch in self.branches:
-                self.trackingBranch = self._trackingBranch(repo, self.branch)
-                if self.trackingBranch:
-                    ahead, behind = self._commitsAheadBehind(repo, self.trackingBranch)
+                if worktree is not None:
+                    self.trackingBranch = worktree.upstream
+                else:
+                    self.trackingBranch = self.refs.upstream(self.branch)
+                if worktree is not None and worktree.hasAheadBehind:
+                    # status counts from the perspective of HEAD, we count from tracking branch
+                    self.trackingBranchAhead = worktree.behind
+                    self.trackingBranchBehind = worktree.ahead
+                elif self.trackingBranch:
+                    ahead, behind = self._countAheadBehind(repo, self.trackingBranch)
                     self.trackingBranchAhead = ahead
                     self.trackingBranchBehind = behind
         except:
@@ -434,20 +707,22 @@ class GitStatus(object):
                 )
             )
 
+    def _updateTrunk(self, repo):
+        """Update trunk branch and its ahead/behind counters"""
         try:
             trunkBranches = [
                 repo.git.config("gitover.trunkbranch", with_exceptions=False),
                 "origin/develop",
                 "origin/master",
             ]
-            while trunkBranches and trunkBranches[0] not in set(allRemoteBranches + branches):
+            while trunkBranches and trunkBranches[0] not in self.refs:
                 trunkBranches.pop(0)
             self.trunkBranch = trunkBranches[0] if trunkBranches else ""
         except:
             LOGGER.exception("Failed to determine trunk branch for {}".format(self.path))
 
         try:
-            ahead, behind = self._commitsAheadBehind(repo, self.trunkBranch)
+            ahead, behind = self._countAheadBehind(repo, self.trunkBranch)
             self.trunkBranchAhead = ahead
             self.trunkBranchBehind = behind
         except:
@@ -457,35 +732,8 @@ class GitStatus(object):
                 )
             )
 
-        self.untracked = set(repo.untracked_files)
-        for diff in repo.index.diff(other=None):  # diff against working tree
-            if diff.deleted_file:
-                self.deleted.add(diff.b_path)
-            else:
-                self.modified.add(diff.b_path)
-
-        try:
-            unmergedBlobs = repo.index.unmerged_blobs()
-            for path in unmergedBlobs:
-                for (stage, dummyBlob) in unmergedBlobs[path]:
-                    if (
-                            stage != 0
-                    ):  # anything else than zero indicates a conflict that must be resolved
-                        self.conflicts.add(path)
-        except:
-            pass  # unmerged_blobs() seems to raise an exception when there are no conflicts !?
-
-        try:
-            staged = repo.git.diff("HEAD", name_only=True, cached=True).split("\n")
-            for p in [p for p in staged if p.strip()]:
-                self.staged.add(p)
-        except:
-            pass
-
-        self.modified -= self.conflicts
-        self.deleted -= self.conflicts
-        self.staged -= self.conflicts
-
+    def _updateMerged(self, repo):
+        """Update local branches that have been merged to trunk"""
         try:
             merged_branches = []
             if self.trunkBranch:
@@ -493,49 +741,214 @@ class GitStatus(object):
                     b.replace("*", "").strip()
                     for b in repo.git.branch(self.trunkBranch, merged=True).split("\n")
                 ]
-            merged_branches = [(b, self._trackingBranch(repo, b)) for b in merged_branches]
+            merged_branches = [(b, self.refs.upstream(b)) for b in merged_branches]
             self.mergedToTrunkBranches = [
                 b[0] for b in merged_branches if self.trunkBranch not in b
             ]
         except:
             LOGGER.exception("Failed to detect branches that are already merged to trunk")
 
-        LOGGER.info("Got status for repository at {}".format(self.path))
+
+class TaskCancelled(Exception):
+    """Raised within a task that got cancelled while running"""
+
+
+class TaskTimeout(Exception):
+    """Raised within a task when its process got terminated by the watchdog"""
+
+
+_current = threading.local()  # WorkerRunnable executed by a thread
+
+
+def current_runnable():
+    """Returns WorkerRunnable executed by calling thread or None"""
+    return getattr(_current, "runnable", None)
+
+
+def track_process(proc):
+    """Register given process with task of calling thread,
+    the process gets terminated when the task gets cancelled"""
+    runnable = current_runnable()
+    if runnable:
+        runnable.addProcess(proc)
+    return proc
+
+
+def check_cancelled():
+    """Raise TaskCancelled when task of calling thread got cancelled"""
+    runnable = current_runnable()
+    if runnable and runnable.abort:
+        raise TaskCancelled()
+
+
+def handle_tracked_output(proc, stdout_handler, stderr_handler, runtime=0, inactivity=0):
+    """Pass output of given process to handlers, like `handle_process_output`,
+    but the process gets terminated when the task of calling thread gets cancelled.
+    The process gets terminated as well when it runs longer than `runtime` seconds or
+    doesn't generate output for `inactivity` seconds, raising TaskTimeout."""
+    track_process(proc)
+    args = getattr(proc, "args", None) or ["git"]
+    name = " ".join(["git"] + [str(a) for a in args[1:2]])
+    watched = WATCHDOG.watch(proc, name, runtime, inactivity)
+
+    # output gets pumped by helper thread, processes started by the terminated process may
+    # keep its output open, stop waiting for them after a grace period
+    finished = threading.Event()
+    silenced = threading.Event()  # set when output no longer gets passed to handlers
+    errors = []
+
+    def touching(handler):
+        def onOutput(line):
+            watched.touch()
+            if handler and not silenced.is_set():
+                handler(line)
+
+        return onOutput
+
+    def pump():
+        try:
+            handle_process_output(
+                proc, touching(stdout_handler), touching(stderr_handler), finalize_process
+            )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            finished.set()
+
+    pumping = threading.Thread(target=pump, name="output", daemon=True)
+    pumping.start()
+    try:
+        exited = None
+        while not finished.wait(WATCHDOG.interval):
+            status = proc.poll()
+            if status is None:
+                continue
+            exited = exited or time.monotonic()
+            if time.monotonic() - exited > WATCHDOG.grace:
+                LOGGER.warning("Stopped waiting for output of exited {}".format(name))
+                if status != 0:
+                    errors.append(RuntimeError("{} exited with {}".format(name, status)))
+                break
+        if errors:
+            raise errors[0]
+    except:
+        check_cancelled()
+        if watched.timeout:
+            if stderr_handler:
+                stderr_handler(watched.timeout)
+            raise TaskTimeout(watched.timeout)
+        raise
+    finally:
+        # handlers of the caller must not get called after returning
+        silenced.set()
+        pumping.join(WATCHDOG.interval)
+        WATCHDOG.unwatch(watched)
 
 
 class WorkerSlot(QObject):
+    """
+    Runs queued tasks in order of scheduling, at most given number of tasks at the same time.
+    Tasks of the same key never run at the same time.
+    """
+
     busyChanged = pyqtSignal(bool)
+    queueChanged = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, concurrency=1):
         super().__init__(parent)
         self._lock = threading.RLock()
+        self._concurrency = max(1, concurrency)
+        self.priority = 0  # thread pool priority of tasks that get started
         self._runnables = []
+        self._merged = 0  # number of tasks that got merged into a queued task
 
-    def schedule(self, func, *args, **kwargs):
+    def schedule(self, func, *args, key=None, **kwargs):
+        """
+        Queue call of given function with given arguments.
+        When a task of given key is still queued, the call gets merged into that task,
+        i.e. it calls the latest function and arguments instead of queuing another task.
+        """
         with self._lock:
+            runnable = self._queued(key)
+            if runnable:
+                runnable.replace(func, *args, **kwargs)
+                runnable.refs += 1
+                self._merged += 1
+                LOGGER.debug("Merged task {} (merged={})".format(key, self._merged))
+                self.queueChanged.emit()
+                return runnable
             runnable = WorkerRunnable(self, func, *args, **kwargs)
+            runnable.key = key
             runnable.setAutoDelete(False)
             self._runnables.append(runnable)
+            self.queueChanged.emit()
             if len(self._runnables) == 1:
                 self.busyChanged.emit(True)
-                self._next()
+            self._next()
         return runnable
 
+    def _queued(self, key):
+        """Returns queued runnable of given key that has not been started yet"""
+        if key is None:
+            return None
+        for runnable in self._runnables:
+            if runnable.key == key and not runnable.started:
+                return runnable
+        return None
+
     def cancel(self, runnable):
+        """Cancel given runnable, a merged runnable only gets cancelled by its last requester"""
         with self._lock:
-            if runnable in self._runnables:
+            if runnable in self._runnables and not runnable.abort:
+                runnable.refs -= 1
+                if runnable.refs > 0:
+                    return
+                if runnable.submitted and not QThreadPool.globalInstance().tryTake(runnable):
+                    runnable.terminate()  # already running, gets removed when done
+                    return
                 runnable.abort = True
                 self._runnables.remove(runnable)
-                QThreadPool.globalInstance().tryTake(runnable)
+                self.queueChanged.emit()
+                self._next()
+                if not self._runnables:
+                    self.busyChanged.emit(False)
+
+    def supersede(self, key):
+        """Cancel running task of given key, e.g. because a newer queued task replaces it.
+        Returns true when a task got cancelled."""
+        with self._lock:
+            running = [r for r in self._runnables if r.key == key and r.started and not r.abort]
+            for runnable in running:
+                runnable.terminate()
+            return bool(running)
+
+    def cancelAll(self):
+        """Cancel all queued and running tasks"""
+        with self._lock:
+            for runnable in list(self._runnables):
+                runnable.refs = 1
+                self.cancel(runnable)
 
     def _next(self):
-        if self._runnables:
-            QThreadPool.globalInstance().start(self._runnables[0])
+        """Submit queued runnables to thread pool as long as concurrency permits"""
+        submitted = [r for r in self._runnables if r.submitted]
+        keys = set(r.key for r in submitted if r.key is not None)
+        for runnable in self._runnables:
+            if len(submitted) >= self._concurrency:
+                break
+            if runnable.submitted or runnable.key in keys:
+                continue
+            runnable.submitted = True
+            submitted.append(runnable)
+            if runnable.key is not None:
+                keys.add(runnable.key)
+            QThreadPool.globalInstance().start(runnable, self.priority)
 
     def done(self, runnable):
         with self._lock:
             if runnable in self._runnables:
                 self._runnables.remove(runnable)
+                self.queueChanged.emit()
             self._next()
             if not self._runnables:
                 self.busyChanged.emit(False)
@@ -545,6 +958,18 @@ class WorkerSlot(QObject):
         with self._lock:
             return len(self._runnables) > 0
 
+    @pyqtProperty(int, notify=queueChanged)
+    def queueDepth(self):
+        """Number of queued and running tasks"""
+        with self._lock:
+            return len(self._runnables)
+
+    @pyqtProperty(int, notify=queueChanged)
+    def mergedTasks(self):
+        """Number of tasks that got merged into a queued task"""
+        with self._lock:
+            return self._merged
+
 
 class WorkerRunnable(QRunnable):
     abort = False
@@ -556,14 +981,67 @@ class WorkerRunnable(QRunnable):
         self._func = func
         self._args = args
         self._kwargs = kwargs
+        self.key = None  # key of task, see WorkerSlot.schedule()
+        self.refs = 1  # number of requesters of task
+        self.submitted = False  # whether runnable has been handed to thread pool
+        self.started = False
+        self.cancelled = None  # monotonic time of cancellation while running
+        self._procs = []  # processes started by task, see track_process()
+
+    def replace(self, func, *args, **kwargs):
+        """Replace function and arguments of runnable that has not been started yet"""
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+
+    def addProcess(self, proc):
+        """Register process started by task, it gets terminated when task gets cancelled"""
+        with self._slot._lock:
+            self._procs.append(proc)
+            if not self.abort:
+                return
+        self._terminateProcess(proc)
+
+    def terminate(self):
+        """Cancel running task, terminating all of its processes. Processes get terminated
+        instead of killed, that way git removes its lock files"""
+        with self._slot._lock:
+            if self.abort:
+                return
+            self.abort = True
+            self.cancelled = time.monotonic()
+            procs = list(self._procs)
+        for proc in procs:
+            self._terminateProcess(proc)
+
+    @staticmethod
+    def _terminateProcess(proc):
+        try:
+            if proc.poll() is None:
+                proc.terminate()
+        except:
+            LOGGER.exception("Failed to terminate process {}".format(proc))
 
     def run(self):
+        _current.runnable = self
+        func = None
         try:
-            if not self.abort and getattr(self, "_func", None):
-                self._func(*self._args, **self._kwargs)
+            with self._slot._lock:
+                self.started = True
+                func, args, kwargs = getattr(self, "_func", None), self._args, self._kwargs
+            if not self.abort and func:
+                func(*args, **kwargs)
+        except TaskCancelled:
+            pass
         except:
             LOGGER.exception("Worker runnable failed")
         finally:
+            _current.runnable = None
+            if self.cancelled is not None:
+                LOGGER.info("Cancelled task {} within {:.0f}ms".format(
+                    self.key or getattr(func, "__name__", func),
+                    (time.monotonic() - self.cancelled) * 1000))
+            self._procs = []
             self._slot.done(self)
 
 
@@ -576,22 +1054,130 @@ class GitStatusWorker(QObject):
     # signal gets emitted when given GitStatus has been updated
     statusupdated = pyqtSignal(object)
 
+    # signal gets emitted when given GitStatus is still valid, i.e. its update has been skipped
+    statusvalidated = pyqtSignal(object)
+
+    # signal gets emitted with number of skipped and executed status updates
+    statuscache = pyqtSignal(int, int)
+
+    # changed paths of a status update that has not been started yet
+    _NOT_PENDING = object()
+
     def __init__(self, workerSlot):
         super().__init__()
         self._workerSlot = workerSlot
+        self._lock = threading.Lock()
+        self._changedPaths = GitStatusWorker._NOT_PENDING
+        self._facets = None  # changed facets of pending update, None for unknown
+        # number of running updates superseded since last completed update, guarded by lock
+        self._superseded = 0
+        self._latest = None  # last completed GitStatus, base of skipped and partial updates
+        self._gitDirs = None  # git and common directory of repository, looked up when needed
+        self.hits = 0  # number of status updates skipped since fingerprint was unchanged
+        self.misses = 0  # number of status updates executed
+
+    maxSuperseded = 3  # number of running updates that may get superseded in a row
 
     @pyqtSlot(object)
-    def updateStatus(self, status):
-        """Update selected GitStatus of a git repo"""
-        self._workerSlot.schedule(self._onUpdateStatus, status)
+    def updateStatus(self, status, changedPaths=None, facets=None):
+        """Update selected GitStatus of a git repo, skipped when given changed paths
+        can't have changed the last completed GitStatus. Requests get merged until the update
+        starts, an update for unknown changes ( i.e. changedPaths is None ) always runs.
+        Given changed facets limit the update to the parts of the status depending on them,
+        None updates all parts.
+        A running update gets superseded by a request for unknown changes or changes
+        of the working tree."""
+        self._mergePending(changedPaths, facets)
+        self._workerSlot.schedule(self._onUpdateStatus, status, key="status")
+        if facets is not None:
+            worktreeChange = FACET_WORKTREE in facets
+        else:
+            worktreeChange = changedPaths is None or any(
+                not self._isGitPath(status.path, p) for p in changedPaths
+            )
+        if not worktreeChange:
+            return
+        with self._lock:
+            superseded = (
+                self._superseded < GitStatusWorker.maxSuperseded
+                and self._workerSlot.supersede("status")
+            )
+            if superseded:
+                self._superseded += 1
+        if superseded:
+            LOGGER.debug("Superseded status update of {}".format(status.path))
+
+    def _isGitPath(self, root, path):
+        """Returns true when given absolute path is within a git directory of repository at root,
+        e.g. within .git/modules/ of the superproject for a submodule"""
+        if self._gitDirs is None:
+            try:
+                repo = git.Repo(root)
+                self._gitDirs = (repo.git_dir, repo.common_dir)
+            except:
+                LOGGER.exception("Invalid repository at {}".format(root))
+                return False
+        return any(path == d or path.startswith(d + os.sep) for d in self._gitDirs)
+
+    def _mergePending(self, changedPaths, facets):
+        with self._lock:
+            pending = self._changedPaths
+            if pending is GitStatusWorker._NOT_PENDING:
+                self._facets = None if facets is None else set(facets)
+            elif self._facets is not None:
+                self._facets = None if facets is None else self._facets | set(facets)
+            if pending is GitStatusWorker._NOT_PENDING:
+                pending = changedPaths
+            elif pending is not None:
+                pending = None if changedPaths is None else sorted(set(pending) | set(changedPaths))
+            self._changedPaths = pending
+
+    @staticmethod
+    def _unchanged(previous, changedPaths):
+        """Returns true when given previous GitStatus is still valid after change of given paths"""
+        fingerprint = previous.fingerprint if previous else None
+        if not fingerprint or changedPaths is None:
+            return False
+        if not all(fingerprint.covers(p) for p in changedPaths):
+            return False
+        return fingerprint.unchanged()
 
     def _onUpdateStatus(self, status):
         """Update selected GitStatus of a git repo"""
+        previous = self._latest  # resolved when running, a queued update may follow another
+        with self._lock:
+            changedPaths = self._changedPaths
+            facets = self._facets
+            self._changedPaths = GitStatusWorker._NOT_PENDING
+            self._facets = None
+        if changedPaths is GitStatusWorker._NOT_PENDING:
+            return  # pending changes got merged into previous update that started meanwhile
+        if self._unchanged(previous, changedPaths):
+            self.hits += 1
+            LOGGER.info(
+                "Status unchanged for repository at {} (hits={} misses={})".format(
+                    status.path, self.hits, self.misses
+                )
+            )
+            self.statuscache.emit(self.hits, self.misses)
+            self.statusvalidated.emit(previous)
+            self.statusprogress.emit(False)
+            return
+        self.misses += 1
+        self.statuscache.emit(self.hits, self.misses)
         self.statusprogress.emit(True)
         try:
-            status.update()
+            status.update(facets, previous)
+        except TaskCancelled:
+            # changes are still pending for the superseding update
+            self._mergePending(changedPaths, facets)
+            self.statusprogress.emit(False)
+            raise
         except:
             LOGGER.exception("Failed to update git status at {}".format(status.path))
+        with self._lock:
+            self._superseded = 0
+        self._latest = status
         self.statusupdated.emit(status)
         self.statusprogress.emit(False)
 
@@ -599,9 +1185,8 @@ class GitStatusWorker(QObject):
 class GitFetchWorker(QObject):
     """Host git fetch action within worker thread"""
 
-    concurrent_fetch_count = 0
-    concurrent_fetch_lock = threading.Lock()
-    max_concurrent_fetch_count = 8
+    # shared by all repositories, limits concurrent fetches in total and per remote host
+    admission = FetchAdmission()
 
     # signal gets emitted when starting/stopping fetch action
     fetchprogress = pyqtSignal(bool)
@@ -612,56 +1197,180 @@ class GitFetchWorker(QObject):
     # signal gets emitted when an error happened during fetch
     error = pyqtSignal(str)
 
-    def __init__(self, workerSlot):
-        super().__init__()
-        self._workerSlot = workerSlot
+    # signal gets emitted with number of skipped and executed fetches after probing remote refs
+    fetchprobe = pyqtSignal(int, int)
 
-    def _aquireFetchSlot(self):
-        """Try to acquire fetch slot, returns true on success.
-        Caller should retry with delay to acquire again."""
-        with GitFetchWorker.concurrent_fetch_lock:
-            if GitFetchWorker.concurrent_fetch_count > GitFetchWorker.max_concurrent_fetch_count:
-                return False
-            GitFetchWorker.concurrent_fetch_count += 1
-        return True
+    # signal gets emitted with outcome of a fetch, one of FETCH_CHANGED, FETCH_UNCHANGED,
+    # FETCH_FAILED or FETCH_NO_REMOTE, before fetchprogress signals the end of the fetch
+    fetchdone = pyqtSignal(str)
+
+    # signal gets emitted for every output line of a submodule fetch with absolute path
+    # of submodule and line
+    submoduleoutput = pyqtSignal(str, str)
+
+    DEFAULT_REFSPEC = "+refs/heads/*:refs/remotes/origin/*"
 
-    def _releaseFetchSlot(self):
-        """Release fetch slot"""
-        with GitFetchWorker.concurrent_fetch_lock:
-            if GitFetchWorker.concurrent_fetch_count > 0:
-                GitFetchWorker.concurrent_fetch_count -= 1
+    submodule_re = re.compile(r"^Fetching submodule (?P<path>.+)$")
+    submodule_errors_re = re.compile(r"^Errors during submodule fetch")
+
+    def __init__(self, workerSlot, timeouts=(0, 0), probe=True, submoduleJobs=0):
+        super().__init__()
+        self._workerSlot = workerSlot
+        self._timeouts = timeouts  # seconds of runtime and inactivity before fetch gets terminated
+        self._probe = probe  # whether to skip fetch when remote refs are unchanged
+        self._submoduleJobs = submoduleJobs  # parallel submodule fetches, zero to not recurse
+        self._submodule = None  # absolute path of submodule whose fetch output is processed
+        self._lock = threading.Lock()
+        self._ticket = None  # ticket of fetch that waits for admission or for being started
+        self._runnable = None  # last scheduled task of fetch
+        self.hits = 0  # number of fetches skipped since remote refs were unchanged
+        self.misses = 0  # number of fetches executed after probing remote refs
+        self.probeTime = 0.0  # seconds spent probing remote refs
+        self.fetchTime = 0.0  # seconds spent fetching after probing remote refs
+
+    noticeableWait = 1.0  # seconds of waiting for fetch admission that get shown in output
 
     def fetch(self, path):
         """Fetch selected repo"""
-        self._workerSlot.schedule(self._onFetch, path)
+        self._runnable = self._workerSlot.schedule(self._onRequestFetch, path)
 
-    def _onFetch(self, path):
-        """Fetch selected repo"""
+    def cancel(self):
+        """Withdraw fetch that is still waiting for admission or cancel the admitted fetch"""
+        with self._lock:
+            ticket, self._ticket = self._ticket, None
+        runnable, self._runnable = self._runnable, None
+        if runnable:
+            self._workerSlot.cancel(runnable)
+        if ticket:
+            GitFetchWorker.admission.release(ticket)
+            self.fetchprogress.emit(False)  # fetch didn't start, its end won't get reported
+
+    def _onRequestFetch(self, path):
+        """Request admission to fetch selected repo, the fetch gets scheduled when admitted"""
         self.fetchprogress.emit(True)
         try:
-            while not self._aquireFetchSlot():
-                # prevent multiple fetch starting instantly
-                time.sleep(1 + 1.0 / random.randint(1, 10))
             repo = git.Repo(path)
             remote_url = repo.git.config("remote.origin.url", local=True, with_exceptions=False)
             if remote_url:
-                proc = repo.git.fetch(
-                    "origin",
-                    prune=True,
-                    no_recurse_submodules=True,
-                    verbose=True,
-                    with_extended_output=True,
-                    as_process=True,
-                )
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
-            else:
-                LOGGER.warning("Skipped fetching git repo at {}: missing remote url".format(path))
+                with self._lock:
+                    self._ticket = GitFetchWorker.admission.request(
+                        remote_host(remote_url), lambda ticket: self._onAdmitted(path, ticket)
+                    )
+                return
+            LOGGER.info("Skipped fetching git repo at {}: missing remote url".format(path))
+            outcome = FETCH_NO_REMOTE
         except:
             LOGGER.exception("Failed to fetch git repo at {}".format(path))
             self.error.emit("Failed to fetch")
-        self._releaseFetchSlot()
+            outcome = FETCH_FAILED
+        self.fetchdone.emit(outcome)
         self.fetchprogress.emit(False)
 
+    def _onAdmitted(self, path, ticket):
+        self._runnable = self._workerSlot.schedule(self._onFetch, path, ticket)
+
+    def _onFetch(self, path, ticket):
+        """Fetch selected repo"""
+        with self._lock:
+            if self._ticket is not ticket:
+                return  # withdrawn
+            self._ticket = None
+        outcome = FETCH_FAILED
+        try:
+            LOGGER.debug("Fetching git repo at {} after waiting {:.1f}s for host {}".format(
+                path, ticket.waited, ticket.host or "<local>"))
+            if ticket.waited >= GitFetchWorker.noticeableWait:
+                self.output.emit("Waited {:.1f}s for fetch admission".format(ticket.waited))
+            repo = git.Repo(path)
+            share_ssh_connections(repo)
+            recurse = self.fetchesSubmodules(path)
+            # probe only covers refs of this repository, not the ones of its submodules
+            if self._probe and not recurse and self._remoteRefsUnchanged(repo):
+                outcome = FETCH_UNCHANGED
+                return
+            if recurse:
+                kwargs = dict(recurse_submodules="yes", jobs=self._submoduleJobs)
+            else:
+                kwargs = dict(no_recurse_submodules=True)
+            started = time.monotonic()
+            proc = repo.git.fetch(
+                "origin",
+                prune=True,
+                verbose=True,
+                with_extended_output=True,
+                as_process=True,
+                **kwargs
+            )
+            self._submodule = None
+            onOutput = lambda line: self._onFetchOutput(path, line)
+            handle_tracked_output(proc, onOutput, onOutput, *self._timeouts)
+            if self._probe:
+                self.fetchTime += time.monotonic() - started
+            outcome = FETCH_CHANGED
+        except TaskCancelled:
+            LOGGER.info("Cancelled fetch of git repo at {}".format(path))
+            outcome = None
+        except TaskTimeout as e:
+            LOGGER.warning("Failed to fetch git repo at {}: {}".format(path, e))
+            self.error.emit("Fetch timed out")
+        except:
+            LOGGER.exception("Failed to fetch git repo at {}".format(path))
+            self.error.emit("Failed to fetch")
+        finally:
+            GitFetchWorker.admission.release(ticket)
+            if outcome:
+                self.fetchdone.emit(outcome)
+            self.fetchprogress.emit(False)
+
+    def fetchesSubmodules(self, path):
+        """Returns true when fetch of repo at given path includes its submodules"""
+        return self._submoduleJobs > 0 and os.path.isfile(os.path.join(path, ".gitmodules"))
+
+    def _onFetchOutput(self, path, line):
+        """Route output line of submodule fetch to submodule, others to this repository"""
+        line = line.rstrip()
+        m = self.submodule_re.match(line)
+        if m:
+            # git prints output of every submodule fetch as one block starting with this line
+            self._submodule = os.path.normpath(os.path.join(path, m.group("path")))
+        elif self.submodule_errors_re.match(line):
+            self._submodule = None
+        if self._submodule:
+            LOGGER.debug(line)
+            self.submoduleoutput.emit(self._submodule, line)
+        if not self._submodule or m:
+            self._onOutput(line)
+
+    def _remoteRefsUnchanged(self, repo):
+        """Returns true when `git ls-remote` lists the same branches as stored locally
+        and no unknown tags, i.e. a fetch would not change anything"""
+        refspecs = repo.git.config("--get-all", "remote.origin.fetch", with_exceptions=False)
+        if refspecs.strip() != GitFetchWorker.DEFAULT_REFSPEC:
+            return False
+        started = time.monotonic()
+        lines = []
+        proc = repo.git.ls_remote("--heads", "--tags", "origin", as_process=True)
+        handle_tracked_output(proc, lines.append, None, *self._timeouts)
+        self.probeTime += time.monotonic() - started
+        unchanged = remote_refs_unchanged(parse_ls_remote(lines), local_remote_refs(repo, "origin"))
+        if unchanged:
+            self.hits += 1
+        else:
+            self.misses += 1
+        fetchTime = self.fetchTime / self.misses if self.misses else 0.0
+        LOGGER.info(
+            "Remote refs of {} {} (hits={} misses={} probing {:.1f}s, saved about {:.1f}s)".format(
+                repo.working_tree_dir,
+                "unchanged, skipped fetch" if unchanged else "changed",
+                self.hits,
+                self.misses,
+                self.probeTime,
+                self.hits * fetchTime - self.probeTime,
+            )
+        )
+        self.fetchprobe.emit(self.hits, self.misses)
+        return unchanged
+
     def _onOutput(self, line):
         line = line.rstrip()
         LOGGER.debug(line)
@@ -680,9 +1389,10 @@ class GitPullWorker(QObject):
     # signal gets emitted when an error happened during pull
     error = pyqtSignal(str)
 
-    def __init__(self, workerSlot):
+    def __init__(self, workerSlot, timeouts=(0, 0)):
         super().__init__()
         self._workerSlot = workerSlot
+        self._timeouts = timeouts  # seconds of runtime and inactivity before pull gets terminated
 
     @pyqtSlot(str)
     def pull(self, path):
@@ -693,37 +1403,48 @@ class GitPullWorker(QObject):
     def _onPull(self, path):
         """Pull selected repo"""
         self.pullprogress.emit(True)
+        stashed = False  # whether local changes are kept in stash until pull is done
         try:
             repo = git.Repo(path)
+            share_ssh_connections(repo)
 
             err_hint = "stash save"
             stash_name = "Automatic stash before pull: {}".format(
                 "".join(random.sample(string.ascii_letters + string.digits, 32))
             )
-            dirty = repo.is_dirty()
-            if dirty:
+            if repo.is_dirty():
                 proc = repo.git.stash(
                     "save", stash_name, with_extended_output=True, as_process=True
                 )
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
+                stashed = True
 
             err_hint = "pull"
             proc = repo.git.pull(
                 prune=True, verbose=True, with_extended_output=True, as_process=True
             )
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput, *self._timeouts)
 
             err_hint = "stash pop"
-            stashed = repo.git.stash("list").split("\n")
-            stashed = stash_name in stashed[0] if stashed else False
-            if stashed:
+            stashes = repo.git.stash("list").split("\n")
+            if stashes and stash_name in stashes[0]:
                 proc = repo.git.stash("pop", with_extended_output=True, as_process=True)
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
-
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
+            stashed = False
+
+        except TaskCancelled:
+            LOGGER.warning("Cancelled pull of git repo at {} on {}".format(path, err_hint))
+            self.error.emit("Cancelled " + err_hint)
+        except TaskTimeout as e:
+            LOGGER.warning("Failed to pull git repo at {}: {}".format(path, e))
+            self.error.emit("Timeout on " + err_hint)
         except:
             LOGGER.exception("Failed to pull git repo at {}".format(path))
             self.error.emit("Failed to " + err_hint)
 
+        if stashed:
+            self._onOutput("Local changes are kept in stash '{}'".format(stash_name))
+
         self.pullprogress.emit(False)
 
     def _onOutput(self, line):
@@ -776,18 +1497,18 @@ class GitCheckoutWorker(QObject):
                 proc = repo.git.stash(
                     "save", stash_name, with_extended_output=True, as_process=True
                 )
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
 
             err_hint = "checkout"
             proc = repo.git.checkout(branch, with_extended_output=True, as_process=True)
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
 
             err_hint = "stash pop"
             stashed = repo.git.stash("list").split("\n")
             stashed = stash_name in stashed[0] if stashed else False
             if stashed:
                 proc = repo.git.stash("pop", with_extended_output=True, as_process=True)
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
 
         except:
             LOGGER.exception("Failed to checkout git repo at {}".format(self._path))
@@ -812,7 +1533,7 @@ class GitCheckoutWorker(QObject):
 
             err_hint = "create branch"
             proc = repo.git.checkout("-b", branch, with_extended_output=True, as_process=True)
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
         except:
             LOGGER.exception(
                 "Failed to create branch {} in git repo at {}".format(branch, self._path)
@@ -833,7 +1554,7 @@ class GitCheckoutWorker(QObject):
 
             err_hint = "delete branch"
             proc = repo.git.branch("-D", branch, with_extended_output=True, as_process=True)
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
         except:
             LOGGER.exception(
                 "Failed to delete branch {} in git repo at {}".format(branch, self._path)
@@ -859,13 +1580,13 @@ class GitCheckoutWorker(QObject):
             if merge_conflict:
                 err_hint = "reset"
                 proc = repo.git.reset("--", path, with_extended_output=True, as_process=True)
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
 
             err_hint = "checkout"
             proc = repo.git.checkout(
                 "--", path, force=True, with_extended_output=True, as_process=True
             )
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
         except:
             LOGGER.exception("Failed to checkout {} in git repo at {}".format(path, self._path))
             self.error.emit("Failed to " + err_hint)
@@ -884,7 +1605,7 @@ class GitCheckoutWorker(QObject):
 
             err_hint = "add"
             proc = repo.git.add("--", path, with_extended_output=True, as_process=True)
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
         except:
             LOGGER.exception("Failed to add {} in git repo at {}".format(path, self._path))
             self.error.emit("Failed to " + err_hint)
@@ -902,7 +1623,7 @@ class GitCheckoutWorker(QObject):
 
             err_hint = "unstage"
             proc = repo.git.reset("--", path, with_extended_output=True, as_process=True)
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
         except:
             LOGGER.exception("Failed to unstage {} in git repo at {}".format(path, self._path))
             self.error.emit("Failed to " + err_hint)
@@ -952,7 +1673,7 @@ class GitRebaseWorker(QObject):
         return cfg
 
     def checkRebasing(self):
-        self._workerSlot.schedule(self._onCheckRebasing)
+        self._workerSlot.schedule(self._onCheckRebasing, key="checkRebasing")
 
     def _onCheckRebasing(self):
         """Check whether rebase is still in progress"""
@@ -974,7 +1695,7 @@ class GitRebaseWorker(QObject):
             proc = self._repo.git.stash(
                 "save", self._rebaseStash, with_extended_output=True, as_process=True
             )
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
 
     def _stashPop(self):
         """Pop stash to finalize after rebase finished"""
@@ -984,7 +1705,7 @@ class GitRebaseWorker(QObject):
         stashed = self._rebaseStash in stashed[0] if stashed else False
         if stashed:
             proc = self._repo.git.stash("pop", with_extended_output=True, as_process=True)
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+            handle_tracked_output(proc, self._onOutput, self._onOutput)
         self._rebaseStash = ""
 
     def startRebase(self, ref):
@@ -1007,7 +1728,7 @@ class GitRebaseWorker(QObject):
 
             proc = self._repo.git.rebase(ref, with_extended_output=True, as_process=True)
             try:
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
             except git.exc.GitCommandError as e:
                 LOGGER.error(
                     "Rebase git repo at {} failed or found conflicts: {}".format(self._path, e)
@@ -1031,7 +1752,7 @@ class GitRebaseWorker(QObject):
             kwargs = {"continue": True}
             proc = self._repo.git.rebase(**kwargs, with_extended_output=True, as_process=True)
             try:
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
             except git.exc.GitCommandError as e:
                 LOGGER.error(
                     "Continue rebase git repo at {} failed or found conflicts: {}".format(
@@ -1055,7 +1776,7 @@ class GitRebaseWorker(QObject):
                 return
             proc = self._repo.git.rebase(skip=True, with_extended_output=True, as_process=True)
             try:
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
             except git.exc.GitCommandError as e:
                 LOGGER.error(
                     "Skip rebase git repo at {} failed or found conflicts: {}".format(
@@ -1079,7 +1800,7 @@ class GitRebaseWorker(QObject):
                 return
             proc = self._repo.git.rebase(abort=True, with_extended_output=True, as_process=True)
             try:
-                handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
+                handle_tracked_output(proc, self._onOutput, self._onOutput)
             except git.exc.GitCommandError as e:
                 LOGGER.error(
                     "Abort rebase git repo at {} failed or found conflicts: {}".format(
@@ -1116,10 +1837,12 @@ class GitPushWorker(QObject):
 
     remote_url_re = re.compile(r"remote:\s+(?P<url>http(s?)://\S+)")
 
-    def __init__(self, workerSlot, path):
+    def __init__(self, workerSlot, path, refs, timeouts=(0, 0)):
         super().__init__()
         self._workerSlot = workerSlot
         self._path = path
+        self._refs = refs
+        self._timeouts = timeouts  # seconds of runtime and inactivity before push gets terminated
 
     def pushBranch(self, branch, force=False):
         self._workerSlot.schedule(self._onPushBranch, branch, force=force)
@@ -1129,17 +1852,17 @@ class GitPushWorker(QObject):
         try:
             self.pushprogress.emit(True)
             repo = git.Repo(self._path)
+            share_ssh_connections(repo)
 
             if not repo.active_branch.name:
                 return
 
-            remote = repo.git.config(
-                "branch.{}.remote".format(repo.active_branch.name), with_exceptions=False
-            )
+            self._refs.update(repo)
+            upstream = self._refs.upstream(repo.active_branch.name)
 
             kwargs = {}
             args = []
-            if not remote:
+            if not upstream:
                 kwargs["set_upstream"] = True
                 args.append("origin")
                 args.append(repo.active_branch.name)
@@ -1147,8 +1870,14 @@ class GitPushWorker(QObject):
                 kwargs["force"] = True
 
             proc = repo.git.push(*args, **kwargs, with_extended_output=True, as_process=True)
-            handle_process_output(proc, self._onOutput, self._onOutput, finalize_process)
-
+            handle_tracked_output(proc, self._onOutput, self._onOutput, *self._timeouts)
+
+        except TaskCancelled:
+            LOGGER.warning("Cancelled push of git repo at {}".format(self._path))
+            self.error.emit("Push cancelled")
+        except TaskTimeout as e:
+            LOGGER.warning("Failed to push git repo at {}: {}".format(self._path, e))
+            self.error.emit("Push timed out")
         except:
             LOGGER.exception("Failed to push git repo at {}".format(self._path))
             self.error.emit("Failed to push")
@@ -1177,6 +1906,8 @@ class ChangedFilesModel(QAbstractItemModel, QmlTypeMixin):
 
     Q_ENUMS(Role)
 
+    StatusOrder = {"modified": 0, "staged": 1, "deleted": 2, "conflict": 3, "untracked": 4}
+
     def __init__(self, parent=None):
         """Construct changed files model"""
         super().__init__(parent)
@@ -1214,15 +1945,50 @@ class ChangedFilesModel(QAbstractItemModel, QmlTypeMixin):
     def setChanges(
             self, modified=None, staged=None, deleted=None, conflicting=None, untracked=None
     ):
-        self.beginResetModel()
+        """
+        Update entries to given changes, only rows of entries that appeared or disappeared
+        get inserted or removed. Nothing is emitted when changes are the same as before.
+        """
         entries = []
         entries += [ChangedPath(p, "modified") for p in modified] if modified else []
         entries += [ChangedPath(p, "staged") for p in staged] if staged else []
         entries += [ChangedPath(p, "deleted") for p in deleted] if deleted else []
         entries += [ChangedPath(p, "conflict") for p in conflicting] if conflicting else []
         entries += [ChangedPath(p, "untracked") for p in untracked] if untracked else []
-        self._entries = entries
-        self.endResetModel()
+        entries.sort(key=ChangedFilesModel._sortKey)
+        if entries == self._entries:
+            return
+
+        # remove rows of vanished entries, back to front to keep row numbers valid
+        current = set(entries)
+        for first, last in reversed(ChangedFilesModel._runs(self._entries, current)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._entries[first:last + 1]
+            self.endRemoveRows()
+
+        # remaining entries are in same order as new ones, insert new entries front to back
+        previous = set(self._entries)
+        for first, last in ChangedFilesModel._runs(entries, previous):
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._entries[first:first] = entries[first:last + 1]
+            self.endInsertRows()
+
+    @staticmethod
+    def _sortKey(entry):
+        return ChangedFilesModel.StatusOrder[entry.status], entry.path.lower(), entry.path
+
+    @staticmethod
+    def _runs(entries, keep):
+        """Returns list of tuples ( first, last ) of consecutive rows of entries not in keep"""
+        runs = []
+        for row, entry in enumerate(entries):
+            if entry in keep:
+                continue
+            if runs and runs[-1][1] == row - 1:
+                runs[-1] = (runs[-1][0], row)
+            else:
+                runs.append((row, row))
+        return runs
 
 
 OutputLine = NamedTuple("OutputLine", [("timestamp", str), ("line", str)])
@@ -1321,20 +2087,17 @@ class Repo(QObject, QmlTypeMixin):
     branchesChanged = pyqtSignal("QStringList")
     remoteBranchesChanged = pyqtSignal("QStringList")
     mergedToTrunkBranchesChanged = pyqtSignal("QStringList")
-    commitsChanged = pyqtSignal("QStringList")
+    headChanged = pyqtSignal(str)
     remoteUrlChanged = pyqtSignal(str, arguments=["url"])
 
     trackingBranchChanged = pyqtSignal(str)
     trackingBranchAheadChanged = pyqtSignal(int)
-    trackingBranchAheadCommitsChanged = pyqtSignal("QStringList")
     trackingBranchBehindChanged = pyqtSignal(int)
-    trackingBranchBehindCommitsChanged = pyqtSignal("QStringList")
 
     trunkBranchChanged = pyqtSignal(str)
     trunkBranchAheadChanged = pyqtSignal(int)
-    trunkBranchAheadCommitsChanged = pyqtSignal("QStringList")
     trunkBranchBehindChanged = pyqtSignal(int)
-    trunkBranchBehindCommitsChanged = pyqtSignal("QStringList")
+    commitRangesChanged = pyqtSignal()  # commits that are ahead/behind have changed
 
     untrackedChanged = pyqtSignal(int)
     modifiedChanged = pyqtSignal(int)
@@ -1350,17 +2113,33 @@ class Repo(QObject, QmlTypeMixin):
     pushingChanged = pyqtSignal(bool)
 
     statusUpdated = pyqtSignal()
+    staleChanged = pyqtSignal(bool)
+    statusCacheChanged = pyqtSignal(int, int)  # number of skipped and executed status updates
+    fetchProbeChanged = pyqtSignal(int, int)  # number of skipped and executed fetches
+    submoduleOutput = pyqtSignal(str, str)  # output line of given submodule fetched recursively
 
     commitDetails = pyqtSignal(object)
     commitDetailChanged = pyqtSignal(str)  # detail info of given shahex commit changed
+    # details of given shahex commit got loaded, complete when including changes and diff
+    commitLoaded = pyqtSignal(str, object, bool)
 
     error = pyqtSignal(str, arguments=["msg"])
 
     busyChanged = pyqtSignal(bool)
 
+    inViewChanged = pyqtSignal(bool)
+    selectedChanged = pyqtSignal(bool)
+    priorityChanged = pyqtSignal(int)
+
     close = pyqtSignal()
 
-    def __init__(self, path, name="", parent=None):
+    # priorities of background tasks, higher priority tasks run first
+    PRIORITY_HIDDEN = 0
+    PRIORITY_VISIBLE = 1
+    PRIORITY_SELECTED = 2
+    PRIORITY_ACTION = 3
+
+    def __init__(self, path, name="", parent=None, config=None):
         super().__init__(parent)
         self._path = os.path.normpath(os.path.abspath(path))
         self._name = name or os.path.basename(self._path)
@@ -1368,35 +2147,65 @@ class Repo(QObject, QmlTypeMixin):
         self._changes = ChangedFilesModel(self)
         self._output = OutputModel(self)
 
-        self.workerSlot = WorkerSlot(self)
-        self.workerSlot.busyChanged.connect(self.busyChanged)
-
-        self._statusWorker = GitStatusWorker(self.workerSlot)
+        self._tag_index = TagIndex()
+        self._tag_repo = None  # git.Repo to re-index tags when reading commits
+        self._ref_snapshot = RefSnapshot()
+
+        # separate lanes, a slow network operation doesn't delay status or checkout,
+        # configured like all repositories when given Config of ReposModel
+        general = (config or self._config()).general()
+        self.networkSlot = WorkerSlot(self, general["network-concurrency"])
+        self.readSlot = WorkerSlot(self, general["read-concurrency"])
+        self.writeSlot = WorkerSlot(self, general["write-concurrency"])
+        self._busy = False
+        for slot in (self.networkSlot, self.readSlot, self.writeSlot):
+            slot.busyChanged.connect(self._onSlotBusyChanged)
+
+        self._inView = False  # whether repository is shown on screen
+        self._selected = False  # whether repository is selected by user
+        self._priority = Repo.PRIORITY_HIDDEN
+        self.checkingoutChanged.connect(self._updatePriority)
+        self.pullingChanged.connect(self._updatePriority)
+        self.pushingChanged.connect(self._updatePriority)
+
+        self._statusWorker = GitStatusWorker(self.readSlot)
         self._statusWorker.statusprogress.connect(self._onUpdating)
         self._statusWorker.statusupdated.connect(self._onStatusUpdated)
+        self._statusWorker.statuscache.connect(self.statusCacheChanged)
+        self._statusWorker.statusvalidated.connect(self._onStatusValidated)
 
-        self._fetchWorker = GitFetchWorker(self.workerSlot)
+        timeouts = (general["network-timeout"], general["network-inactivity-timeout"])
+        self._fetchWorker = GitFetchWorker(
+            self.networkSlot, timeouts, general["fetch-probe"], general["fetch-submodule-jobs"]
+        )
+        self._fetchWorker.fetchprobe.connect(self.fetchProbeChanged)
+        self._fetchWorker.submoduleoutput.connect(self.submoduleOutput)
+        self._fetchWorker.fetchdone.connect(self._onFetchDone)
+        self.fetchSchedule = FetchSchedule(
+            general["fetch-interval"], general["fetch-max-interval"], general["fetch-jitter"]
+        )
         self._fetchWorker.fetchprogress.connect(self._setFetching)
         self._fetchWorker.output.connect(self._output.appendOutput)
         self._fetchWorker.error.connect(self.error)
 
-        self._pullWorker = GitPullWorker(self.workerSlot)
+        # pull changes the working tree, it must not run alongside checkout, stage or rebase
+        self._pullWorker = GitPullWorker(self.writeSlot, timeouts)
         self._pullWorker.pullprogress.connect(self._setPulling)
         self._pullWorker.output.connect(self._output.appendOutput)
         self._pullWorker.error.connect(self.error)
 
-        self._checkoutWorker = GitCheckoutWorker(self.workerSlot, self._path)
+        self._checkoutWorker = GitCheckoutWorker(self.writeSlot, self._path)
         self._checkoutWorker.checkoutprogress.connect(self._setCheckingOut)
         self._checkoutWorker.output.connect(self._output.appendOutput)
         self._checkoutWorker.error.connect(self.error)
 
-        self._rebaseWorker = GitRebaseWorker(self.workerSlot, self._path)
+        self._rebaseWorker = GitRebaseWorker(self.writeSlot, self._path)
         self._rebaseWorker.rebaseprogress.connect(self._setRebasing)
         self._rebaseWorker.output.connect(self._output.appendOutput)
         self._rebaseWorker.error.connect(self.triggerUpdate)
         self._rebaseWorker.error.connect(self.error)
 
-        self._pushWorker = GitPushWorker(self.workerSlot, self._path)
+        self._pushWorker = GitPushWorker(self.networkSlot, self._path, self._ref_snapshot, timeouts)
         self._pushWorker.pushprogress.connect(self._setPushing)
         self._pushWorker.output.connect(self._output.appendOutput)
         self._pushWorker.error.connect(self.error)
@@ -1405,23 +2214,25 @@ class Repo(QObject, QmlTypeMixin):
         self._commit_cache = OrderedDict()
         self._commit_cache_max_size = 250
         self._commit_cache_lock = threading.Lock()
+        self._catfile = CatFileBatch(self._path)
 
         self._branch = ""
         self._detached = False
         self._branches = []
         self._remote_branches = []
         self._merged_to_trunk_branches = []
-        self._commits = []
-        self._commit_tags = {}
+        self._head = ""
         self._remote_url = ""
 
         self._tracking_branch = ""
-        self._tracking_branch_ahead_commits = []
-        self._tracking_branch_behind_commits = []
+        self._tracking_branch_ahead = 0
+        self._tracking_branch_behind = 0
 
         self._trunk_branch = ""
-        self._trunk_branch_ahead_commits = []
-        self._trunk_branch_behind_commits = []
+        self._trunk_branch_ahead = 0
+        self._trunk_branch_behind = 0
+
+        self._ahead_behind_revs = ()
 
         self._untracked = 0
         self._modified = 0
@@ -1430,10 +2241,13 @@ class Repo(QObject, QmlTypeMixin):
         self._staged = 0
 
         self._updating = False
-        self._updateTriggered = False
+        self._status = None  # last GitStatus of repository
+        self._stale = False  # whether last status is restored and not yet validated
 
-        self._fetching = False
+        self._fetching = False  # whether own fetch or fetch of superproject is running
         self._fetchTriggered = False
+        self._ownFetching = False
+        self._superprojectFetching = False
 
         self._pulling = False
         self._pullTriggered = False
@@ -1450,9 +2264,66 @@ class Repo(QObject, QmlTypeMixin):
     def __str__(self):
         return self._path
 
+    def cleanup(self):
+        """Stop helper processes of this repository, a running pull or push gets completed
+        since cancelling it could leave the working tree stashed or half merged"""
+        self._fetchWorker.cancel()
+        self.readSlot.cancelAll()
+        self._catfile.stop()
+
+    def _onSlotBusyChanged(self):
+        busy = self.networkSlot.busy or self.readSlot.busy or self.writeSlot.busy
+        if busy != self._busy:
+            self._busy = busy
+            self.busyChanged.emit(busy)
+
     @pyqtProperty(bool, notify=busyChanged)
     def busy(self):
-        return self.workerSlot.busy
+        return self._busy
+
+    @pyqtProperty(bool, notify=inViewChanged)
+    def inView(self):
+        """True when repository is visible on screen, set by view"""
+        return self._inView
+
+    @inView.setter
+    def inView(self, inView):
+        if self._inView != inView:
+            self._inView = inView
+            self.inViewChanged.emit(self._inView)
+            self._updatePriority()
+
+    @pyqtProperty(bool, notify=selectedChanged)
+    def selected(self):
+        """True when repository is selected by user, set by view"""
+        return self._selected
+
+    @selected.setter
+    def selected(self, selected):
+        if self._selected != selected:
+            self._selected = selected
+            self.selectedChanged.emit(self._selected)
+            self._updatePriority()
+
+    @pyqtProperty(int, notify=priorityChanged)
+    def priority(self):
+        """Priority of background tasks, one of the PRIORITY_* values"""
+        return self._priority
+
+    def _updatePriority(self):
+        if self._checkingout or self._pulling or self._pushing:
+            priority = Repo.PRIORITY_ACTION
+        elif self._selected:
+            priority = Repo.PRIORITY_SELECTED
+        elif self._inView:
+            priority = Repo.PRIORITY_VISIBLE
+        else:
+            priority = Repo.PRIORITY_HIDDEN
+        if self._priority != priority:
+            self._priority = priority
+            for slot in (self.networkSlot, self.readSlot, self.writeSlot):
+                slot.priority = priority
+            self.priorityChanged.emit(self._priority)
 
     @pyqtProperty(QObject, constant=True)
     def changes(self):
@@ -1470,36 +2341,133 @@ class Repo(QObject, QmlTypeMixin):
         if self._updating != updating:
             self._updating = updating
             self.updatingChanged.emit(self._updating)
-        if not updating:
-            self._updateTriggered = False
 
     @pyqtSlot()
     def triggerUpdate(self):
-        if self._updateTriggered:
-            LOGGER.debug("Status update already triggered...")
+        self._triggerUpdate(None)
+
+    def revalidate(self, facets=None):
+        """Trigger status update, it gets skipped when the repository is unchanged since the last
+        status. Optional list of facets that might have changed limits the update to the parts
+        depending on them. A stale status always gets fully updated"""
+        self._triggerUpdate([], facets)
+
+    def triggerChangedUpdate(self, changedPaths, facets=None):
+        """Trigger status update for change of given absolute paths,
+        the update gets skipped when the paths can't have changed the status
+        and is limited to the parts depending on given changed facets"""
+        self._triggerUpdate(changedPaths, facets)
+
+    def _triggerUpdate(self, changedPaths, facets=None):
+        if self._stale:
+            # restored status is no base for skipping or partial updates, its fingerprint
+            # misses changes made while gitover wasn't running, e.g. to clean tracked files,
+            # and tag index and refs snapshot get populated by a full update only
+            changedPaths, facets = None, None
+        self._statusWorker.updateStatus(
+            GitStatus(self._path, self._tag_index, self._ref_snapshot), changedPaths, facets
+        )
+
+    def restoreStatus(self, data):
+        """Show status from given dictionary as returned by snapshot(), marked as stale"""
+        try:
+            status = GitStatus.fromJson(self._path, data, self._tag_index, self._ref_snapshot)
+        except:
+            LOGGER.exception("Failed to restore status of {}".format(self._path))
             return
-        self._statusWorker.updateStatus(GitStatus(self._path))
-        self._updateTriggered = True
+        self.stale = True
+        self._applyStatus(status)
+
+    def snapshot(self):
+        """Returns last status as JSON serializable dictionary or None"""
+        return self._status.toJson() if self._status else None
+
+    @pyqtProperty(bool, notify=staleChanged)
+    def stale(self):
+        """True when shown status is restored from last session and not yet validated"""
+        return self._stale
+
+    @stale.setter
+    def stale(self, stale):
+        if self._stale != stale:
+            self._stale = stale
+            self.staleChanged.emit(self._stale)
+
+    def _onStatusValidated(self, status):
+        if status is self._status:
+            self.stale = False
+
+    @pyqtProperty(int, notify=statusCacheChanged)
+    def statusCacheHits(self):
+        """Number of status updates skipped since repository was unchanged"""
+        return self._statusWorker.hits
+
+    @pyqtProperty(int, notify=statusCacheChanged)
+    def statusCacheMisses(self):
+        """Number of status updates executed"""
+        return self._statusWorker.misses
+
+    @pyqtProperty(int, notify=fetchProbeChanged)
+    def fetchProbeHits(self):
+        """Number of fetches skipped since remote refs were unchanged"""
+        return self._fetchWorker.hits
+
+    @pyqtProperty(int, notify=fetchProbeChanged)
+    def fetchProbeMisses(self):
+        """Number of fetches executed after probing remote refs"""
+        return self._fetchWorker.misses
 
     @pyqtProperty(bool, notify=fetchingChanged)
     def fetching(self):
         return self._fetching
 
     def _setFetching(self, fetching):
+        self._ownFetching = fetching
+        self._updateFetching()
+        if not fetching:
+            self._fetchTriggered = False
+            # fetched refs change the fingerprint of the last status
+            self.revalidate([FACET_REMOTE_REFS, FACET_LOCAL_REFS])
+
+    def _updateFetching(self):
+        fetching = self._ownFetching or self._superprojectFetching
         if self._fetching != fetching:
             self._fetching = fetching
             self.fetchingChanged.emit(self._fetching)
+
+    @property
+    def fetchesSubmodules(self):
+        """True when fetch of repository includes its submodules"""
+        return self._fetchWorker.fetchesSubmodules(self._path)
+
+    def superprojectFetching(self, fetching):
+        """Show fetch of superproject that includes this repository as own fetch,
+        an own fetch doesn't get triggered meanwhile"""
+        if self._superprojectFetching == fetching:
+            return
+        self._superprojectFetching = fetching
+        self._updateFetching()
         if not fetching:
-            self._fetchTriggered = False
-            self.triggerUpdate()
+            self.revalidate([FACET_REMOTE_REFS, FACET_LOCAL_REFS])
+
+    def _onFetchDone(self, outcome):
+        self.fetchSchedule.done(outcome)
+        LOGGER.debug("Fetch of {} {}, next periodic fetch in {}".format(
+            self._path, outcome,
+            "{:.0f}s".format(self.fetchSchedule.due - time.monotonic())
+            if self.fetchSchedule.due is not None else "never"))
 
     @pyqtSlot()
     def triggerFetch(self):
         if self._fetchTriggered:
             LOGGER.debug("Fetch already triggered...")
             return
+        if self._superprojectFetching:
+            LOGGER.debug("Fetch of superproject includes {}...".format(self._path))
+            return
         self._fetchWorker.fetch(self._path)
         self._fetchTriggered = True
+        self.fetchSchedule.started()
 
     @pyqtProperty(bool, notify=pullingChanged)
     def pulling(self):
@@ -1599,23 +2567,31 @@ class Repo(QObject, QmlTypeMixin):
 
     @pyqtSlot(object)
     def _onStatusUpdated(self, status):
+        self.stale = False
+        self._applyStatus(status)
+
+    def _applyStatus(self, status):
         def sorteditems(it):
             l = list(it)
             l.sort(key=str.lower)
             return l
 
+        self._status = status
         self.branch = status.branch
         self.detached = status.detached
         self.branches = sorteditems(status.branches)
         self.remoteBranches = sorteditems(status.remoteBranches)
         self.mergedToTrunkBranches = sorteditems(status.mergedToTrunkBranches)
-        self.commits = status.commits
+        self.head = status.head
         self.trackingBranch = status.trackingBranch
-        self.trackingBranchAheadCommits = status.trackingBranchAhead
-        self.trackingBranchBehindCommits = status.trackingBranchBehind
+        self.trackingBranchAhead = status.trackingBranchAhead
+        self.trackingBranchBehind = status.trackingBranchBehind
         self.trunkBranch = status.trunkBranch
-        self.trunkBranchAheadCommits = status.trunkBranchAhead
-        self.trunkBranchBehindCommits = status.trunkBranchBehind
+        self.trunkBranchAhead = status.trunkBranchAhead
+        self.trunkBranchBehind = status.trunkBranchBehind
+        if self._ahead_behind_revs != status.aheadBehindRevs:
+            self._ahead_behind_revs = status.aheadBehindRevs
+            self.commitRangesChanged.emit()
         self.untracked = len(status.untracked)
         self.modified = len(status.modified)
         self.deleted = len(status.deleted)
@@ -1632,7 +2608,7 @@ class Repo(QObject, QmlTypeMixin):
 
         self._rebaseWorker.checkRebasing()
         self.statusUpdated.emit()
-        self._set_commit_tags(status.commit_tags)
+        self._updateCommitTags()
 
     def _config(self):
         cfg = Config()
@@ -1756,9 +2732,7 @@ class Repo(QObject, QmlTypeMixin):
             cmds.append(dict(name="__rebaseskip", title="Skip rebase"))
             cmds.append(dict(name="__rebaseabort", title="Abort rebase"))
         if branchValid:
-            updatedTrackingBranch = (
-                    self._tracking_branch_behind_commits or self._tracking_branch_ahead_commits
-            )
+            updatedTrackingBranch = self._tracking_branch_behind or self._tracking_branch_ahead
             if not self._tracking_branch or updatedTrackingBranch:
                 cmds.append(dict(name="__push", title="Push"))
             if updatedTrackingBranch:
@@ -1824,11 +2798,52 @@ class Repo(QObject, QmlTypeMixin):
             diff += "\n...omitted more data..."
         return diff
 
+    def commitInfo(self, rev):
+        """
+        Returns CommitDetail of given sha-hex revision without changes and diff.
+        Read through long-lived cat-file process, i.e. without spawning a process per commit.
+        """
+        if not rev:
+            return None
+        self._refreshTags()
+        with self._commit_cache_lock:
+            cd = self._commit_cache.get(rev)
+        if cd:
+            return cd._replace(changes=[], diff="")
+        try:
+            c = self._catfile.commit(rev)
+            if not c:
+                return None
+            return CommitDetail(
+                c.rev, c.rev[:8], c.date, c.user, c.msg, self._tag_index.tags(c.rev), [], ""
+            )
+        except:
+            LOGGER.exception("Failed to get commit info for {} in {}".format(rev, self._path))
+            return None
+
+    def loadCommit(self, rev):
+        """
+        Schedule loading details of given sha-hex commit, see commitLoaded signal.
+        Loading the same commit again gets merged while it is still queued.
+        Returns runnable that can be cancelled using readSlot.
+        """
+        return self.readSlot.schedule(self._loadCommit, rev, key="commit:{}".format(rev))
+
+    def _loadCommit(self, rev):
+        if rev not in self._commit_cache:
+            info = self.commitInfo(rev)
+            if info:
+                self.commitLoaded.emit(rev, info, False)
+        detail = self.commit(rev)
+        if detail:
+            self.commitLoaded.emit(rev, detail, True)
+
     @pyqtSlot(str, result=QVariant)
     def commit(self, rev):
         """Returns details for commit of given sha-hex revision"""
         if not rev:
             return None
+        self._refreshTags()
         if not self._commit_cache_lock.acquire(timeout=0.1):
             LOGGER.error("Failed to get commit detail for {} in {}".format(rev, self._path))
             return None
@@ -1837,50 +2852,70 @@ class Repo(QObject, QmlTypeMixin):
                 cd = copy.copy(self._commit_cache[rev])
             else:
                 LOGGER.debug("Commit details for {} in {}".format(rev, self._path))
-                repo = git.Repo(self._path)
-                c = repo.commit(rev)
-                tags = [t.name for t in repo.tags if c.hexsha == t.commit.hexsha]
-                msg = c.message.split("\n")[0].strip()
-                shortrev = repo.git.rev_parse(c.hexsha, short=8)
-                changes = repo.git.diff_tree(
-                    rev, no_commit_id=True, name_status=True, r=True
-                ).split("\n")
-                changes = [CommitChange(*c.split("\t")) for c in changes if c.strip()]
-                LOGGER.debug("Get commit diff for {} in {}".format(rev, self._path))
-                diff = repo.git.diff(c.parents, c)
-                LOGGER.debug("Got commit diff for {} in {}: {}kb".format(rev, self._path, len(diff) // 1024))
+                s = read_commit(git.Repo(self._path), rev, track=track_process)
+                changes = [CommitChange(*ch) for ch in s.changes]
+                LOGGER.debug("Got commit diff for {} in {}: {}kb".format(rev, self._path, len(s.diff) // 1024))
                 cd = CommitDetail(
-                    rev, shortrev, str(c.committed_datetime), c.author.name, msg, tags, changes, diff
+                    rev, s.shortrev, s.date, s.user, s.msg, self._tag_index.tags(s.rev), changes, s.diff
                 )
                 self._commit_cache[rev] = cd
             while len(self._commit_cache) > self._commit_cache_max_size:
                 self._commit_cache.popitem(last=False)
             return cd
         except:
+            check_cancelled()
             LOGGER.exception("Failed to get commit detail for {} in {}".format(rev, self._path))
             return None
         finally:
             self._commit_cache_lock.release()
 
-    @pyqtProperty("QStringList", notify=commitsChanged)
-    def commits(self):
-        return self._commits
+    @pyqtProperty(str, notify=headChanged)
+    def head(self):
+        """Commit of HEAD"""
+        return self._head
+
+    @head.setter
+    def head(self, head):
+        if self._head != head:
+            self._head = head
+            self.headChanged.emit(self._head)
 
-    @commits.setter
-    def commits(self, commits):
-        if self._commits != commits:
-            self._commits = commits
-            self.commitsChanged.emit(self._commits)
+    def commitRangeArgs(self, kind):
+        """
+        Returns list of `git log` arguments that select commits of given kind, i.e. history
+        of HEAD for an empty kind or one of trackingAhead, trackingBehind, trunkAhead
+        or trunkBehind. Returns empty list when there are no such commits.
+        """
+        if not kind:
+            return [self._head] if self._head else []
+        if not self._ahead_behind_revs:
+            return []
+        head, tracking, trunk = self._ahead_behind_revs
+        branch = tracking if kind.startswith("tracking") else trunk
+        if not head or not branch:
+            return []
+        return ["{}...{}".format(branch, head), "--left-only" if kind.endswith("Ahead") else "--right-only"]
+
+    def _refreshTags(self):
+        """Re-index tags when they changed, e.g. by a status update that didn't refresh refs.
+        Cheap when tags are unchanged, only their fingerprint gets compared"""
+        try:
+            if self._tag_repo is None:
+                self._tag_repo = git.Repo(self._path)
+            if self._tag_index.update(self._tag_repo):
+                self._updateCommitTags()
+        except:
+            LOGGER.exception("Failed to index tags for {}".format(self._path))
 
-    def _set_commit_tags(self, commit_tags):
-        outdated_commits = []
+    def _updateCommitTags(self):
+        """Drop cached details of commits whose tags have changed"""
         with self._commit_cache_lock:
-            for rev, tags in commit_tags.items():
-                if self._commit_tags.get(rev, []) != tags:
-                    outdated_commits.append(rev)
-            self._commit_tags = commit_tags
+            outdated_commits = [
+                rev for rev, cd in self._commit_cache.items() if cd.tags != self._tag_index.tags(rev)
+            ]
+            for rev in outdated_commits:
+                self._commit_cache.pop(rev, None)
         for rev in outdated_commits:
-            self._commit_cache.pop(rev, None)
             self.commitDetailChanged.emit(rev)
 
     @pyqtProperty(str, notify=pathChanged)
@@ -1936,37 +2971,23 @@ class Repo(QObject, QmlTypeMixin):
 
     @pyqtProperty(int, notify=trackingBranchAheadChanged)
     def trackingBranchAhead(self):
-        return len(self._tracking_branch_ahead_commits)
-
-    @pyqtProperty("QStringList", notify=trackingBranchAheadCommitsChanged)
-    def trackingBranchAheadCommits(self):
-        return self._tracking_branch_ahead_commits
+        return self._tracking_branch_ahead
 
-    @trackingBranchAheadCommits.setter
-    def trackingBranchAheadCommits(self, ahead):
-        if self._tracking_branch_ahead_commits != ahead:
-            nofChanged = len(self._tracking_branch_ahead_commits) != len(ahead)
-            self._tracking_branch_ahead_commits = ahead
-            self.trackingBranchAheadCommitsChanged.emit(self._tracking_branch_ahead_commits)
-            if nofChanged:
-                self.trackingBranchAheadChanged.emit(self.trackingBranchAhead)
+    @trackingBranchAhead.setter
+    def trackingBranchAhead(self, ahead):
+        if self._tracking_branch_ahead != ahead:
+            self._tracking_branch_ahead = ahead
+            self.trackingBranchAheadChanged.emit(self._tracking_branch_ahead)
 
     @pyqtProperty(int, notify=trackingBranchBehindChanged)
     def trackingBranchBehind(self):
-        return len(self._tracking_branch_behind_commits)
-
-    @pyqtProperty("QStringList", notify=trackingBranchBehindCommitsChanged)
-    def trackingBranchBehindCommits(self):
-        return self._tracking_branch_behind_commits
+        return self._tracking_branch_behind
 
-    @trackingBranchBehindCommits.setter
-    def trackingBranchBehindCommits(self, behind):
-        if self._tracking_branch_behind_commits != behind:
-            nofChanged = len(self._tracking_branch_behind_commits) != len(behind)
-            self._tracking_branch_behind_commits = behind
-            self.trackingBranchBehindCommitsChanged.emit(self._tracking_branch_behind_commits)
-            if nofChanged:
-                self.trackingBranchBehindChanged.emit(self.trackingBranchBehind)
+    @trackingBranchBehind.setter
+    def trackingBranchBehind(self, behind):
+        if self._tracking_branch_behind != behind:
+            self._tracking_branch_behind = behind
+            self.trackingBranchBehindChanged.emit(self._tracking_branch_behind)
 
     @pyqtProperty(str, notify=trunkBranchChanged)
     def trunkBranch(self):
@@ -1980,37 +3001,23 @@ class Repo(QObject, QmlTypeMixin):
 
     @pyqtProperty(int, notify=trunkBranchAheadChanged)
     def trunkBranchAhead(self):
-        return len(self._trunk_branch_ahead_commits)
+        return self._trunk_branch_ahead
 
-    @pyqtProperty("QStringList", notify=trunkBranchAheadCommitsChanged)
-    def trunkBranchAheadCommits(self):
-        return self._trunk_branch_ahead_commits
-
-    @trunkBranchAheadCommits.setter
-    def trunkBranchAheadCommits(self, ahead):
-        if self._trunk_branch_ahead_commits != ahead:
-            nofChanged = len(self._trunk_branch_ahead_commits) != len(ahead)
-            self._trunk_branch_ahead_commits = ahead
-            self.trunkBranchAheadCommitsChanged.emit(self._trunk_branch_ahead_commits)
-            if nofChanged:
-                self.trunkBranchAheadChanged.emit(self.trunkBranchAhead)
+    @trunkBranchAhead.setter
+    def trunkBranchAhead(self, ahead):
+        if self._trunk_branch_ahead != ahead:
+            self._trunk_branch_ahead = ahead
+            self.trunkBranchAheadChanged.emit(self._trunk_branch_ahead)
 
     @pyqtProperty(int, notify=trunkBranchBehindChanged)
     def trunkBranchBehind(self):
-        return len(self._trunk_branch_behind_commits)
-
-    @pyqtProperty("QStringList", notify=trunkBranchBehindCommitsChanged)
-    def trunkBranchBehindCommits(self):
-        return self._trunk_branch_behind_commits
+        return self._trunk_branch_behind
 
-    @trunkBranchBehindCommits.setter
-    def trunkBranchBehindCommits(self, behind):
-        if self._trunk_branch_behind_commits != behind:
-            nofChanged = len(self._trunk_branch_behind_commits) != len(behind)
-            self._trunk_branch_behind_commits = behind
-            self.trunkBranchBehindCommitsChanged.emit(self._trunk_branch_behind_commits)
-            if nofChanged:
-                self.trunkBranchBehindChanged.emit(self.trunkBranchBehind)
+    @trunkBranchBehind.setter
+    def trunkBranchBehind(self, behind):
+        if self._trunk_branch_behind != behind:
+            self._trunk_branch_behind = behind
+            self.trunkBranchBehindChanged.emit(self._trunk_branch_behind)
 
     @pyqtProperty("QStringList", notify=branchesChanged)
     def branches(self):
@@ -2138,7 +3145,7 @@ class CommitDetails(QObject):
 
     def _cancelRunnable(self):
         if self._runnable:
-            self._repository.workerSlot.cancel(self._runnable)
+            self._repository.readSlot.cancel(self._runnable)
         self._runnable = None
 
     @pyqtSlot(str)
@@ -2155,19 +3162,22 @@ class CommitDetails(QObject):
             self.changes = []
             self.diff = ""
         else:
-            self._runnable = self._repository.workerSlot.schedule(self._updateImpl)
-
-    def _updateImpl(self):
-        commitDetail = self._repository.commit(self._rev)
-        if commitDetail and self._runnable:
-            self.shortrev = commitDetail.shortrev
-            self.date = commitDetail.date
-            self.user = commitDetail.user
-            self.msg = commitDetail.msg
-            self.tags = commitDetail.tags
+            self._cancelRunnable()
+            self._runnable = self._repository.loadCommit(self._rev)
+
+    @pyqtSlot(str, object, bool)
+    def _onCommitLoaded(self, rev, commitDetail, complete):
+        if rev != self._rev:
+            return
+        self.shortrev = commitDetail.shortrev
+        self.date = commitDetail.date
+        self.user = commitDetail.user
+        self.msg = commitDetail.msg
+        self.tags = commitDetail.tags
+        if complete:
             self.changes = [{"change": ch.change, "path": ch.path} for ch in commitDetail.changes]
             self.diff = commitDetail.diff
-        self._runnable = None
+            self._runnable = None
 
     @pyqtProperty(Repo, notify=repositoryChanged)
     def repository(self):
@@ -2176,12 +3186,15 @@ class CommitDetails(QObject):
     @repository.setter
     def repository(self, repository):
         if repository != self._repository:
+            self._cancelRunnable()
             if self._repository:
                 self._repository.commitDetailChanged.disconnect(self._onCommitDetailChanged)
+                self._repository.commitLoaded.disconnect(self._onCommitLoaded)
             self._repository = repository
             self.repositoryChanged.emit(self._repository)
             if self._repository:
                 self._repository.commitDetailChanged.connect(self._onCommitDetailChanged)
+                self._repository.commitLoaded.connect(self._onCommitLoaded)
             self._update()
 
     @pyqtProperty("QString", notify=revChanged)
@@ -2191,6 +3204,7 @@ class CommitDetails(QObject):
     @rev.setter
     def rev(self, rev):
         if rev != self._rev:
+            self._cancelRunnable()
             self._rev = rev
             self.revChanged.emit(self._rev)
             self._update()
@@ -2264,3 +3278,235 @@ class CommitDetails(QObject):
         if diff != self._diff:
             self._diff = diff
             self.diffChanged.emit(self._diff)
+
+
+class CommitsModel(QAbstractListModel):
+    """
+    Model of commits of a repository, i.e. its history or the commits ahead/behind of tracking
+    or trunk branch. Commits get read page by page from a running `git log` while the view
+    scrolls down, refreshing the history only prepends new commits.
+    """
+
+    class Role:
+        Rev = Qt.UserRole + 1
+
+    Q_ENUMS(Role)
+
+    repositoryChanged = pyqtSignal(Repo)
+    kindChanged = pyqtSignal(str)
+
+    # signal gets emitted by worker thread with generation of commits, read page of commits
+    # and whether all commits have been read
+    pageRead = pyqtSignal(int, list, bool)
+
+    # signal gets emitted by worker thread with generation of commits, arguments of history
+    # and its new commits to prepend, None when the history has to be reloaded
+    newCommitsRead = pyqtSignal(int, list, object)
+
+    pageSize = 50  # number of commits read per fetch
+    idleTimeout = 30 * 1000  # msec after last fetch when `git log` gets stopped
+
+    @classmethod
+    def registerToQml(cls):
+        qmlRegisterType(cls, "Gitover", 1, 0, "CommitsModel")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._repository = None
+        self._kind = ""
+        self._args = []  # arguments of `git log` that select the commits
+        self._revs = []
+        self._exhausted = False
+        self._reading = False  # whether a page of commits is read by worker thread
+        self._generation = 0  # incremented on reset, pages read for previous commits get dropped
+        self._proc = None
+        self._pendingArgs = None  # arguments of history whose new commits are read
+        self.pageRead.connect(self._onPageRead)
+        self.newCommitsRead.connect(self._onNewCommitsRead)
+        self._idleTimer = QTimer(self)
+        self._idleTimer.setInterval(self.idleTimeout)
+        self._idleTimer.setSingleShot(True)
+        self._idleTimer.timeout.connect(self._stopProcess)
+        self.destroyed.connect(lambda: self._stopProcess())
+
+    def roleNames(self):
+        roles = super().roleNames()
+        roles[CommitsModel.Role.Rev] = b"rev"
+        return roles
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._revs)
+
+    def data(self, idx, role=Qt.DisplayRole):
+        if not idx.isValid() or idx.row() >= len(self._revs):
+            return None
+        if role in (Qt.DisplayRole, CommitsModel.Role.Rev):
+            return self._revs[idx.row()]
+        return None
+
+    @pyqtSlot(int, result=str)
+    def rev(self, row):
+        """Returns sha-hex of commit in given row"""
+        return self._revs[row] if 0 <= row < len(self._revs) else ""
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (
+            not parent.isValid() and bool(self._args) and not self._exhausted and not self._reading
+        )
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Schedule reading next page of commits, they get inserted when read"""
+        if not self.canFetchMore(parent):
+            return
+        try:
+            if not self._proc:
+                self._startProcess()
+        except:
+            LOGGER.exception("Failed to read commits of {}".format(self._repository.path))
+            self._exhausted = True
+            return
+        self._reading = True
+        self._idleTimer.stop()
+        self._repository.readSlot.schedule(self._readPage, self._proc, self._generation)
+
+    def _readPage(self, proc, generation):
+        """Read page of commits from given `git log` process within worker thread"""
+        revs = []
+        exhausted = False
+        try:
+            while len(revs) < self.pageSize:
+                line = proc.stdout.readline()
+                if not line:
+                    exhausted = True
+                    break
+                revs.append(line.decode("ascii").strip())
+        except:
+            if generation == self._generation:
+                LOGGER.exception("Failed to read commits of {}".format(self._repository.path))
+            exhausted = True
+        self.pageRead.emit(generation, revs, exhausted)
+
+    def _onPageRead(self, generation, revs, exhausted):
+        if generation != self._generation:
+            return  # commits got reset while reading
+        self._reading = False
+        self._exhausted = exhausted
+        if self._exhausted:
+            self._stopProcess()
+        else:
+            self._idleTimer.start()
+        if revs:
+            self.beginInsertRows(QModelIndex(), len(self._revs), len(self._revs) + len(revs) - 1)
+            self._revs += revs
+            self.endInsertRows()
+
+    def _startProcess(self):
+        cmd = [git.Git.GIT_PYTHON_GIT_EXECUTABLE, "log", "--format=%H", "--skip={}".format(len(self._revs))]
+        LOGGER.debug("Reading commits of {}: {}".format(self._repository.path, " ".join(cmd + self._args)))
+        self._proc = subprocess.Popen(
+            cmd + self._args,
+            cwd=self._repository.path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _stopProcess(self):
+        if not self._proc:
+            return
+        self._proc.kill()
+        self._proc.wait()
+        self._proc.stdout.close()
+        self._proc = None
+
+    def _reload(self):
+        args = self._repository.commitRangeArgs(self._kind) if self._repository else []
+        if args == (self._args if self._pendingArgs is None else self._pendingArgs):
+            return
+        if not self._kind and self._prepend(args):
+            return
+        self._reset(args)
+
+    def _reset(self, args):
+        self._stopProcess()
+        self.beginResetModel()
+        self._args = args
+        self._revs = []
+        self._exhausted = False
+        self._reading = False
+        self._pendingArgs = None
+        self._generation += 1
+        self.endResetModel()
+
+    def _prepend(self, args):
+        """Schedule prepending commits that are new in history selected by given arguments,
+        returns false when there are no loaded commits to prepend to"""
+        if not self._args or not self._revs or not args:
+            return False
+        self._pendingArgs = args
+        self._repository.readSlot.schedule(
+            self._readNewCommits, self._repository.path, self._args[0], args, self._generation
+        )
+        return True
+
+    def _readNewCommits(self, path, old, args, generation):
+        """Read commits of history selected by given arguments that are new since given old
+        commit within worker thread, None when the old commit is no longer part of the history"""
+        revs = None
+        try:
+            repo = git.Repo(path)
+            status, _, _ = repo.git.merge_base(
+                "--is-ancestor", old, args[0], with_extended_output=True, with_exceptions=False
+            )
+            if status == 0:
+                revs = repo.git.rev_list(
+                    "{}..{}".format(old, args[0]), max_count=self.pageSize + 1
+                ).split()
+        except:
+            check_cancelled()
+            LOGGER.exception("Failed to get new commits of {}".format(path))
+        if revs is not None and len(revs) > self.pageSize:
+            revs = None  # rather reload than prepending lots of commits
+        self.newCommitsRead.emit(generation, args, revs)
+
+    def _onNewCommitsRead(self, generation, args, revs):
+        if generation != self._generation or args != self._pendingArgs:
+            return  # commits got reset or history changed again while reading
+        self._pendingArgs = None
+        if revs is None:
+            self._reset(args)
+            return
+        self._args = args
+        if revs:
+            self.beginInsertRows(QModelIndex(), 0, len(revs) - 1)
+            self._revs[0:0] = revs
+            self.endInsertRows()
+
+    @pyqtProperty(Repo, notify=repositoryChanged)
+    def repository(self):
+        return self._repository
+
+    @repository.setter
+    def repository(self, repository):
+        if repository != self._repository:
+            if self._repository:
+                self._repository.headChanged.disconnect(self._reload)
+                self._repository.commitRangesChanged.disconnect(self._reload)
+            self._repository = repository
+            self.repositoryChanged.emit(self._repository)
+            if self._repository:
+                self._repository.headChanged.connect(self._reload)
+                self._repository.commitRangesChanged.connect(self._reload)
+            self._reset([])
+            self._reload()
+
+    @pyqtProperty(str, notify=kindChanged)
+    def kind(self):
+        """Kind of commits, empty for history of HEAD, see Repo.commitRangeArgs()"""
+        return self._kind
+
+    @kind.setter
+    def kind(self, kind):
+        if kind != self._kind:
+            self._kind = kind
+            self.kindChanged.emit(self._kind)
+            self._reload()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Commit details from one `git show` invocation.
+"""
+import datetime
+import logging
+from typing import NamedTuple
+
+from git.util import finalize_process
+
+LOGGER = logging.getLogger(__name__)
+
+SHOW_FORMAT = "%H%x00%h%x00%cI%x00%an%x00%B%x00"  # message spans lines, terminated by NUL
+
+ShowCommit = NamedTuple(
+    "ShowCommit",
+    (
+        ("rev", str),
+        ("shortrev", str),
+        ("date", str),
+        ("user", str),
+        ("msg", str),
+        ("changes", list),  # list of tuples ( change, path )
+        ("diff", str),
+    ),
+)
+
+
+def _parse_raw(line):
+    """Returns tuple of change and path of given `--raw` diff line,
+    the change against the first parent for a combined diff line of a merge"""
+    meta, _, paths = line.partition("\t")
+    change = meta.split(" ")[-1][:1]
+    return change, paths.split("\t")[-1]
+
+
+def parse_show(lines):
+    """Returns ShowCommit parsed from given iterable of output lines ( as bytes )
+    of `git show --format=SHOW_FORMAT --raw -p`, consuming the lines as they arrive"""
+    lines = iter(lines)
+    header = b""
+    for line in lines:
+        header += line
+        if header.count(b"\0") >= 5:
+            break
+    header = header.decode("utf-8", errors="replace")
+    fields = header.split("\0")
+    if len(fields) != 6:
+        raise ValueError("Unexpected git show header: {!r}".format(header))
+    rev, shortrev, date, user, message, _ = fields
+    date = str(datetime.datetime.fromisoformat(date))
+    msg = message.split("\n")[0].strip()
+
+    changes = []
+    patch = []
+    for line in lines:
+        if patch or line.startswith(b"diff "):
+            patch.append(line)
+        elif line.startswith(b":"):
+            changes.append(_parse_raw(line.rstrip(b"\n").decode("utf-8", errors="replace")))
+    diff = b"".join(patch).decode("utf-8", errors="replace").rstrip("\n")
+    return ShowCommit(rev, shortrev, date, user, msg, changes, diff)
+
+
+def read_commit(repo, rev, track=None):
+    """Returns ShowCommit of given revision in git.Repo by running `git show` once,
+    optional callable `track` gets the started process, e.g. to terminate it on cancellation"""
+    proc = repo.git.show(
+        rev,
+        "--format={}".format(SHOW_FORMAT),
+        "--abbrev=8",
+        "--no-renames",
+        "--no-color",
+        "--raw",
+        "-p",
+        "--cc",  # merges show combined diff against their parents, like `git diff` does
+        as_process=True,
+    )
+    if track:
+        track(proc)
+    try:
+        commit = parse_show(proc.stdout)
+    finally:
+        finalize_process(proc)
+    return commit
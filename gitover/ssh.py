@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Share SSH connections per remote host between git network commands.
+"""
+import glob
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SshMultiplexer(object):
+    """
+    Provides `GIT_SSH_COMMAND` that lets ssh keep one master connection per remote host,
+    i.e. user, host and port, in a private directory. Further git commands of that host
+    reuse the master connection instead of doing their own handshake. A master connection
+    exits when idle for `persist` seconds or when calling cleanup().
+    """
+
+    def __init__(self, enabled=True, persist=60):
+        self._lock = threading.Lock()
+        self._enabled = enabled and sys.platform != "win32"
+        self._persist = persist
+        self._dir = None
+
+    def configure(self, enabled, persist):
+        with self._lock:
+            self._enabled = enabled and sys.platform != "win32"
+            self._persist = persist
+
+    def env(self):
+        """Returns dict of environment variables for git network commands,
+        empty when disabled or when the environment already defines the ssh command"""
+        if "GIT_SSH_COMMAND" in os.environ or "GIT_SSH" in os.environ:
+            return {}
+        with self._lock:
+            if not self._enabled:
+                return {}
+            if not self._dir:
+                # unix socket paths are short, prefer /tmp to a long per user temp directory
+                base = "/tmp" if os.path.isdir("/tmp") else None
+                self._dir = tempfile.mkdtemp(prefix="gitover-ssh-", dir=base)
+            command = "ssh -o ControlMaster=auto -o ControlPath={} -o ControlPersist={}".format(
+                shlex.quote(os.path.join(self._dir, "%C")), self._persist
+            )
+        return {"GIT_SSH_COMMAND": command}
+
+    def cleanup(self):
+        """Stop master connections and remove their directory"""
+        with self._lock:
+            path, self._dir = self._dir, None
+        if not path:
+            return
+        for socket in glob.glob(os.path.join(path, "*")):
+            try:
+                LOGGER.debug("Stopping ssh master connection {}".format(socket))
+                subprocess.run(
+                    ["ssh", "-o", "ControlPath={}".format(socket), "-O", "exit", "gitover"],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=5,
+                )
+            except:
+                LOGGER.exception("Failed to stop ssh master connection {}".format(socket))
+        shutil.rmtree(path, ignore_errors=True)
+
+
+SSH_CONNECTIONS = SshMultiplexer()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Last known status of repositories, persisted to show them right at startup.
+"""
+import json
+import logging
+import os
+import tempfile
+
+from PyQt5.QtCore import QObject, QTimer, QStandardPaths
+
+LOGGER = logging.getLogger(__name__)
+
+
+def default_path():
+    """Returns path of status cache file in cache location of application"""
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    return os.path.join(location, "status.json")
+
+
+class StatusCache(QObject):
+    """
+    Maps repository paths to their last known status ( as JSON serializable dictionary ).
+    Changes get written in batches, each replacing the cache file atomically.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None, delay=5000, parent=None):
+        super().__init__(parent)
+        self._path = path or default_path()
+        self._entries = {}  # key: repository path, value: dictionary of status
+        self._dirty = False
+        self._flushTimer = QTimer(self)
+        self._flushTimer.setInterval(delay)
+        self._flushTimer.setSingleShot(True)
+        self._flushTimer.timeout.connect(self.flush)
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == StatusCache.VERSION:
+                self._entries = data["repos"]
+                LOGGER.info("Loaded status of {} repos from {}".format(len(self._entries), self._path))
+        except FileNotFoundError:
+            pass
+        except:
+            LOGGER.exception("Failed to load status cache {}".format(self._path))
+
+    def get(self, path):
+        """Returns last known status of repository at given path or None"""
+        return self._entries.get(path)
+
+    def put(self, path, status):
+        """Set last known status of repository at given path, it gets written with next batch"""
+        if self._entries.get(path) == status:
+            return
+        self._entries[path] = status
+        self._changed()
+
+    def remove(self, path):
+        """Forget status of repository at given path"""
+        if self._entries.pop(path, None) is not None:
+            self._changed()
+
+    def _changed(self):
+        self._dirty = True
+        if not self._flushTimer.isActive():
+            self._flushTimer.start()
+
+    def flush(self):
+        """Write pending changes to cache file"""
+        self._flushTimer.stop()
+        if not self._dirty:
+            return
+        self._dirty = False
+        dir = os.path.dirname(self._path)
+        tmp = None
+        try:
+            os.makedirs(dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".status-", suffix=".tmp", dir=dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    dict(version=StatusCache.VERSION, repos=self._entries), f, separators=(",", ":")
+                )
+            os.replace(tmp, self._path)
+            LOGGER.debug("Saved status of {} repos to {}".format(len(self._entries), self._path))
+        except:
+            LOGGER.exception("Failed to save status cache {}".format(self._path))
+            if tmp and os.path.exists(tmp):
+                os.unlink(tmp)
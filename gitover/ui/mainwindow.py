@@ -33,7 +33,9 @@ from PyQt5.QtQml import QQmlApplicationEngine
 from PyQt5.QtQuick import QQuickView
 
 from gitover.ui.resources import gitover_commit_sha, gitover_version, gitover_build_time
-from gitover.repos_model import ReposModel, Repo, ChangedFilesModel, OutputModel, CommitDetails
+from gitover.repos_model import (
+    ReposModel, Repo, ChangedFilesModel, OutputModel, CommitDetails, CommitsModel
+)
 from gitover.formatter import GitDiffFormatter
 from gitover.res_helper import getResourceUrl
 from gitover.wakeup import WakeupWatcher
@@ -167,6 +169,7 @@ def run_gui(repo_paths, watch_filesystem, nof_bg_threads):
     OutputModel.registerToQml()
     GitDiffFormatter.registerToQml()
     CommitDetails.registerToQml()
+    CommitsModel.registerToQml()
 
     latest_version, latest_version_url = get_latest_version()
 
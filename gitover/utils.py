@@ -21,6 +21,7 @@ Copyright 2017 Manuel Koch
 
 Utility functions.
 """
+import os
 import re
 
 
@@ -39,3 +40,95 @@ def natural_sort_key(item):
         return key(item)
     else:
         return [key(i) for i in item]
+
+
+class PathTrie(object):
+    """
+    Map absolute paths to values, indexed by path components. Finds the innermost
+    stored path that equals or contains a given path in time linear to its depth.
+    """
+
+    _ENTRY = None  # key of stored (path, value) within a node, never a path component
+
+    def __init__(self):
+        self._root = {}
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, path):
+        node = self._node(path)
+        return node is not None and PathTrie._ENTRY in node
+
+    @staticmethod
+    def _parts(path):
+        return path.rstrip(os.sep).split(os.sep)  # root directory is the empty component
+
+    def _node(self, path):
+        node = self._root
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return None
+        return node
+
+    def add(self, path, value=None):
+        """Store given value for given path, replacing the value stored before"""
+        node = self._root
+        for part in self._parts(path):
+            node = node.setdefault(part, {})
+        if PathTrie._ENTRY not in node:
+            self._len += 1
+        node[PathTrie._ENTRY] = (path, value)
+
+    def remove(self, path):
+        """Remove given path, returns true when it was stored"""
+        nodes = [self._root]
+        parts = self._parts(path)
+        for part in parts:
+            node = nodes[-1].get(part)
+            if node is None:
+                return False
+            nodes.append(node)
+        if nodes[-1].pop(PathTrie._ENTRY, None) is None:
+            return False
+        self._len -= 1
+        # prune nodes that lead to no stored path anymore
+        for part, parent, node in zip(reversed(parts), reversed(nodes[:-1]), reversed(nodes)):
+            if node:
+                break
+            del parent[part]
+        return True
+
+    def get(self, path, default=None):
+        """Returns value stored for exactly given path"""
+        node = self._node(path)
+        if node is None or PathTrie._ENTRY not in node:
+            return default
+        return node[PathTrie._ENTRY][1]
+
+    def lookup(self, path):
+        """Returns tuple of innermost stored path that equals or contains given path and its value,
+        (None, None) when no stored path contains it"""
+        found = (None, None)
+        node = self._root
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(PathTrie._ENTRY, found)
+        return found
+
+    def paths(self):
+        """Returns list of stored paths"""
+        result = []
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            for key, child in node.items():
+                if key is PathTrie._ENTRY:
+                    result.append(child[0])
+                else:
+                    pending.append(child)
+        return result
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Terminate processes that run too long or stop generating output.
+"""
+import logging
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+
+class WatchedProcess(object):
+    """Process observed by Watchdog, call touch() whenever the process generated output"""
+
+    def __init__(self, proc, name, runtime=0, inactivity=0):
+        self.proc = proc
+        self.name = name
+        self.runtime = runtime  # seconds the process may run, zero for unlimited
+        self.inactivity = inactivity  # seconds the process may be silent, zero for unlimited
+        self.started = self.active = time.monotonic()
+        self.terminated = None  # monotonic time the watchdog terminated the process
+        self.timeout = ""  # reason of termination by watchdog
+
+    def touch(self):
+        self.active = time.monotonic()
+
+    def expired(self, now):
+        """Returns reason when a limit got exceeded at given monotonic time, otherwise empty string"""
+        if self.runtime and now - self.started > self.runtime:
+            return "{} timed out after {}s".format(self.name, self.runtime)
+        if self.inactivity and now - self.active > self.inactivity:
+            return "{} timed out after {}s without output".format(self.name, self.inactivity)
+        return ""
+
+
+class Watchdog(object):
+    """
+    Observes runtime and output inactivity of processes from a helper thread.
+    A process exceeding its limits gets terminated and killed when it doesn't stop
+    within a grace period. The helper thread only runs while processes are watched.
+    """
+
+    interval = 1.0  # seconds between checks
+    grace = 5.0  # seconds between terminating and killing a process
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watched = []
+        self._thread = None
+
+    def watch(self, proc, name, runtime=0, inactivity=0):
+        """Returns WatchedProcess for given process, it gets observed when a limit is set"""
+        watched = WatchedProcess(proc, name, runtime, inactivity)
+        if runtime or inactivity:
+            with self._lock:
+                self._watched.append(watched)
+                if not self._thread:
+                    self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+                    self._thread.start()
+        return watched
+
+    def unwatch(self, watched):
+        with self._lock:
+            if watched in self._watched:
+                self._watched.remove(watched)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._watched:
+                    self._thread = None
+                    return
+                watched = list(self._watched)
+            now = time.monotonic()
+            for w in watched:
+                try:
+                    self._check(w, now)
+                except:
+                    LOGGER.exception("Failed to check process {}".format(w.name))
+
+    def _check(self, watched, now):
+        if watched.proc.poll() is not None:
+            return
+        if watched.terminated is None:
+            watched.timeout = watched.expired(now)
+            if watched.timeout:
+                LOGGER.warning("Terminating process: {}".format(watched.timeout))
+                watched.terminated = now
+                watched.proc.terminate()
+        elif now - watched.terminated > self.grace:
+            LOGGER.warning("Killing process: {}".format(watched.timeout))
+            watched.proc.kill()
+
+
+WATCHDOG = Watchdog()
@@ -167,7 +167,22 @@ ApplicationWindow {
                 property int  row:          Math.floor( index / theRepoGrid.cellsPerRow )
                 property bool isLastColumn: (column+1) == theRepoGrid.cellsPerRow
                 property bool isLastRow:    row == Math.floor(theRepoGrid.count / theRepoGrid.cellsPerRow)
+                property bool isInViewport: y + height > theRepoGrid.contentY
+                                            && y < theRepoGrid.contentY + theRepoGrid.height
                 onImplicitHeightChanged:    theRepoGrid.updateMinCellHeight(index,implicitHeight)
+                // hints for scheduling background tasks of shown repositories first
+                onIsInViewportChanged:      repository.inView = isInViewport
+                onIsCurrentChanged:         repository.selected = isCurrent
+                Component.onCompleted: {
+                    repository.inView = isInViewport
+                    repository.selected = isCurrent
+                }
+                Component.onDestruction: {
+                    if( repository ) {
+                        repository.inView = false
+                        repository.selected = false
+                    }
+                }
             }
 
             onCurrentIndexChanged: {
@@ -332,7 +347,7 @@ ApplicationWindow {
                                     Layout.fillWidth:  true
                                     Layout.fillHeight: true
                                     repository:       theRepoGrid.repository
-                                    commits:          theRepoGrid.repository != null ? theRepoGrid.repository.trunkBranchAheadCommits : null
+                                    rangeKind:        "trunkAhead"
                                     visible:          theRepoGrid.repository != null
                                 }
                                 RepoStatusDiff {
@@ -368,7 +383,7 @@ ApplicationWindow {
                                     Layout.fillWidth:  true
                                     Layout.fillHeight: true
                                     repository:       theRepoGrid.repository
-                                    commits:          theRepoGrid.repository != null ? theRepoGrid.repository.trunkBranchBehindCommits : null
+                                    rangeKind:        "trunkBehind"
                                     visible:          theRepoGrid.repository != null
                                 }
                                 RepoStatusDiff {
@@ -404,7 +419,7 @@ ApplicationWindow {
                                     Layout.fillWidth:  true
                                     Layout.fillHeight: true
                                     repository:       theRepoGrid.repository
-                                    commits:          theRepoGrid.repository != null ? theRepoGrid.repository.trackingBranchAheadCommits : null
+                                    rangeKind:        "trackingAhead"
                                     visible:          theRepoGrid.repository != null
                                 }
                                 RepoStatusDiff {
@@ -440,7 +455,7 @@ ApplicationWindow {
                                     Layout.fillWidth:  true
                                     Layout.fillHeight: true
                                     repository:       theRepoGrid.repository
-                                    commits:          theRepoGrid.repository != null ? theRepoGrid.repository.trackingBranchBehindCommits : null
+                                    rangeKind:        "trackingBehind"
                                     visible:          theRepoGrid.repository != null
                                 }
                                 RepoStatusDiff {
@@ -25,8 +25,17 @@ Item {
     id: root
 
     property Repo repository: null
-    property var commits:     repository != null ? repository.commits : null
-    property string selectedCommit: commits != null && theList.currentIndex != -1 ? commits[theList.currentIndex] : ""
+    // when set, display commits ahead/behind ( e.g. "trunkAhead" ) instead of history
+    property string rangeKind: ""
+    property string selectedCommit: theList.currentIndex != -1 ? theCommits.rev(theList.currentIndex) : ""
+
+    CommitsModel {
+        id: theCommits
+        repository: root.repository
+        kind:       root.rangeKind
+
+        onModelReset: theList.currentIndex = -1
+    }
 
     ListView {
         id: theList
@@ -37,15 +46,7 @@ Item {
         boundsBehavior:   Flickable.StopAtBounds
         focus:            true
 
-        model: root.commits
-
-        onModelChanged: {
-            theList.currentIndex = -1
-        }
-
-        onCountChanged: {
-            theList.currentIndex = -1
-        }
+        model: theCommits
 
         highlightFollowsCurrentItem: true
         highlightMoveDuration:       0
@@ -62,7 +63,7 @@ Item {
             height: childrenRect.height
             property CommitDetails details: CommitDetails {
                 repository: root.repository
-                rev:        modelData
+                rev:        model.rev
 
                 Component.onCompleted: {
                     console.info("CommitDetails for "+rev);
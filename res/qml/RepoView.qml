@@ -157,6 +157,14 @@ Rectangle {
                 bgColor:                Theme.colors.badgeStatus
                 visible:                root.repository && root.repository.updating
             }
+            RepoActionBadge {
+                id: theStaleBadge
+                Layout.preferredHeight: theNameLabel.height
+                text:                   "Cached"
+                fgColor:                Theme.colors.badgeText
+                bgColor:                Theme.colors.badgeStale
+                visible:                root.repository && root.repository.stale && !root.repository.updating
+            }
             RepoActionBadge {
                 id: theFetchBadge
                 Layout.preferredHeight: theNameLabel.height
@@ -56,6 +56,7 @@ Item {
         property color badgePush:     "#432182"
         property color badgeRemote:   "#8095C7"
         property color badgeBusy:     "#6DAE1E"
+        property color badgeStale:    "#A0A0A0"
 
         property color outputText: "black"
     }
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Fixtures of temporary git repositories.
+"""
+import os
+import subprocess
+import sys
+
+import git
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GIT_ENV = dict(
+    os.environ,
+    GIT_AUTHOR_NAME="Tester",
+    GIT_AUTHOR_EMAIL="tester@example.com",
+    GIT_COMMITTER_NAME="Tester",
+    GIT_COMMITTER_EMAIL="tester@example.com",
+    GIT_CONFIG_NOSYSTEM="1",
+    GIT_CONFIG_GLOBAL=os.devnull,
+)
+
+
+def run_git(path, *args):
+    """Returns stripped output of git command run within given directory"""
+    return subprocess.check_output(
+        ["git", "-C", path] + list(args), env=GIT_ENV, stderr=subprocess.DEVNULL
+    ).decode("utf-8").strip()
+
+
+def write(path, name, content="content\n"):
+    """Write file of given name relative to given directory, returns its absolute path"""
+    filepath = os.path.join(path, name)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "w") as f:
+        f.write(content)
+    return filepath
+
+
+def commit(path, msg, *names):
+    """Commit given files, or all changes, returns sha-hex of new commit"""
+    run_git(path, "add", *(names or ["-A"]))
+    run_git(path, "commit", "-q", "--allow-empty", "-m", msg)
+    return run_git(path, "rev-parse", "HEAD")
+
+
+@pytest.fixture(autouse=True)
+def git_env(monkeypatch):
+    """Let GitPython run git with the test identity and without user configuration"""
+    for key, value in GIT_ENV.items():
+        if key.startswith("GIT_"):
+            monkeypatch.setenv(key, value)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository on branch master with one commit of file `a.txt`"""
+    path = str(tmp_path / "repo")
+    run_git(str(tmp_path), "init", "-q", "-b", "master", path)
+    write(path, "a.txt")
+    commit(path, "initial")
+    return git.Repo(path)
+
+
+@pytest.fixture
+def clone(tmp_path, repo):
+    """Clone of `repo` fixture, with origin/master as upstream of master"""
+    path = str(tmp_path / "clone")
+    run_git(str(tmp_path), "clone", "-q", repo.working_tree_dir, path)
+    return git.Repo(path)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Core application for tests of Qt models and signals"""
+    from PyQt5.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
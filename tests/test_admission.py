@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of admission of fetches.
+"""
+import pytest
+
+from gitover.admission import FetchAdmission, remote_host
+
+
+@pytest.mark.parametrize("url, host", [
+    ("https://user@example.com:8443/repo.git", "example.com"),
+    ("ssh://git@Example.com/repo.git", "example.com"),
+    ("git@example.com:group/repo.git", "example.com"),
+    ("example.com:repo.git", "example.com"),
+    ("file:///srv/repo.git", ""),
+    ("/srv/repo.git", ""),
+    ("../repo.git", ""),
+    ("C:/repos/repo.git", ""),
+    ("", ""),
+    (None, ""),
+])
+def test_remote_host(url, host):
+    assert remote_host(url) == host
+
+
+@pytest.fixture
+def admitted():
+    return []
+
+
+def test_limit_per_host(admitted):
+    admission = FetchAdmission(maxTotal=8, maxPerHost=2)
+    a1 = admission.request("a", admitted.append)
+    a2 = admission.request("a", admitted.append)
+    a3 = admission.request("a", admitted.append)
+    b1 = admission.request("b", admitted.append)
+
+    assert admitted == [a1, a2, b1]  # busy host doesn't block other hosts
+    assert not a3.active and a3.admitted is None
+    assert (admission.running, admission.waiting) == (3, 1)
+
+    admission.release(a1)
+    assert admitted == [a1, a2, b1, a3]
+    assert a3.active and not a1.active
+    assert (admission.running, admission.waiting) == (3, 0)
+
+
+def test_limit_in_total_admits_in_order(admitted):
+    admission = FetchAdmission(maxTotal=2, maxPerHost=2)
+    tickets = [admission.request(host, admitted.append) for host in "abcd"]
+    assert admitted == tickets[:2]
+
+    admission.release(tickets[1])
+    admission.release(tickets[1])  # releasing twice has no effect
+    assert admitted == tickets[:3]
+    assert admission.running == 2
+
+
+def test_withdraw_waiting_request(admitted):
+    admission = FetchAdmission(maxTotal=1, maxPerHost=1)
+    first = admission.request("a", admitted.append)
+    withdrawn = admission.request("b", admitted.append)
+    last = admission.request("c", admitted.append)
+
+    admission.release(withdrawn)
+    admission.release(first)
+
+    assert admitted == [first, last]
+    assert withdrawn.admitted is None
+    assert admission.waiting == 0
+
+
+def test_raised_limits_admit_waiting(admitted):
+    admission = FetchAdmission(maxTotal=1, maxPerHost=1)
+    tickets = [admission.request("a", admitted.append) for _ in range(3)]
+    admission.setLimits(4, 2)
+    assert admitted == tickets[:2]
+    assert admission.maxTotal == 4
+
+
+def test_failing_callback_releases_ticket():
+    admission = FetchAdmission(maxTotal=1, maxPerHost=1)
+
+    def fail(ticket):
+        raise RuntimeError("fetch failed to start")
+
+    failed = admission.request("a", fail)
+    assert not failed.active
+    assert admission.running == 0
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of reading commits through `git cat-file --batch`.
+"""
+import os
+import signal
+
+import pytest
+
+import gitover.refs
+from gitover.catfile import CatFileBatch, parse_commit
+from gitover.refs import TagIndex
+
+from conftest import run_git, write, commit
+
+
+def test_parse_commit():
+    data = (
+        b"tree 4b825dc642cb6eb9a060e54bf8d69288fbee4904\n"
+        b"parent 1111111111111111111111111111111111111111\n"
+        b"parent 2222222222222222222222222222222222222222\n"
+        b"author Ann Author <ann@example.com> 1500000000 +0130\n"
+        b"committer Carl Committer <carl@example.com> 1500000100 -0700\n"
+        b"\n"
+        b"Subject line\n"
+        b"\n"
+        b"Body\n"
+    )
+    info = parse_commit("abc", data)
+    assert info.rev == "abc"
+    assert info.parents == ["1" * 40, "2" * 40]
+    assert info.user == "Ann Author"
+    assert info.date == "2017-07-13 19:41:40-07:00"
+    assert info.msg == "Subject line"
+
+
+def test_parse_commit_with_encoding():
+    data = (
+        b"tree 4b825dc642cb6eb9a060e54bf8d69288fbee4904\n"
+        b"author J\xf6rg <j@example.com> 1500000000 +0000\n"
+        b"committer J\xf6rg <j@example.com> 1500000000 +0000\n"
+        b"encoding ISO-8859-1\n"
+        b"\n"
+        b"Gr\xfc\xdfe\n"
+    )
+    info = parse_commit("abc", data)
+    assert info.parents == []
+    assert info.user == "Jörg"
+    assert info.msg == "Grüße"
+
+
+@pytest.fixture
+def catfile(repo):
+    batch = CatFileBatch(repo.working_tree_dir)
+    yield batch
+    batch.stop()
+
+
+def test_commit_matches_gitpython(repo, catfile):
+    path = repo.working_tree_dir
+    commit(path, "first line\nsecond line\n\nbody")
+    c = repo.head.commit
+
+    info = catfile.commit(c.hexsha, timeout=10)
+
+    assert info.rev == c.hexsha
+    assert info.parents == [p.hexsha for p in c.parents]
+    assert info.user == c.author.name
+    assert info.date == str(c.committed_datetime)
+    assert info.msg == "first line"
+
+
+def test_read_missing_and_non_commit_objects(repo, catfile):
+    blob = run_git(repo.working_tree_dir, "rev-parse", "HEAD:a.txt")
+    assert catfile.read("0" * 40, timeout=10) is None
+    assert catfile.read(blob, timeout=10).data == b"content\n"
+    assert catfile.commit(blob, timeout=10) is None
+
+
+def test_restart_after_process_died(repo, catfile):
+    sha = repo.head.commit.hexsha
+    assert catfile.commit(sha, timeout=10).rev == sha
+    os.kill(catfile._proc.pid, signal.SIGKILL)
+    catfile._proc.wait()
+
+    assert catfile.commit(sha, timeout=10).rev == sha
+
+
+def test_reads_after_stop(repo, catfile):
+    sha = repo.head.commit.hexsha
+    assert catfile.commit(sha, timeout=10).rev == sha
+    catfile.stop()
+    write(repo.working_tree_dir, "b.txt")
+    newer = commit(repo.working_tree_dir, "newer")
+
+    assert catfile.commit(newer, timeout=10).parents == [sha]
+
+
+def test_tag_index_peels_annotated_tags(repo, monkeypatch):
+    monkeypatch.setattr(gitover.refs, "racy", lambda fingerprint: False)
+    path = repo.working_tree_dir
+    first = repo.head.commit.hexsha
+    run_git(path, "tag", "light")
+    run_git(path, "tag", "-a", "annotated", "-m", "annotated tag")
+    index = TagIndex()
+
+    assert index.update(repo)
+    assert sorted(index.tags(first)) == ["annotated", "light"]
+    assert not index.update(repo)
+
+    write(path, "b.txt")
+    second = commit(path, "second")
+    run_git(path, "tag", "later")
+
+    assert index.update(repo)
+    assert index.tags(second) == ["later"]
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of incremental updates of the changed files model.
+"""
+import pytest
+
+from gitover.repos_model import ChangedFilesModel
+
+
+@pytest.fixture
+def model(qapp):
+    """Model with recorded row signals"""
+    model = ChangedFilesModel()
+    model.signals = []
+    model.rowsInserted.connect(lambda parent, first, last: model.signals.append(("+", first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: model.signals.append(("-", first, last)))
+    model.modelReset.connect(lambda: model.signals.append(("reset",)))
+    return model
+
+
+def rows(model):
+    """Returns list of tuples ( status, path ) of all rows of model"""
+    return [
+        (model.data(model.index(row, 0), ChangedFilesModel.Role.Status),
+         model.data(model.index(row, 0), ChangedFilesModel.Role.Path))
+        for row in range(model.rowCount())
+    ]
+
+
+def test_rows_sorted_by_status_and_path(model):
+    model.setChanges(modified=["b", "A"], untracked=["c"], staged=["a"])
+    assert rows(model) == [("modified", "A"), ("modified", "b"), ("staged", "a"),
+                           ("untracked", "c")]
+    assert model.signals == [("+", 0, 3)]
+
+
+def test_same_changes_emit_nothing(model):
+    model.setChanges(modified=["a", "b"])
+    model.signals.clear()
+    model.setChanges(modified=["b", "a"])
+    assert model.signals == []
+
+
+def test_only_differences_get_inserted_and_removed(model):
+    model.setChanges(modified=["a", "b", "c", "d"], untracked=["x"])
+    model.signals.clear()
+
+    model.setChanges(modified=["a", "d", "e"], staged=["b"], untracked=["x"])
+
+    assert rows(model) == [("modified", "a"), ("modified", "d"), ("modified", "e"),
+                           ("staged", "b"), ("untracked", "x")]
+    assert model.signals == [("-", 1, 2), ("+", 2, 3)]
+
+
+def test_clear_changes(model):
+    model.setChanges(deleted=["a"], conflicting=["b"])
+    model.signals.clear()
+    model.setChanges()
+    assert rows(model) == []
+    assert model.signals == [("-", 0, 1)]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of partial status updates for changed facets of repositories.
+"""
+import os
+
+import pytest
+
+from gitover.facets import classify_path, ALL_FACETS
+from gitover.facets import FACET_WORKTREE, FACET_INDEX, FACET_HEAD, FACET_LOCAL_REFS
+from gitover.facets import FACET_REMOTE_REFS, FACET_CONFIG, FACET_STASH
+from gitover.repos_model import GitStatus, GitStatusWorker, WorkerSlot
+
+from conftest import run_git, write, commit
+
+WORK = "/work/repo"
+GIT = "/work/repo/.git"
+
+
+@pytest.mark.parametrize("rel, facets", [
+    ("src/file.py", {FACET_WORKTREE}),
+    (".git/index", {FACET_INDEX}),
+    (".git/sharedindex.1234", {FACET_INDEX}),
+    (".git/HEAD", {FACET_HEAD}),
+    (".git/logs/HEAD", {FACET_HEAD}),
+    (".git/refs/heads/feature/x", {FACET_LOCAL_REFS}),
+    (".git/refs/tags/v1", {FACET_LOCAL_REFS}),
+    (".git/logs/refs/heads/master", {FACET_LOCAL_REFS}),
+    (".git/refs/remotes/origin/master", {FACET_REMOTE_REFS}),
+    (".git/FETCH_HEAD", {FACET_REMOTE_REFS}),
+    (".git/packed-refs.new", {FACET_LOCAL_REFS}),
+    (".git/config", {FACET_CONFIG}),
+    (".git/refs/stash", {FACET_STASH}),
+    (".git/MERGE_HEAD", ALL_FACETS),
+    (".git/rebase-merge/done", ALL_FACETS),
+])
+def test_classify_path(rel, facets):
+    assert classify_path(os.path.join(WORK, rel), WORK, GIT) == facets
+
+
+def test_classify_path_of_linked_worktree():
+    common = "/work/main/.git"
+    gitDir = "/work/main/.git/worktrees/linked"
+    assert classify_path(gitDir + "/HEAD", "/work/linked", gitDir, common) == {FACET_HEAD}
+    assert classify_path(common + "/refs/heads/a", "/work/linked", gitDir, common) == {
+        FACET_LOCAL_REFS
+    }
+    assert classify_path("/elsewhere/file", "/work/linked", gitDir, common) == ALL_FACETS
+
+
+def test_parts_of_facets():
+    status = GitStatus(WORK)
+    previous = GitStatus(WORK)
+    assert status._parts(None, previous) == set(GitStatus.PARTS)
+    assert status._parts([FACET_WORKTREE], None) == set(GitStatus.PARTS)
+    assert status._parts([FACET_WORKTREE, FACET_INDEX], previous) == {"worktree"}
+    assert status._parts([FACET_STASH], previous) == set()
+    assert status._parts([FACET_CONFIG], previous) == {"refs", "tracking", "trunk", "merged"}
+
+
+def updated(path, facets=None, previous=None):
+    status = GitStatus(path)
+    status.update(facets, previous)
+    return status
+
+
+def test_partial_update_keeps_other_parts(clone):
+    path = clone.working_tree_dir
+    full = updated(path)
+    write(path, "a.txt", "changed\n")
+    run_git(path, "branch", "unnoticed")
+
+    partial = updated(path, [FACET_WORKTREE], full)
+
+    assert partial.modified == {"a.txt"}
+    assert partial.branches == full.branches == ["master"]
+    assert partial.trackingBranch == "origin/master"
+    assert updated(path, [FACET_LOCAL_REFS], partial).branches == ["master", "unnoticed"]
+
+
+def test_partial_update_of_moved_head_updates_all(clone):
+    path = clone.working_tree_dir
+    full = updated(path)
+    write(path, "b.txt")
+    commit(path, "ahead")
+
+    partial = updated(path, [FACET_WORKTREE], full)
+
+    assert partial.head != full.head
+    assert partial.trackingBranchBehind == 1
+
+
+@pytest.fixture
+def worker(qapp):
+    return GitStatusWorker(WorkerSlot())
+
+
+def pending(worker):
+    return worker._changedPaths, worker._facets
+
+
+def test_merge_pending_changes(worker):
+    worker._mergePending(["/b", "/a"], [FACET_WORKTREE])
+    assert pending(worker) == (["/b", "/a"], {FACET_WORKTREE})
+    worker._mergePending(["/c", "/a"], [FACET_INDEX])
+    assert pending(worker) == (["/a", "/b", "/c"], {FACET_WORKTREE, FACET_INDEX})
+
+
+def test_merge_pending_unknown_changes(worker):
+    worker._mergePending(["/a"], [FACET_WORKTREE])
+    worker._mergePending(None, None)
+    assert pending(worker) == (None, None)
+    worker._mergePending(["/b"], [FACET_INDEX])
+    assert pending(worker) == (None, None)  # stays a full update
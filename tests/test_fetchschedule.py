@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of due times of periodic fetches.
+"""
+import pytest
+
+from gitover.fetchschedule import FetchSchedule
+from gitover.fetchschedule import FETCH_CHANGED, FETCH_UNCHANGED, FETCH_FAILED, FETCH_NO_REMOTE
+
+
+class Clock(object):
+    """Clock of tests, advanced manually"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def schedule(clock, interval=60, maxInterval=600):
+    return FetchSchedule(interval, maxInterval, jitter=0, clock=clock)
+
+
+def test_first_fetch_due_after_interval(clock):
+    s = schedule(clock)
+    assert s.due == 1060
+    assert not s.isDue()
+    clock.now = 1060
+    assert s.isDue()
+    assert s.isDue(now=1100)
+    assert not s.isDue(now=1059)
+
+
+def test_backoff_of_failures(clock):
+    s = schedule(clock)
+    delays = []
+    for _ in range(5):
+        s.done(FETCH_FAILED)
+        delays.append(s.due - clock.now)
+    assert delays == [120, 240, 480, 600, 600]
+
+    s.done(FETCH_CHANGED)
+    assert s.due - clock.now == 60
+
+
+def test_stretch_of_unchanged(clock):
+    s = schedule(clock, maxInterval=120)
+    delays = []
+    for _ in range(4):
+        s.done(FETCH_UNCHANGED)
+        delays.append(s.due - clock.now)
+    assert delays == [90, 120, 120, 120]
+
+    s.done(FETCH_CHANGED)
+    assert s.due - clock.now == 60
+
+
+def test_nothing_due_while_running(clock):
+    s = schedule(clock)
+    s.started()
+    clock.now += 10000
+    assert not s.isDue()
+    s.done(FETCH_CHANGED)
+    assert s.due == clock.now + 60
+
+
+def test_no_remote_stops_periodic_fetches(clock):
+    s = schedule(clock)
+    s.done(FETCH_FAILED)
+    s.done(FETCH_NO_REMOTE)
+    assert s.due is None
+    assert s.failures == 1  # no backoff growth without a remote
+    clock.now += 10000
+    assert not s.isDue()
+
+    s.done(FETCH_CHANGED)
+    assert s.due == clock.now + 60
+
+
+def test_zero_interval_disables_periodic_fetches(clock):
+    s = schedule(clock, interval=0)
+    assert s.due is None
+    s.done(FETCH_CHANGED)
+    assert s.due is None
+
+
+def test_jitter_spreads_delay(clock):
+    s = FetchSchedule(100, 1000, jitter=0.1, clock=clock)
+    for _ in range(100):
+        assert 90 <= s.delay() <= 110
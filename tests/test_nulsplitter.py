@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of splitting NUL terminated paths of file system watchers.
+"""
+from gitover.fswatcher import NulSplitter
+
+
+def test_complete_paths():
+    splitter = NulSplitter()
+    assert splitter.feed(b"/a\0/b\0") == ["/a", "/b"]
+    assert splitter.pending == 0
+
+
+def test_path_split_across_chunks():
+    splitter = NulSplitter()
+    assert splitter.feed(b"/a\0/lo") == ["/a"]
+    assert splitter.pending == 3
+    assert splitter.feed(b"ng/pa") == []
+    assert splitter.feed(b"th\0/c\0/d") == ["/long/path", "/c"]
+    assert splitter.pending == 2
+
+
+def test_duplicates_dropped_in_order_of_first_appearance():
+    splitter = NulSplitter()
+    assert splitter.feed(b"/b\0/a\0/b\0\0/a\0") == ["/b", "/a"]
+    assert splitter.feed(b"/a\0") == ["/a"]
+
+
+def test_non_utf8_path():
+    splitter = NulSplitter()
+    assert splitter.feed(b"/caf\xe9\0") == ["/caf\udce9"]
+
+
+def test_remainder_without_nul_dropped_beyond_limit():
+    splitter = NulSplitter()
+    splitter.maxPending = 8
+    assert splitter.feed(b"/12345") == []
+    assert splitter.pending == 6
+    assert splitter.feed(b"6789") == []
+    assert splitter.pending == 0
+    assert splitter.feed(b"/a\0") == ["/a"]
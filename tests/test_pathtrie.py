@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of mapping paths to repositories.
+"""
+import pytest
+
+from gitover.utils import PathTrie
+
+
+@pytest.fixture
+def trie():
+    trie = PathTrie()
+    trie.add("/repos/outer", "outer")
+    trie.add("/repos/outer/sub", "sub")
+    trie.add("/repos/other", "other")
+    return trie
+
+
+def test_lookup_innermost(trie):
+    assert trie.lookup("/repos/outer/sub/dir/file") == ("/repos/outer/sub", "sub")
+    assert trie.lookup("/repos/outer/subdir/file") == ("/repos/outer", "outer")
+    assert trie.lookup("/repos/outer") == ("/repos/outer", "outer")
+    assert trie.lookup("/repos/outer/") == ("/repos/outer", "outer")
+    assert trie.lookup("/repos") == (None, None)
+    assert trie.lookup("/elsewhere/outer") == (None, None)
+
+
+def test_get_and_contains_exact_path(trie):
+    assert trie.get("/repos/outer/sub") == "sub"
+    assert trie.get("/repos/outer/sub/dir") is None
+    assert trie.get("/repos", "default") == "default"
+    assert "/repos/other" in trie
+    assert "/repos" not in trie
+    assert "/repos/other/dir" not in trie
+
+
+def test_add_replaces_value(trie):
+    trie.add("/repos/other", "replaced")
+    assert trie.get("/repos/other") == "replaced"
+    assert len(trie) == 3
+
+
+def test_remove(trie):
+    assert trie.remove("/repos/outer")
+    assert not trie.remove("/repos/outer")
+    assert not trie.remove("/repos")
+    assert len(trie) == 2
+    assert trie.lookup("/repos/outer/file") == (None, None)
+    assert trie.lookup("/repos/outer/sub/file") == ("/repos/outer/sub", "sub")
+
+
+def test_remove_prunes_nodes(trie):
+    trie.remove("/repos/outer/sub")
+    trie.remove("/repos/outer")
+    trie.remove("/repos/other")
+    assert len(trie) == 0
+    assert trie._root == {}
+
+
+def test_paths(trie):
+    assert sorted(trie.paths()) == ["/repos/other", "/repos/outer", "/repos/outer/sub"]
+
+
+def test_root_path():
+    trie = PathTrie()
+    trie.add("/", "root")
+    assert trie.lookup("/any/path") == ("/", "root")
+    assert trie.paths() == ["/"]
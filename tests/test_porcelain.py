@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of working tree status parsed from `git status --porcelain=v2`.
+"""
+import io
+import os
+
+import git
+
+from gitover.porcelain import iter_records, read_status, PorcelainStatus
+
+from conftest import run_git, write, commit
+
+
+def test_iter_records_across_chunks():
+    stream = io.BytesIO(b"first\0second record\0\0last")
+    assert list(iter_records(stream, chunk_size=3)) == [b"first", b"second record", b"", b"last"]
+
+
+def test_parse_headers():
+    status = PorcelainStatus().parse([
+        b"# branch.oid (initial)",
+        b"# branch.head master",
+        b"# branch.upstream origin/master",
+        b"# branch.ab +2 -3",
+    ])
+    assert status.oid == ""
+    assert (status.head, status.detached) == ("master", False)
+    assert status.upstream == "origin/master"
+    assert (status.hasAheadBehind, status.ahead, status.behind) == (True, 2, 3)
+
+
+def test_parse_detached_head():
+    status = PorcelainStatus().parse([b"# branch.oid 1234", b"# branch.head (detached)"])
+    assert (status.oid, status.head, status.detached) == ("1234", "", True)
+    assert not status.hasAheadBehind
+
+
+def test_parse_entries():
+    sha = "0" * 40
+    status = PorcelainStatus().parse([
+        "1 .M N... 100644 100644 100644 {0} {0} modified.txt".format(sha).encode(),
+        "1 M. N... 100644 100644 100644 {0} {0} staged file.txt".format(sha).encode(),
+        "1 .D N... 100644 100644 000000 {0} {0} deleted.txt".format(sha).encode(),
+        "2 R. N... 100644 100644 100644 {0} {0} R100 renamed.txt".format(sha).encode(),
+        b"original.txt",
+        "u UU N... 100644 100644 100644 100644 {0} {0} {0} conflict.txt".format(sha).encode(),
+        b"? untracked dir/file.txt",
+    ])
+    assert status.modified == {"modified.txt"}
+    assert status.staged == {"staged file.txt", "renamed.txt"}
+    assert status.deleted == {"deleted.txt"}
+    assert status.conflicts == {"conflict.txt"}
+    assert status.untracked == {"untracked dir/file.txt"}
+
+
+def test_read_status_of_working_tree(repo):
+    path = repo.working_tree_dir
+    write(path, "b.txt")
+    write(path, "c.txt")
+    commit(path, "more files")
+    write(path, "a.txt", "changed\n")
+    write(path, "new.txt")
+    write(path, "sub dir/untracked.txt")
+    run_git(path, "add", "new.txt")
+    run_git(path, "mv", "b.txt", "moved.txt")
+    os.remove(os.path.join(path, "c.txt"))
+
+    status = read_status(repo)
+
+    assert status.oid == repo.head.commit.hexsha
+    assert (status.head, status.detached) == ("master", False)
+    assert status.modified == {"a.txt"}
+    assert status.staged == {"new.txt", "moved.txt"}
+    assert status.deleted == {"c.txt"}
+    assert status.untracked == {"sub dir/untracked.txt"}
+    assert status.conflicts == set()
+
+
+def test_read_status_ahead_behind_of_upstream(clone):
+    path = clone.working_tree_dir
+    commit(path, "ahead 1")
+    commit(path, "ahead 2")
+    run_git(path, "update-ref", "refs/remotes/origin/master", "HEAD~2")
+    commit_upstream = run_git(path, "commit-tree", "-p", "HEAD~2", "-m", "behind", "HEAD^{tree}")
+    run_git(path, "update-ref", "refs/remotes/origin/master", commit_upstream)
+
+    status = read_status(clone)
+
+    assert status.upstream == "origin/master"
+    assert (status.hasAheadBehind, status.ahead, status.behind) == (True, 2, 1)
+
+
+def test_read_status_of_repository_without_commits(tmp_path):
+    path = str(tmp_path / "empty")
+    run_git(str(tmp_path), "init", "-q", "-b", "main", path)
+    write(path, "file.txt")
+
+    status = read_status(git.Repo(path))
+
+    assert (status.oid, status.head) == ("", "main")
+    assert status.untracked == {"file.txt"}
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of priorities of background tasks of repositories.
+"""
+import pytest
+
+from gitover.config import Config
+from gitover.repos_model import Repo
+
+
+@pytest.fixture
+def model_repo(qapp, repo):
+    """Repo of `repo` fixture configured with default settings"""
+    model_repo = Repo(repo.working_tree_dir, config=Config())
+    model_repo.priorities = []
+    model_repo.priorityChanged.connect(model_repo.priorities.append)
+    yield model_repo
+    model_repo.cleanup()
+
+
+def slot_priorities(model_repo):
+    return [slot.priority for slot in
+            (model_repo.networkSlot, model_repo.readSlot, model_repo.writeSlot)]
+
+
+def test_hidden_by_default(model_repo):
+    assert model_repo.priority == Repo.PRIORITY_HIDDEN
+    assert slot_priorities(model_repo) == [Repo.PRIORITY_HIDDEN] * 3
+
+
+def test_priority_of_view_hints(model_repo):
+    model_repo.inView = True
+    assert model_repo.priority == Repo.PRIORITY_VISIBLE
+    model_repo.selected = True
+    assert model_repo.priority == Repo.PRIORITY_SELECTED
+    model_repo.inView = False
+    assert model_repo.priority == Repo.PRIORITY_SELECTED
+    model_repo.selected = False
+    assert model_repo.priority == Repo.PRIORITY_HIDDEN
+    assert model_repo.priorities == [
+        Repo.PRIORITY_VISIBLE, Repo.PRIORITY_SELECTED, Repo.PRIORITY_HIDDEN
+    ]
+
+
+def test_running_action_has_highest_priority(model_repo):
+    model_repo.selected = True
+    model_repo._setPushing(True)
+    assert model_repo.priority == Repo.PRIORITY_ACTION
+    assert slot_priorities(model_repo) == [Repo.PRIORITY_ACTION] * 3
+
+
+def test_unchanged_hints_emit_nothing(model_repo):
+    model_repo.inView = True
+    model_repo.priorities.clear()
+    model_repo.inView = True
+    model_repo.selected = False
+    assert model_repo.priorities == []
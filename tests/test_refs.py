@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of snapshots of references read by `git for-each-ref`.
+"""
+import pytest
+
+import gitover.refs
+from gitover.refs import RefSnapshot
+
+from conftest import run_git, commit
+
+
+@pytest.fixture
+def stable(monkeypatch):
+    """Treat fingerprints as reliable, even though the test just changed the files"""
+    monkeypatch.setattr(gitover.refs, "racy", lambda fingerprint: False)
+
+
+def test_branches_and_upstreams(clone):
+    path = clone.working_tree_dir
+    run_git(path, "branch", "feature")
+    run_git(path, "update-ref", "refs/remotes/origin/other", "HEAD")
+
+    refs = RefSnapshot()
+    assert refs.update(clone)
+
+    assert sorted(refs.branches()) == ["feature", "master"]
+    assert sorted(refs.remoteBranches()) == ["origin/master", "origin/other"]
+    assert refs.upstream("master") == "origin/master"
+    assert refs.upstream("feature") == ""
+    assert refs.upstream("unknown") == ""
+    assert refs.sha("master") == clone.head.commit.hexsha
+    assert refs.sha("origin/other") == clone.head.commit.hexsha
+    assert refs.sha("unknown") == ""
+    assert "feature" in refs and "origin/master" in refs
+    assert "origin/HEAD" not in refs
+
+
+def test_packed_refs(clone):
+    path = clone.working_tree_dir
+    run_git(path, "branch", "packed")
+    run_git(path, "pack-refs", "--all")
+
+    refs = RefSnapshot()
+    refs.update(clone)
+
+    assert sorted(refs.branches()) == ["master", "packed"]
+    assert refs.sha("packed") == clone.head.commit.hexsha
+
+
+def test_update_skipped_while_unchanged(clone, stable):
+    refs = RefSnapshot()
+    assert refs.update(clone)
+    assert not refs.update(clone)
+
+
+def test_update_after_change_of_refs(clone, stable):
+    path = clone.working_tree_dir
+    refs = RefSnapshot()
+    refs.update(clone)
+
+    sha = commit(path, "next")
+    assert refs.update(clone)
+    assert refs.sha("master") == sha
+
+    run_git(path, "branch", "--set-upstream-to", "origin/master", "master")
+    run_git(path, "branch", "topic")
+    run_git(path, "branch", "--set-upstream-to", "master", "topic")
+    assert refs.update(clone)
+    assert refs.upstream("topic") == "master"
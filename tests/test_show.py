@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of reading commit details by `git show`.
+"""
+import subprocess
+
+from gitover.show import _parse_raw, parse_show, read_commit
+
+from conftest import run_git, write, commit
+
+
+def test_parse_raw():
+    line = ":100644 100644 1234567 89abcde M\tdir/a.txt"
+    assert _parse_raw(line) == ("M", "dir/a.txt")
+    assert _parse_raw(":000000 100644 0000000 1234567 A\tnew file.txt") == ("A", "new file.txt")
+
+
+def test_parse_raw_of_combined_diff():
+    line = "::100644 100644 100644 1234567 89abcde fedcba9 MM\ta.txt"
+    assert _parse_raw(line) == ("M", "a.txt")
+
+
+def test_parse_show():
+    lines = [
+        b"abc\x00ab\x002017-07-14T04:40:00+02:00\x00Tester\x00Subject\n",
+        b"continued\n",
+        b"\n",
+        b"Body\n",
+        b"\x00\n",
+        b":100644 100644 1234567 89abcde M\ta.txt\n",
+        b"\n",
+        b"diff --git a/a.txt b/a.txt\n",
+        b"-old\n",
+        b"+new\n",
+    ]
+    show = parse_show(lines)
+    assert show.rev == "abc"
+    assert show.shortrev == "ab"
+    assert show.date == "2017-07-14 04:40:00+02:00"
+    assert show.user == "Tester"
+    assert show.msg == "Subject"
+    assert show.changes == [("M", "a.txt")]
+    assert show.diff == "diff --git a/a.txt b/a.txt\n-old\n+new"
+
+
+def test_read_commit(repo):
+    path = repo.working_tree_dir
+    write(path, "a.txt", "changed\n")
+    write(path, "b.txt")
+    sha = commit(path, "second\n\nbody")
+
+    show = read_commit(repo, sha)
+
+    assert show.rev == sha
+    assert show.shortrev == sha[:8]
+    assert show.msg == "second"
+    assert show.changes == [("M", "a.txt"), ("A", "b.txt")]
+    assert "+changed" in show.diff
+    assert "b/b.txt" in show.diff
+
+
+def test_read_commit_of_merge(repo):
+    path = repo.working_tree_dir
+    run_git(path, "checkout", "-q", "-b", "side")
+    write(path, "a.txt", "side\n")
+    commit(path, "side")
+    run_git(path, "checkout", "-q", "master")
+    write(path, "a.txt", "main\n")
+    commit(path, "main")
+    try:
+        run_git(path, "merge", "-q", "side")
+    except subprocess.CalledProcessError:
+        pass  # conflict expected
+    write(path, "a.txt", "merged\n")
+    sha = commit(path, "Merge branch 'side'\n\nResolved conflict of a.txt")
+
+    show = read_commit(repo, sha)
+
+    assert show.msg == "Merge branch 'side'"
+    assert show.changes == [("M", "a.txt")]
+    assert "diff --cc a.txt" in show.diff
+    assert "merged" in show.diff
+
+
+def test_read_commit_tracks_process(repo):
+    procs = []
+    read_commit(repo, "HEAD", track=procs.append)
+    assert len(procs) == 1
+    assert procs[0].poll() is not None
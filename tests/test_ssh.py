@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of shared ssh connections of git network commands.
+"""
+import os
+import shlex
+
+import pytest
+
+from gitover.ssh import SshMultiplexer
+from gitover.repos_model import share_ssh_connections
+
+from conftest import run_git
+
+
+@pytest.fixture
+def multiplexer(monkeypatch):
+    monkeypatch.delenv("GIT_SSH_COMMAND", raising=False)
+    monkeypatch.delenv("GIT_SSH", raising=False)
+    multiplexer = SshMultiplexer(enabled=True, persist=30)
+    yield multiplexer
+    multiplexer.cleanup()
+
+
+def control_path(env):
+    """Returns control path option of given ssh environment"""
+    args = shlex.split(env["GIT_SSH_COMMAND"])
+    return [arg for arg in args if arg.startswith("ControlPath=")][0][len("ControlPath="):]
+
+
+def test_env_shares_private_directory(multiplexer):
+    env = multiplexer.env()
+    assert env["GIT_SSH_COMMAND"].startswith("ssh -o ControlMaster=auto")
+    assert "ControlPersist=30" in env["GIT_SSH_COMMAND"]
+    path = control_path(env)
+    assert os.path.basename(path) == "%C"
+    assert os.stat(os.path.dirname(path)).st_mode & 0o077 == 0
+    assert multiplexer.env() == env
+
+
+def test_cleanup_removes_directory(multiplexer):
+    directory = os.path.dirname(control_path(multiplexer.env()))
+    multiplexer.cleanup()
+    assert not os.path.exists(directory)
+    assert control_path(multiplexer.env()) != os.path.join(directory, "%C")
+
+
+def test_disabled(multiplexer):
+    multiplexer.configure(False, 30)
+    assert multiplexer.env() == {}
+
+
+@pytest.mark.parametrize("name", ["GIT_SSH_COMMAND", "GIT_SSH"])
+def test_environment_takes_precedence(multiplexer, monkeypatch, name):
+    monkeypatch.setenv(name, "ssh")
+    assert multiplexer.env() == {}
+
+
+def test_share_unless_configured_by_repository(multiplexer, monkeypatch, repo):
+    monkeypatch.setattr("gitover.repos_model.SSH_CONNECTIONS", multiplexer)
+    share_ssh_connections(repo)
+    assert repo.git.environment() == multiplexer.env()
+
+    repo.git.update_environment(GIT_SSH_COMMAND=None)
+    run_git(repo.working_tree_dir, "config", "core.sshCommand", "ssh -v")
+    share_ssh_connections(repo)
+    assert "GIT_SSH_COMMAND" not in repo.git.environment()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of Gitover.
+
+Gitover is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Gitover is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Gitover. If not, see <http://www.gnu.org/licenses/>.
+
+Copyright 2017 Manuel Koch
+
+----------------------------
+
+Tests of persisting the last status of repositories.
+"""
+import json
+import os
+
+import pytest
+
+from gitover.statuscache import StatusCache
+from gitover.repos_model import GitStatus
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "status.json")
+
+
+@pytest.fixture
+def cache(qapp, path):
+    return StatusCache(path)
+
+
+def test_changes_written_in_batches(cache, path):
+    cache.put("/repo/a", {"branch": "master"})
+    cache.put("/repo/b", {"branch": "main"})
+    assert not os.path.exists(path)
+
+    cache.flush()
+    cache.remove("/repo/b")
+    cache.flush()
+
+    loaded = StatusCache(path)
+    assert loaded.get("/repo/a") == {"branch": "master"}
+    assert loaded.get("/repo/b") is None
+
+
+def test_unchanged_status_not_written(cache, path):
+    cache.put("/repo/a", {"branch": "master"})
+    cache.flush()
+    os.unlink(path)
+
+    cache.put("/repo/a", {"branch": "master"})
+    cache.remove("/repo/unknown")
+    cache.flush()
+
+    assert not os.path.exists(path)
+
+
+def test_failed_write_keeps_previous_file(cache, path):
+    cache.put("/repo/a", {"branch": "master"})
+    cache.flush()
+
+    cache.put("/repo/b", {"branch": object()})  # not serializable
+    cache.flush()
+
+    assert os.listdir(os.path.dirname(path)) == ["status.json"]
+    assert StatusCache(path).get("/repo/a") == {"branch": "master"}
+
+
+@pytest.mark.parametrize("content", ["{", json.dumps(dict(version=0, repos={"/a": {}}))])
+def test_invalid_or_outdated_file_ignored(qapp, path, content):
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write(content)
+    assert StatusCache(path).get("/a") is None
+
+
+def test_status_round_trip(cache, path, clone):
+    status = GitStatus(clone.working_tree_dir)
+    status.update()
+    cache.put(status.path, status.toJson())
+    cache.flush()
+
+    restored = GitStatus.fromJson(status.path, StatusCache(path).get(status.path))
+
+    assert restored.toJson() == status.toJson()
+    assert restored.trackingBranch == "origin/master"